@@ -0,0 +1,111 @@
+"""
+Micro-benchmark: parse time and peak memory of the single-parse ParsedDocument against the
+previous path, which built two html.parser trees per page (one in extract_page_metadata and one
+in clean_webpage_with_gpt) and repeated the title/meta/OG lookups on each.
+
+Usage (from be-risk-assessment/):
+    python -m benchmarks.bench_html_parse [page.html ...] [--iterations N]
+
+Without arguments a synthetic profile page is used.
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from riskassessmentapp.search.document import DEFAULT_PARSER, ParsedDocument
+
+
+def synthetic_page(paragraphs=400):
+    body = "\n".join(
+        f"<div class='row'><h2>Section {i}</h2><p>Jane Doe worked on project {i} in Springfield "
+        f"and can be reached through the company directory. <a href='/p/{i}'>more</a></p></div>"
+        for i in range(paragraphs)
+    )
+    return (
+        "<html><head><title>Jane Doe - Profile</title>"
+        "<meta name='description' content='Profile of Jane Doe'>"
+        "<meta name='keywords' content='jane, doe'>"
+        "<meta property='og:title' content='Jane Doe'>"
+        "<meta property='og:description' content='Engineer in Springfield'>"
+        "<meta property='og:site_name' content='Example'>"
+        "<script>var tracking = {};</script><style>.row {margin: 0}</style></head>"
+        f"<body><h1>Jane Doe</h1>{body}</body></html>"
+    )
+
+
+def legacy_metadata(soup):
+    title = soup.title.string if soup.title else "No title available"
+    fields = [soup.find("meta", {"name": "description"}), soup.find("meta", {"name": "keywords"}),
+              soup.find("meta", {"property": "og:title"}), soup.find("meta", {"property": "og:description"}),
+              soup.find("meta", {"property": "og:site_name"})]
+    return title, [tag.get("content", "") if tag else "" for tag in fields]
+
+
+def legacy_path(html):
+    # extract_page_metadata
+    soup = BeautifulSoup(html, 'html.parser')
+    legacy_metadata(soup)
+    for p in soup.find_all('p'):
+        if p.text and len(p.text.strip()) > 50:
+            break
+    [h.text.strip() for h in soup.find_all('h1') if h.text.strip()]
+    [h.text.strip() for h in soup.find_all('h2') if h.text.strip()]
+
+    # clean_webpage_with_gpt
+    soup = BeautifulSoup(html, 'html.parser')
+    legacy_metadata(soup)
+    text = soup.get_text().split('\n')
+    return "\n".join(line for line in text if line not in ('', '\r') and not line.isspace())
+
+
+def document_path(html, parser):
+    return ParsedDocument(html, "https://example.com/jane-doe", parser=parser).text
+
+
+def measure(fn, html, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="HTML files to parse")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = {"synthetic": synthetic_page()}
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[path] = f.read()
+
+    candidates = {
+        "legacy (2x html.parser)": legacy_path,
+        "ParsedDocument (html.parser)": lambda html: document_path(html, 'html.parser'),
+    }
+    if DEFAULT_PARSER != 'html.parser':
+        candidates[f"ParsedDocument ({DEFAULT_PARSER})"] = lambda html: document_path(html, DEFAULT_PARSER)
+
+    for name, html in pages.items():
+        print(f"\n{name}: {len(html) / 1024:.1f} KiB")
+        baseline = None
+        for label, fn in candidates.items():
+            median, peak = measure(fn, html, args.iterations)
+            baseline = baseline or median
+            print(f"  {label:32} median {median * 1000:8.2f} ms  x{baseline / median:5.2f}  "
+                  f"peak {peak / 1024 / 1024:7.2f} MiB")
+
+
+if __name__ == '__main__':
+    main()
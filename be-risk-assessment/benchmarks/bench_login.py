@@ -0,0 +1,150 @@
+"""
+Login throughput benchmark: logins per second, and the latency of authenticated requests made
+during a login burst, before and after moving bcrypt to a bounded pool and caching loaded users.
+
+    before  bcrypt on every request thread, users loaded from the database on every request
+    after   bcrypt on BCRYPT_WORKERS threads, users cached for USER_CACHE_TTL seconds
+
+Each mode runs --login-threads clients logging in over and over and --reader-threads clients
+calling GET /users/ with a logged-in session, all in this process against a SQLite database.
+
+Usage (from be-risk-assessment/):
+    python -m benchmarks.bench_login [--rounds 12] [--login-threads 16] [--reader-threads 8] [--duration 10]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+MODES = {
+    "before": {"BCRYPT_WORKERS": 0, "USER_CACHE_TTL": 0},
+    "after": {"BCRYPT_WORKERS": int(os.getenv("BCRYPT_WORKERS", 2)), "USER_CACHE_TTL": 30},
+}
+PASSWORD = "benchmark-password"
+
+
+def create_bench_app(mode, rounds, users):
+    from riskassessmentapp.app import create_app, db
+    from riskassessmentapp.extensions import password_hasher, user_cache
+    from riskassessmentapp.users.models import User
+
+    database = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{database}"
+    os.environ["BCRYPT_LOG_ROUNDS"] = str(rounds)
+    for name, value in MODES[mode].items():
+        os.environ[name] = str(value)
+
+    app = create_app()
+    user_cache.clear()
+    with app.app_context():
+        db.create_all()
+        hashed = password_hasher.hash(PASSWORD)
+        db.session.add_all([User(uid=f"user-{i}", first_name="Bench", last_name=str(i), email=f"user{i}@example.com",
+                                 password=hashed) for i in range(users)])
+        db.session.commit()
+    return app
+
+
+def run_mode(mode, args):
+    app = create_bench_app(mode, args.rounds, args.users)
+    stop = threading.Event()
+    measuring = threading.Event()
+    lock = threading.Lock()
+    logins = []
+    reads = []
+    errors = 0
+
+    def login_client(index):
+        nonlocal errors
+        client = app.test_client()
+        email = f"user{index % args.users}@example.com"
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.post('/users/login', json={"email": email, "password": PASSWORD})
+            elapsed = time.perf_counter() - start
+            if measuring.is_set():
+                with lock:
+                    if response.status_code == 200:
+                        logins.append(elapsed)
+                    else:
+                        errors += 1
+
+    def reader_client(client):
+        nonlocal errors
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.get('/users/')
+            elapsed = time.perf_counter() - start
+            if measuring.is_set():
+                with lock:
+                    if response.status_code == 200 and b"@" in response.data:
+                        reads.append(elapsed)
+                    else:
+                        errors += 1
+
+    # Readers log in before the burst starts
+    readers = []
+    for index in range(args.reader_threads):
+        client = app.test_client()
+        client.post('/users/login', json={"email": f"user{index % args.users}@example.com", "password": PASSWORD})
+        readers.append(client)
+
+    threads = [threading.Thread(target=login_client, args=(i,)) for i in range(args.login_threads)]
+    threads += [threading.Thread(target=reader_client, args=(client,)) for client in readers]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.warmup)
+    measuring.set()
+    start = time.monotonic()
+    time.sleep(args.duration)
+    measuring.clear()
+    elapsed = time.monotonic() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    def percentile(samples, q):
+        return statistics.quantiles(samples, n=100)[q - 1] * 1000 if len(samples) > 1 else float("nan")
+
+    return {
+        "mode": mode,
+        "logins_per_s": len(logins) / elapsed,
+        "login_p50_ms": percentile(logins, 50),
+        "login_p99_ms": percentile(logins, 99),
+        "reads_per_s": len(reads) / elapsed,
+        "read_p50_ms": percentile(reads, 50),
+        "read_p99_ms": percentile(reads, 99),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["before", "after"], choices=list(MODES))
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor (BCRYPT_LOG_ROUNDS)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--reader-threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    args = parser.parse_args()
+
+    print(f"bcrypt rounds {args.rounds}, {args.login_threads} login and {args.reader_threads} reader threads, "
+          f"{args.duration:.0f}s, {os.cpu_count()} CPUs")
+    print(f"{'mode':<7} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'reads/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7}")
+    for mode in args.modes:
+        result = run_mode(mode, args)
+        print(f"{mode:<7} {result['logins_per_s']:>9.1f} {result['login_p50_ms']:>8.1f} {result['login_p99_ms']:>8.1f} "
+              f"{result['reads_per_s']:>9.1f} {result['read_p50_ms']:>8.1f} {result['read_p99_ms']:>8.1f} "
+              f"{result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Load benchmark: requests per second and latency percentiles of an async view under each way of
+serving the app.
+
+    dev      run.py's Werkzeug development server (threaded, debug off)
+    gthread  gunicorn with threaded WSGI workers; Flask gives every async view a fresh event loop
+    asgi     gunicorn with uvicorn workers via riskassessmentapp.serving (one event loop per worker)
+
+The benchmarked view awaits BENCH_IO_MS of simulated upstream I/O, like a page fetch or an OpenAI
+call, then spends BENCH_CPU_MS on the CPU in a thread, the way the views parse pages, and reports
+which event loop it ran on, so the output also shows how many loops were used.
+
+Usage (from be-risk-assessment/):
+    python -m benchmarks.bench_serving [--modes dev gthread asgi] [--concurrency 64] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_serving.db')}")
+
+IO_SECONDS = float(os.getenv("BENCH_IO_MS", 50)) / 1000
+CPU_SECONDS = float(os.getenv("BENCH_CPU_MS", 0)) / 1000
+
+
+def create_bench_app():
+    from flask import jsonify
+
+    from riskassessmentapp.app import create_app
+
+    app = create_app()
+
+    def spin():
+        deadline = time.perf_counter() + CPU_SECONDS
+        while time.perf_counter() < deadline:
+            pass
+
+    @app.route('/bench/io')
+    async def bench_io():
+        await asyncio.sleep(IO_SECONDS)
+        if CPU_SECONDS:
+            await asyncio.to_thread(spin)
+        return jsonify({"pid": os.getpid(), "loop": id(asyncio.get_running_loop())})
+
+    return app
+
+
+def wsgi_app():
+    return create_bench_app()
+
+
+def asgi_app():
+    from riskassessmentapp.serving import make_asgi_app
+    return make_asgi_app(create_bench_app())
+
+
+def server_command(mode, port, workers, threads):
+    bind = f"127.0.0.1:{port}"
+    if mode == "dev":
+        return [sys.executable, "-m", "benchmarks.bench_serving", "--serve-dev", str(port)]
+    if mode == "gthread":
+        return [sys.executable, "-m", "gunicorn", "-b", bind, "-w", str(workers), "-k", "gthread",
+                "--threads", str(threads), "benchmarks.bench_serving:wsgi_app()"]
+    if mode == "asgi":
+        return [sys.executable, "-m", "gunicorn", "-b", bind, "-w", str(workers),
+                "-k", "riskassessmentapp.serving.RiskAssessmentUvicornWorker", "benchmarks.bench_serving:asgi_app()"]
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+async def drive(url, concurrency, duration, warmup):
+    """Keep concurrency requests in flight for duration seconds and collect their latencies."""
+    latencies = []
+    errors = 0
+    loops = set()
+    measuring = False
+
+    async def client(session, deadline):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    body = await response.json() if response.status == 200 else None
+                if body is None:
+                    errors += measuring
+                    continue
+            except aiohttp.ClientError:
+                errors += measuring
+                continue
+            if measuring:
+                latencies.append(time.perf_counter() - start)
+                loops.add((body["pid"], body["loop"]))
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*[client(session, time.monotonic() + warmup) for _ in range(concurrency)])
+        measuring = True
+        start = time.monotonic()
+        await asyncio.gather(*[client(session, start + duration) for _ in range(concurrency)])
+        elapsed = time.monotonic() - start
+
+    return latencies, errors, loops, elapsed
+
+
+def run_mode(mode, args):
+    port = free_port()
+    server = subprocess.Popen(server_command(mode, port, args.workers, args.threads),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        latencies, errors, loops, elapsed = asyncio.run(
+            drive(f"http://127.0.0.1:{port}/bench/io", args.concurrency, args.duration, args.warmup))
+    finally:
+        server.terminate()
+        server.wait(30)
+
+    if len(latencies) < 2:
+        return {"mode": mode, "requests": len(latencies), "errors": errors}
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "event_loops": len(loops),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["dev", "gthread", "asgi"],
+                        choices=["dev", "gthread", "asgi"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=32, help="threads per gthread worker")
+    parser.add_argument("--serve-dev", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_dev:
+        create_bench_app().run(host="127.0.0.1", port=args.serve_dev, debug=False, threaded=True)
+        return
+
+    print(f"{args.concurrency} concurrent clients for {args.duration:.0f}s, {IO_SECONDS * 1000:.0f} ms of I/O "
+          f"and {CPU_SECONDS * 1000:.0f} ms of CPU per request")
+    print(f"{'mode':<8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'loops':>7}")
+    for mode in args.modes:
+        result = run_mode(mode, args)
+        if "rps" not in result:
+            print(f"{mode:<8} {result['requests']:>9} {result['errors']:>7}  (not enough successful requests)")
+            continue
+        print(f"{mode:<8} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['event_loops']:>7}")
+
+
+if __name__ == '__main__':
+    main()
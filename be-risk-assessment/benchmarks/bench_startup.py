@@ -0,0 +1,146 @@
+"""
+Startup benchmark: import time of the app, and the time and memory each forked worker spends on
+first-use loading (openai, tokenizer, HTML parser) depending on where that loading happens.
+
+    lazy    nothing is loaded before the fork; every worker loads on its first requests
+    warm    riskassessmentapp.warmup runs in the parent before the fork, like gunicorn's on_starting
+    frozen  warm, plus gc.freeze() before the fork, like gunicorn.conf.py's pre_fork hook
+
+Each mode runs in a fresh interpreter, which imports the app, calls create_app() and forks
+--workers children the way gunicorn does. Every child does the first-use loading (free when the
+parent already did it), runs a full garbage collection as a long-running worker eventually would,
+and reports its memory from /proc: RSS counts pages shared with the parent, USS only the pages
+private to that worker, PSS shares the shared pages out between the processes using them.
+
+Usage (from be-risk-assessment/):
+    python -m benchmarks.bench_startup [--modes lazy warm frozen] [--workers 4]
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_startup.db')}")
+
+MODES = ("lazy", "warm", "frozen")
+
+
+def memory_mb(pid="self"):
+    """RSS, PSS and USS of a process in MiB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def run_worker(app, result_fd, release_fd):
+    from riskassessmentapp.warmup import warm_up
+
+    start = time.perf_counter()
+    warm_up(app)
+    first_use = time.perf_counter() - start
+    gc.collect()
+    os.write(result_fd, (json.dumps({"pid": os.getpid(), "first_use_s": first_use}) + "\n").encode())
+    # Stay alive until the parent has measured every process, so shared pages count as shared
+    os.read(release_fd, 1)
+
+
+def run_mode(mode, workers):
+    """Runs in a fresh interpreter: start up the way the gunicorn master does, then fork the workers."""
+    start = time.perf_counter()
+    from riskassessmentapp.app import create_app
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+    if mode in ("warm", "frozen"):
+        from riskassessmentapp.warmup import warm_up
+        warm_up(app)
+        gc.collect()
+    warmed = time.perf_counter()
+    if mode == "frozen":
+        gc.freeze()
+
+    read_fd, write_fd = os.pipe()
+    release_read_fd, release_write_fd = os.pipe()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.close(release_write_fd)
+            try:
+                run_worker(app, write_fd, release_read_fd)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    os.close(write_fd)
+    os.close(release_read_fd)
+
+    worker_results = []
+    with os.fdopen(read_fd) as results:
+        for _ in children:
+            worker_results.append(json.loads(results.readline()))
+        for worker in worker_results:
+            worker.update(memory_mb(worker["pid"]))
+        parent = memory_mb()
+    os.close(release_write_fd)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+    return {
+        "mode": mode,
+        "import_s": imported - start,
+        "create_app_s": created - imported,
+        "warm_up_s": warmed - created,
+        "parent": parent,
+        "workers": worker_results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args.run_mode, args.workers)))
+        return
+
+    print(f"{args.workers} forked workers per mode, {os.cpu_count()} CPUs; times in seconds, memory in MiB "
+          f"(worker figures are medians)")
+    print(f"{'mode':<7} {'import':>7} {'create':>7} {'warm-up':>8} {'parent':>7} {'1st use':>8} "
+          f"{'RSS':>7} {'PSS':>7} {'USS':>7} {'total PSS':>10}")
+    for mode in args.modes:
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--run-mode", mode,
+                                 "--workers", str(args.workers)], capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        workers = result["workers"]
+
+        def median(key):
+            return statistics.median(worker[key] for worker in workers)
+
+        total_pss = result["parent"]["pss"] + sum(worker["pss"] for worker in workers)
+        print(f"{mode:<7} {result['import_s']:>7.2f} {result['create_app_s']:>7.2f} {result['warm_up_s']:>8.2f} "
+              f"{result['parent']['rss']:>7.1f} {median('first_use_s'):>8.2f} {median('rss'):>7.1f} "
+              f"{median('pss'):>7.1f} {median('uss'):>7.1f} {total_pss:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+End-to-end benchmark of /risksearch/ and /risksearch/extract that never leaves the machine.
+
+The app runs as in production (gunicorn -c gunicorn.conf.py riskassessmentapp.asgi:application)
+against the stand-ins in benchmarks.e2e.stubs: a fake search provider, a web server replaying the
+HTML fixtures with latency, slow pages and failures, and a stub OpenAI server. Each endpoint is
+driven by a fixed number of clients sending requests back to back (a new person every request,
+so nothing is served from the search, page, LLM or assessment caches, which are also switched off
+unless --with-caches is given). For every endpoint and concurrency level it reports throughput,
+p50/p95/p99 latency, the error rate and the peak memory of all app processes together.
+
+The results are compared with the stored baseline and the run fails (exit status 1) if any of them
+is worse by more than --tolerance (--error-tolerance for the error rate). Numbers depend on the
+machine, so after an intended change, or on a new machine, store a new baseline with
+--update-baseline.
+
+Usage (from be-risk-assessment/):
+    python -m benchmarks.e2e [--endpoints search extract] [--concurrency 1 4 16] [--duration 30]
+                             [--baseline benchmarks/e2e/baseline.json] [--update-baseline]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from benchmarks.e2e.stubs import add_arguments, fixture_urls
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+ENDPOINTS = ("search", "extract")
+
+FIRST_NAMES = ("Jordan", "Avery", "Taylor", "Morgan", "Riley", "Casey", "Jamie", "Quinn", "Harper", "Rowan")
+LAST_NAMES = ("Ellison", "Whitaker", "Okafor", "Lindqvist", "Moreno", "Achebe", "Kowalski", "Nakamura")
+
+# (metric, True if higher is better) for the baseline comparison
+COMPARED_METRICS = (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False),
+                    ("peak_rss_mb", False))
+# Tail percentiles from fewer requests than this are too noisy to compare
+MIN_REQUESTS = {"p95_ms": 20, "p99_ms": 100}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def person_names():
+    """A new, name-like person for every request."""
+    for n in itertools.count():
+        first = FIRST_NAMES[n % len(FIRST_NAMES)]
+        last = LAST_NAMES[n // len(FIRST_NAMES) % len(LAST_NAMES)]
+        # Base-26 letters make every name unique
+        middle = ""
+        rest = n
+        while True:
+            rest, letter = divmod(rest, 26)
+            middle += chr(ord("a") + letter)
+            if rest == 0:
+                break
+        yield f"{first} {middle.title()} {last}"
+
+
+def app_environment(args, ports, workdir):
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")])),
+        "BIND": f"127.0.0.1:{ports['app']}",
+        "WEB_CONCURRENCY": str(args.workers),
+        "GUNICORN_ACCESS_LOG": os.devnull,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'e2e.db')}",
+        "SECRET_KEY": "e2e-benchmark",
+        "LOG_LEVEL": "WARNING",
+        "OPENAI_API_KEY": "e2e-benchmark",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{ports['llm']}/v1",
+        "SEARCH_PROVIDER_BACKEND": "benchmarks.e2e.stubs:fake_search",
+        "SEARCH_PROVIDER_MIN_INTERVAL": "0",
+        "E2E_WEB_PORT": str(ports["web"]),
+        "E2E_WEB_DOMAINS": str(args.domains),
+        "E2E_SEARCH_LATENCY_MS": str(args.search_latency_ms),
+        "E2E_SEARCH_RESULTS": str(args.search_results),
+        # The fixture domains stand in for many sites, so they get more than one real site's politeness budget
+        "DOMAIN_RATE": str(args.domain_rate),
+        "DOMAIN_BURST": str(args.domain_rate),
+    })
+    if not args.with_caches:
+        env.update({"PAGE_CACHE_ENABLED": "false", "LLM_CACHE_ENABLED": "false", "ASSESSMENT_STORE_ENABLED": "false"})
+    return env
+
+
+def stub_command(args, ports):
+    command = [sys.executable, "-m", "benchmarks.e2e.stubs", "--web-port", str(ports["web"]),
+               "--llm-port", str(ports["llm"])]
+    for option in ("fixtures", "domains", "page_latency_ms", "page_jitter_ms", "page_slow_rate", "page_slow_ms",
+                   "page_failure_rate", "llm_latency_ms", "llm_ms_per_token", "llm_failure_rate"):
+        command += ["--" + option.replace("_", "-"), str(getattr(args, option))]
+    return command
+
+
+def process_tree(pid):
+    """pid and its child processes (the gunicorn master and its workers)."""
+    pids = [pid]
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            pids.append(int(entry))
+    return pids
+
+
+def rss_mb(pids):
+    total = 0
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            continue
+    return total / (1024 * 1024)
+
+
+async def wait_until_serving(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not answer within {timeout}s")
+
+
+async def drive(endpoint, base_url, web_port, args, concurrency, server_pid, names):
+    """Keep concurrency requests to endpoint in flight and measure the ones finished in the window."""
+    latencies = []
+    errors = 0
+    measuring = False
+    peak = 0.0
+
+    async def send(session):
+        name = next(names)
+        if endpoint == "search":
+            async with session.get(f"{base_url}/risksearch/", params={"searchName": name}) as response:
+                body = await response.json(content_type=None)
+                return response.status == 200 and bool(body.get("webpages"))
+        urls = fixture_urls(name, args.extract_urls, web_port, args.domains)
+        async with session.post(f"{base_url}/risksearch/extract",
+                                json={"searchName": name, "selectedUrls": urls}) as response:
+            body = await response.json(content_type=None)
+            return response.status == 200 and "risk_score" in body
+
+    async def client(session, deadline):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = await send(session)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                ok = False
+            if measuring:
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+    async def sample_memory(stop):
+        nonlocal peak
+        while not stop.is_set():
+            peak = max(peak, await asyncio.to_thread(lambda: rss_mb(process_tree(server_pid))))
+            try:
+                await asyncio.wait_for(stop.wait(), 0.25)
+            except asyncio.TimeoutError:
+                pass
+
+    timeout = aiohttp.ClientTimeout(total=args.request_timeout)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await asyncio.gather(*[client(session, time.monotonic() + args.warmup) for _ in range(concurrency)])
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_memory(stop))
+        measuring = True
+        start = time.monotonic()
+        # Requests still running at the deadline finish and are counted, so the window is the wall time
+        await asyncio.gather(*[client(session, start + args.duration) for _ in range(concurrency)])
+        elapsed = time.monotonic() - start
+        stop.set()
+        await sampler
+
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": errors / max(1, len(latencies) + errors),
+        "rps": len(latencies) / elapsed,
+        "peak_rss_mb": peak,
+    }
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        result.update({"p50_ms": percentiles[49] * 1000, "p95_ms": percentiles[94] * 1000,
+                       "p99_ms": percentiles[98] * 1000})
+    return result
+
+
+def settings(args):
+    """The options that change the numbers; a baseline is only comparable with the same settings."""
+    keys = ("workers", "duration", "domains", "search_results", "search_latency_ms", "extract_urls", "domain_rate",
+            "with_caches", "page_latency_ms", "page_jitter_ms", "page_slow_rate", "page_slow_ms", "page_failure_rate",
+            "llm_latency_ms", "llm_ms_per_token", "llm_failure_rate")
+    return {key: getattr(args, key) for key in keys}
+
+
+def compare(results, baseline, tolerance, error_tolerance):
+    """Return a description of every result that is worse than the baseline by more than the tolerance."""
+    regressions = []
+    for endpoint, levels in results.items():
+        for level, result in levels.items():
+            expected = baseline.get(endpoint, {}).get(level)
+            if expected is None:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS:
+                if metric not in result or metric not in expected:
+                    continue
+                if min(result["requests"], expected["requests"]) < MIN_REQUESTS.get(metric, 0):
+                    continue
+                limit = expected[metric] * (1 - tolerance if higher_is_better else 1 + tolerance)
+                if (result[metric] < limit) if higher_is_better else (result[metric] > limit):
+                    regressions.append(f"{endpoint} c={level} {metric}: {result[metric]:.1f} "
+                                       f"(baseline {expected[metric]:.1f})")
+            if result["error_rate"] > expected["error_rate"] + error_tolerance:
+                regressions.append(f"{endpoint} c={level} error_rate: {result['error_rate']:.3f} "
+                                   f"(baseline {expected['error_rate']:.3f})")
+    return regressions
+
+
+def run(args):
+    ports = {"web": free_port(), "llm": free_port(), "app": free_port()}
+    workdir = tempfile.mkdtemp(prefix="e2e-")
+    log_path = os.path.join(workdir, "app.log")
+    results = {}
+
+    stubs = subprocess.Popen(stub_command(args, ports), stdout=subprocess.PIPE, text=True)
+    server = None
+    try:
+        if stubs.stdout.readline().strip() != "ready":
+            raise RuntimeError("The stub servers did not start")
+        with open(log_path, "w") as log:
+            server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                                       "riskassessmentapp.asgi:application"],
+                                      env=app_environment(args, ports, workdir), stdout=log, stderr=subprocess.STDOUT)
+        base_url = f"http://127.0.0.1:{ports['app']}"
+        asyncio.run(wait_until_serving(f"{base_url}/metrics"))
+
+        names = person_names()
+        for endpoint in args.endpoints:
+            results[endpoint] = {}
+            for concurrency in args.concurrency:
+                result = asyncio.run(drive(endpoint, base_url, ports["web"], args, concurrency, server.pid, names))
+                results[endpoint][str(concurrency)] = result
+                print_result(endpoint, concurrency, result)
+    finally:
+        for process in (server, stubs):
+            if process is not None:
+                process.terminate()
+                process.wait(30)
+
+    print(f"App log: {log_path}")
+    return results
+
+
+def print_result(endpoint, concurrency, result):
+    latency = " ".join(f"{result[key]:>9.0f}" if key in result else f"{'-':>9}" for key in ("p50_ms", "p95_ms", "p99_ms"))
+    print(f"{endpoint:<8} {concurrency:>5} {result['requests']:>9} {result['error_rate']:>7.1%} {result['rps']:>8.2f} "
+          f"{latency} {result['peak_rss_mb']:>10.0f}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before each level")
+    parser.add_argument("--request-timeout", type=float, default=180)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--search-results", type=int, default=20, help="URLs the fake search returns")
+    parser.add_argument("--search-latency-ms", type=float, default=300)
+    parser.add_argument("--extract-urls", type=int, default=5, help="selected URLs per /extract request")
+    parser.add_argument("--domain-rate", type=float, default=50, help="DOMAIN_RATE and DOMAIN_BURST for the app")
+    parser.add_argument("--with-caches", action="store_true", help="leave the page, LLM and assessment caches on")
+    add_arguments(parser)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--error-tolerance", type=float, default=0.02, help="allowed increase of the error rate")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.duration:.0f}s per level, {os.cpu_count()} CPUs; latency in ms, "
+          f"peak RSS in MiB over all app processes")
+    print(f"{'endpoint':<8} {'conc.':>5} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} "
+          f"{'peak RSS':>10}")
+    results = run(args)
+    report = {"settings": settings(args), "machine": {"cpus": os.cpu_count(), "python": platform.python_version()},
+              "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline stored in {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; store one with --update-baseline")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["settings"] != report["settings"]:
+        print("The baseline was recorded with other settings, so it is not compared:",
+              {key: value for key, value in baseline["settings"].items() if report["settings"].get(key) != value})
+        return
+
+    regressions = compare(results, baseline["results"], args.tolerance, args.error_tolerance)
+    if regressions:
+        print(f"Regressions against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Local stand-ins for everything /risksearch/ and /risksearch/extract reach over the network.
+
+    fake_search  SEARCH_PROVIDER_BACKEND for the app: returns fixture URLs instead of Google results
+    web server   serves the HTML fixtures on 127.0.0.2, 127.0.0.3, ... (one domain each), filling in
+                 the person named in the URL, with configurable latency, slow responses and failures
+    LLM server   answers OpenAI chat completions (OPENAI_BASE_URL) with cleaned paragraphs or a PII
+                 dictionary built from the prompt, after a configurable time to first token plus a
+                 time per generated token
+
+Run by benchmarks.e2e, or on their own for manual testing:
+    python -m benchmarks.e2e.stubs --web-port 8801 --llm-port 8802
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+from aiohttp import web
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CITIES = ("Springfield", "Riverton", "Lakewood", "Fairview", "Greenville", "Ashford", "Milton", "Brookside")
+EMPLOYERS = ("Acme Analytics", "Blue Harbor Health", "Cedar Logistics", "Summit Robotics", "Evergreen Labs")
+TITLES = ("Senior Software Engineer", "Data Scientist", "Engineering Manager", "Product Designer", "Analyst")
+UNIVERSITIES = ("State University", "Lakeside College", "Institute of Technology", "Northern University")
+STREETS = ("Maple Avenue", "Oak Street", "Pine Road", "Cedar Lane", "Willow Drive", "Birch Court")
+
+# Characters per token, the same estimate the app uses without tiktoken
+CHARS_PER_TOKEN = 4
+
+
+def slugify(name):
+    return "-".join(name.lower().split())
+
+
+def fixture_urls(name, count, port, domains):
+    """The URLs the fake search returns for name: count pages spread over the fixture domains."""
+    slug = slugify(name)
+    return [f"http://127.0.0.{2 + i % domains}:{port}/p/{i}/{slug}" for i in range(count)]
+
+
+def fake_search(query, num_results):
+    """
+    SEARCH_PROVIDER_BACKEND for the benchmarks: fixture URLs after E2E_SEARCH_LATENCY_MS, like a
+    search API call. Runs in the app's worker processes, so it is configured through E2E_* variables.
+    """
+    time.sleep(float(os.getenv("E2E_SEARCH_LATENCY_MS", 300)) / 1000)
+    return fixture_urls(query, min(num_results, int(os.getenv("E2E_SEARCH_RESULTS", 20))),
+                        int(os.environ["E2E_WEB_PORT"]), int(os.getenv("E2E_WEB_DOMAINS", 8)))
+
+
+def person_fields(slug):
+    """Made-up but stable personal details for the person a fixture URL names."""
+    words = slug.split("-")
+    first, last = words[0].title(), words[-1].title()
+    seed = int(hashlib.sha1(slug.encode("utf-8")).hexdigest(), 16)
+    pick = lambda options, shift: options[(seed >> shift) % len(options)]  # noqa: E731
+    handle = "".join(words)
+    employer = pick(EMPLOYERS, 8)
+    digits = f"{seed % 10_000_000:07d}"
+    return {
+        "name": " ".join(word.title() for word in words),
+        "first": first,
+        "last": last,
+        "handle": handle,
+        "email": f"{handle}@mail.example",
+        "work_email": f"{first.lower()}.{last.lower()}@{slugify(employer).replace('-', '')}.example",
+        "phone": f"({200 + seed % 700}) {digits[:3]}-{digits[3:]}",
+        "work_phone": f"({200 + (seed >> 4) % 700}) 555-{seed % 10_000:04d}",
+        "city": pick(CITIES, 4),
+        "birthplace": pick(CITIES, 12),
+        "employer": employer,
+        "title": pick(TITLES, 16),
+        "university": pick(UNIVERSITIES, 20),
+        "address": f"{1 + seed % 999} {pick(STREETS, 24)}",
+        "age": str(25 + seed % 40),
+        "dob": f"{1 + seed % 12:02d}-{1 + (seed >> 3) % 28:02d}-{1960 + seed % 40}",
+    }
+
+
+def load_fixtures(fixture_dir):
+    """Every .html file in fixture_dir, in name order."""
+    names = sorted(name for name in os.listdir(fixture_dir) if name.endswith(".html"))
+    if not names:
+        raise ValueError(f"No .html fixtures in {fixture_dir}")
+    fixtures = []
+    for name in names:
+        with open(os.path.join(fixture_dir, name), encoding="utf-8") as f:
+            fixtures.append(f.read())
+    return fixtures
+
+
+def make_web_app(fixtures, latency_ms=150, jitter_ms=100, slow_rate=0.02, slow_ms=3000, failure_rate=0.02,
+                 seed=1):
+    """
+    Serve /p/<index>/<slug> as fixture number index, with the {{placeholders}} filled in for slug.
+
+    Each response waits latency_ms plus up to jitter_ms; slow_rate of them wait slow_ms instead and
+    failure_rate of them fail with a 503, which the app retries and counts against the domain.
+    """
+    rng = random.Random(seed)
+
+    async def page(request):
+        roll = rng.random()
+        delay = latency_ms + rng.uniform(0, jitter_ms)
+        if roll < slow_rate:
+            delay = slow_ms
+        await asyncio.sleep(delay / 1000)
+        if slow_rate <= roll < slow_rate + failure_rate:
+            return web.Response(status=503, text="Service unavailable")
+
+        html = fixtures[int(request.match_info["index"]) % len(fixtures)]
+        fields = person_fields(request.match_info["slug"])
+        html = re.sub(r"\{\{(\w+)\}\}", lambda match: fields.get(match.group(1), ""), html)
+        return web.Response(text=html, content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/p/{index:\\d+}/{slug}", page)
+    return app
+
+
+def completion_text(messages, max_tokens):
+    """What the stub model answers: a PII dictionary for extraction prompts, paragraphs for cleaning."""
+    prompt = messages[-1]["content"]
+    if "Return a valid JSON dictionary" in prompt:
+        fields = re.findall(r"^  '([^']+)': ''", prompt, re.MULTILINE)
+        name = re.search(r"structured text about (.*?):\n", prompt)
+        found = {
+            "Name": name.group(1) if name else "",
+            "Email": ", ".join(sorted(set(re.findall(r"[\w.+-]+@[\w-]+\.[\w.]+", prompt)))[:3]),
+            "Phone": ", ".join(sorted(set(re.findall(r"\(\d{3}\) \d{3}-\d{4}", prompt)))[:3]),
+        }
+        return json.dumps({field: found.get(field, "") for field in fields})
+
+    content = prompt.split("WEBPAGE CONTENT", 1)[-1].split("\n\nPlease create", 1)[0]
+    lines = [line.strip() for line in content.splitlines()[1:] if line.strip()]
+    paragraphs = [" ".join(lines[i:i + 3]) for i in range(0, len(lines), 3)]
+    return "\n\n".join(paragraphs)[:max_tokens * CHARS_PER_TOKEN] or "NO_RELEVANT_INFORMATION"
+
+
+def make_llm_app(latency_ms=400, ms_per_token=4.0, failure_rate=0.0, seed=2):
+    """
+    Answer POST /v1/chat/completions like the OpenAI API, after latency_ms plus ms_per_token for every
+    completion token. failure_rate of the calls fail with a 500, which the OpenAI client retries.
+    """
+    rng = random.Random(seed)
+    counter = 0
+
+    async def chat_completions(request):
+        nonlocal counter
+        body = await request.json()
+        counter += 1
+        if rng.random() < failure_rate:
+            await asyncio.sleep(latency_ms / 1000)
+            return web.json_response({"error": {"message": "stub failure", "type": "server_error"}}, status=500)
+
+        text = completion_text(body["messages"], body.get("max_tokens") or 4096)
+        prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // CHARS_PER_TOKEN
+        completion_tokens = max(1, len(text) // CHARS_PER_TOKEN)
+        await asyncio.sleep((latency_ms + ms_per_token * completion_tokens) / 1000)
+        return web.json_response({
+            "id": f"chatcmpl-e2e-{counter}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop",
+                         "logprobs": None}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+async def serve(args):
+    runners = []
+    web_runner = web.AppRunner(make_web_app(
+        load_fixtures(args.fixtures), latency_ms=args.page_latency_ms, jitter_ms=args.page_jitter_ms,
+        slow_rate=args.page_slow_rate, slow_ms=args.page_slow_ms, failure_rate=args.page_failure_rate),
+        access_log=None)
+    await web_runner.setup()
+    for i in range(args.domains):
+        await web.TCPSite(web_runner, f"127.0.0.{2 + i}", args.web_port).start()
+    runners.append(web_runner)
+
+    llm_runner = web.AppRunner(make_llm_app(latency_ms=args.llm_latency_ms, ms_per_token=args.llm_ms_per_token,
+                                            failure_rate=args.llm_failure_rate), access_log=None)
+    await llm_runner.setup()
+    await web.TCPSite(llm_runner, "127.0.0.1", args.llm_port).start()
+    runners.append(llm_runner)
+
+    print("ready", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def add_arguments(parser):
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="directory of .html pages to serve")
+    parser.add_argument("--domains", type=int, default=8, help="fixture domains (127.0.0.2 and up)")
+    parser.add_argument("--page-latency-ms", type=float, default=150)
+    parser.add_argument("--page-jitter-ms", type=float, default=100)
+    parser.add_argument("--page-slow-rate", type=float, default=0.02)
+    parser.add_argument("--page-slow-ms", type=float, default=3000)
+    parser.add_argument("--page-failure-rate", type=float, default=0.02)
+    parser.add_argument("--llm-latency-ms", type=float, default=400, help="time to first token")
+    parser.add_argument("--llm-ms-per-token", type=float, default=4)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--web-port", type=int, required=True)
+    parser.add_argument("--llm-port", type=int, required=True)
+    add_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
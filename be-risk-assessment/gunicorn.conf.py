@@ -0,0 +1,64 @@
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', 5757)}")
+
+# One uvicorn worker process per core, each with one event loop for the async views and ASGI_THREADS
+# request threads; the work is mostly waiting on pages and OpenAI, and each worker holds its own
+# caches, connection pools and OpenAI client
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "riskassessmentapp.serving.RiskAssessmentUvicornWorker")
+# Only used by the threaded WSGI worker: GUNICORN_WORKER_CLASS=gthread with run:flask_app as the app
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+
+# /risksearch/extract can take minutes on a slow page set
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 300))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then to bound memory growth in long-running processes
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 0))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+
+
+def on_starting(server):
+    # Metric files left by a previous run would be added to this run's totals
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            if name.endswith(".db"):
+                os.remove(os.path.join(multiproc_dir, name))
+
+    # Same table setup run.py does before starting the development server
+    from riskassessmentapp.app import create_app, db
+    from riskassessmentapp.warmup import warm_up
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        # Workers open their own connections; none should be inherited across the fork
+        for engine in db.engines.values():
+            engine.dispose()
+
+    if app.config['WARMUP_ENABLED']:
+        warm_up(app)
+    # Drop the startup garbage now, before the remaining objects are frozen in pre_fork
+    gc.collect()
+
+
+def pre_fork(server, worker):
+    # Objects loaded so far are never freed, so keep them out of the workers' garbage collections:
+    # scanning them writes to their pages, and every written page is copied into the worker
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    # Drop the live gauges (in-flight requests, queue depths) of a worker that has exited
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
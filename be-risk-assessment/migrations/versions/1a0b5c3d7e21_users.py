@@ -0,0 +1,41 @@
+"""The users table as the app first created it
+
+Revision ID: 1a0b5c3d7e21
+Revises:
+Create Date: 2026-10-18 12:10:00.000000
+
+Baseline for databases that have no tables yet. Databases created with db.create_all() already
+have the table and are left as they are.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a0b5c3d7e21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'users' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'users',
+        sa.Column('uid', sa.String(length=36), nullable=False),
+        sa.Column('first_name', sa.String(length=255), nullable=False),
+        sa.Column('last_name', sa.String(length=255), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=False),
+        sa.Column('search_names', sa.String(length=10000), nullable=True),
+        sa.PrimaryKeyConstraint('uid'),
+        sa.UniqueConstraint('uid'),
+    )
+
+
+def downgrade():
+    if 'users' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table('users')
@@ -0,0 +1,62 @@
+"""Unique index on users.email and the search_history table
+
+Revision ID: 3c7e1f2a9b4d
+Revises: 1a0b5c3d7e21
+Create Date: 2026-10-18 12:20:00.000000
+
+Databases so far were created with db.create_all(), so every step checks what already exists:
+running this against one that create_all has already brought up to date is a no-op.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e1f2a9b4d'
+down_revision = '1a0b5c3d7e21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if not any(index['name'] == 'ix_users_email' for index in inspector.get_indexes('users')):
+        duplicates = bind.execute(sa.text(
+            "SELECT email, COUNT(*) FROM users GROUP BY email HAVING COUNT(*) > 1"
+        )).fetchall()
+        if duplicates:
+            # Which account to keep is a decision for whoever runs the migration
+            raise RuntimeError(
+                f"{len(duplicates)} emails belong to more than one user (e.g. {duplicates[0][0]!r}); "
+                "merge or delete the duplicate accounts before adding the unique index on users.email"
+            )
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    if 'search_history' not in tables:
+        op.create_table(
+            'search_history',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('user_uid', sa.String(length=36), nullable=False),
+            sa.Column('search_name', sa.String(length=255), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_uid'], ['users.uid'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_search_history_user_created', 'search_history', ['user_uid', 'created_at'],
+                        unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if 'search_history' in tables:
+        op.drop_index('ix_search_history_user_created', table_name='search_history')
+        op.drop_table('search_history')
+
+    if 'users' in tables and any(index['name'] == 'ix_users_email' for index in inspector.get_indexes('users')):
+        op.drop_index('ix_users_email', table_name='users')
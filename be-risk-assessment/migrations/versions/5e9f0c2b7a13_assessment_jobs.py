@@ -0,0 +1,68 @@
+"""Batch assessment jobs and their items
+
+Revision ID: 5e9f0c2b7a13
+Revises: 8d2b6a4e1c90
+Create Date: 2026-10-18 13:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9f0c2b7a13'
+down_revision = '8d2b6a4e1c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    # Left to db.create_all() if it already made the tables
+    if 'assessment_jobs' not in tables:
+        op.create_table(
+            'assessment_jobs',
+            sa.Column('id', sa.String(length=36), nullable=False),
+            sa.Column('submitted_by', sa.String(length=255), nullable=True),
+            sa.Column('cancelled', sa.Boolean(), nullable=False),
+            sa.Column('total_items', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'assessment_job_items' not in tables:
+        op.create_table(
+            'assessment_job_items',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('job_id', sa.String(length=36), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.Column('search_name', sa.String(length=255), nullable=False),
+            sa.Column('selected_urls', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('max_attempts', sa.Integer(), nullable=False),
+            sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+            sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+            sa.Column('result', sa.Text(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['job_id'], ['assessment_jobs.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_assessment_job_items_job_id', 'assessment_job_items', ['job_id'], unique=False)
+        op.create_index('ix_assessment_job_items_claim', 'assessment_job_items', ['status', 'next_attempt_at'],
+                        unique=False)
+
+
+def downgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'assessment_job_items' in tables:
+        op.drop_index('ix_assessment_job_items_claim', table_name='assessment_job_items')
+        op.drop_index('ix_assessment_job_items_job_id', table_name='assessment_job_items')
+        op.drop_table('assessment_job_items')
+    if 'assessment_jobs' in tables:
+        op.drop_table('assessment_jobs')
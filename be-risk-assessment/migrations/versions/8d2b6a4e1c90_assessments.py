@@ -0,0 +1,48 @@
+"""Stored assessments
+
+Revision ID: 8d2b6a4e1c90
+Revises: 3c7e1f2a9b4d
+Create Date: 2026-10-18 13:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2b6a4e1c90'
+down_revision = '3c7e1f2a9b4d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Left to db.create_all() if it already made the table
+    if 'assessments' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'assessments',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('lookup_key', sa.String(length=64), nullable=False),
+        sa.Column('subject_name', sa.String(length=255), nullable=False),
+        sa.Column('source_urls', sa.Text(), nullable=False),
+        sa.Column('pages', sa.LargeBinary(length=2 ** 24 - 1), nullable=True),
+        sa.Column('attributes', sa.Text(), nullable=False),
+        sa.Column('risk_score', sa.Float(), nullable=False),
+        sa.Column('risk_level', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('assessed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_assessments_lookup_key', 'assessments', ['lookup_key'], unique=True)
+    op.create_index('ix_assessments_assessed_at', 'assessments', ['assessed_at'], unique=False)
+
+
+def downgrade():
+    if 'assessments' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.drop_index('ix_assessments_assessed_at', table_name='assessments')
+    op.drop_index('ix_assessments_lookup_key', table_name='assessments')
+    op.drop_table('assessments')
@@ -0,0 +1,77 @@
+"""Copy users.search_names into search_history
+
+Revision ID: b4f1d7c2e9a6
+Revises: 5e9f0c2b7a13
+Create Date: 2026-10-18 16:10:00.000000
+
+search_names held a user's saved searches as one comma-separated string. Each name becomes a
+search_history row, oldest first in the order the string listed them. Users that already have
+history are skipped, so running this twice copies nothing twice. The column is left in place
+for the downgrade.
+
+"""
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f1d7c2e9a6'
+down_revision = '5e9f0c2b7a13'
+branch_labels = None
+depends_on = None
+
+
+def split_search_names(search_names):
+    """The names in a search_names string, in order, without blanks or repeats."""
+    names = []
+    for name in (search_names or '').split(','):
+        name = name.strip()[:255]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade():
+    bind = op.get_bind()
+    users = bind.execute(sa.text(
+        "SELECT uid, search_names FROM users WHERE search_names IS NOT NULL AND search_names != '' "
+        "AND NOT EXISTS (SELECT 1 FROM search_history WHERE search_history.user_uid = users.uid)"
+    )).fetchall()
+
+    # One second apart, ending now, so the history lists them newest first like later searches
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    rows = []
+    for uid, search_names in users:
+        names = split_search_names(search_names)
+        for position, name in enumerate(names):
+            rows.append({
+                'user_uid': uid,
+                'search_name': name,
+                'created_at': now - timedelta(seconds=len(names) - 1 - position),
+            })
+
+    if rows:
+        bind.execute(sa.text(
+            "INSERT INTO search_history (user_uid, search_name, created_at) "
+            "VALUES (:user_uid, :search_name, :created_at)"
+        ), rows)
+
+
+def downgrade():
+    # Write the history back as the comma-separated string, so searches made since are kept
+    bind = op.get_bind()
+    entries = bind.execute(sa.text(
+        "SELECT user_uid, search_name FROM search_history ORDER BY user_uid, created_at, id"
+    )).fetchall()
+
+    names_by_user = {}
+    for uid, name in entries:
+        names = names_by_user.setdefault(uid, [])
+        if name not in names:
+            names.append(name)
+
+    for uid, names in names_by_user.items():
+        bind.execute(sa.text("UPDATE users SET search_names = :search_names WHERE uid = :uid"),
+                     {'uid': uid, 'search_names': ','.join(names)[:10000]})
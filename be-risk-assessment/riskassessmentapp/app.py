@@ -2,9 +2,10 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
-from flask_bcrypt import Bcrypt
-from riskassessmentapp.extensions import db, bcrypt, mail
+from riskassessmentapp.extensions import db, bcrypt, mail, http_pool, page_cache, llm_cache, search_provider, ranker, dedup_index, domain_health, job_workers, metrics, password_hasher, user_cache
 from flask_cors import CORS
+from riskassessmentapp.logging_config import configure_logging
+from riskassessmentapp.database import REPLICA_BIND, engine_options, init_database
 from dotenv import load_dotenv
 import os
 
@@ -15,6 +16,15 @@ def create_app():
 
     load_dotenv()
 
+    # Logging: LOG_LEVELS takes per-module overrides such as "riskassessmentapp.search.routes=DEBUG"
+    app.config['LOG_LEVEL'] = os.getenv("LOG_LEVEL", "INFO").upper()
+    app.config['LOG_LEVELS'] = os.getenv("LOG_LEVELS", "")
+    app.config['LOG_FORMAT'] = os.getenv("LOG_FORMAT", "text")
+    app.config['LOG_REDACT_PII'] = os.getenv("LOG_REDACT_PII", "true").lower() == "true"
+    app.config['LOG_DEBUG_SAMPLE_RATE'] = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))
+
+    configure_logging(app)
+
     app.config['MAIL_SERVER'] = 'smtp.gmail.com'  # or any SMTP server
     app.config['MAIL_PORT'] = 587
     app.config['MAIL_USE_TLS'] = True
@@ -27,30 +37,182 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("SQLALCHEMY_DATABASE_URI")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Connection pool per worker process (SQLite keeps its default pool); timeouts in seconds
+    app.config['DB_POOL_SIZE'] = int(os.getenv("DB_POOL_SIZE", 5))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    app.config['DB_POOL_PRE_PING'] = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    app.config['DB_CONNECT_TIMEOUT'] = int(os.getenv("DB_CONNECT_TIMEOUT", 10))
+    app.config['DB_READ_TIMEOUT'] = int(os.getenv("DB_READ_TIMEOUT", 0))
+    # Optional read replica for read-only lookups such as /users/details
+    app.config['DB_REPLICA_URI'] = os.getenv("DB_REPLICA_URI")
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+    if app.config['DB_REPLICA_URI']:
+        app.config['SQLALCHEMY_BINDS'] = {
+            REPLICA_BIND: {'url': app.config['DB_REPLICA_URI'],
+                           **engine_options(app.config['DB_REPLICA_URI'], app.config)},
+        }
+
+    # "concurrent" or "sequential" page fetching for /risksearch/
+    app.config['SEARCH_FETCH_MODE'] = os.getenv("SEARCH_FETCH_MODE", "concurrent")
+    app.config['SEARCH_FETCH_CONCURRENCY'] = int(os.getenv("SEARCH_FETCH_CONCURRENCY", 8))
+
+    # "pipelined" or "sequential" fetch-and-clean for /risksearch/extract
+    app.config['EXTRACT_PIPELINE_MODE'] = os.getenv("EXTRACT_PIPELINE_MODE", "pipelined")
+    app.config['EXTRACT_FETCH_CONCURRENCY'] = int(os.getenv("EXTRACT_FETCH_CONCURRENCY", 10))
+    app.config['EXTRACT_LLM_CONCURRENCY'] = int(os.getenv("EXTRACT_LLM_CONCURRENCY", 10))
+    # Seconds between keep-alive comments on /risksearch/extract/stream
+    app.config['EXTRACT_STREAM_HEARTBEAT'] = float(os.getenv("EXTRACT_STREAM_HEARTBEAT", 15))
+    # Request threads per worker when served through riskassessmentapp.asgi
+    app.config['ASGI_THREADS'] = int(os.getenv("ASGI_THREADS", 64))
+
+    # Per-worker outbound HTTP connection pool
+    app.config['HTTP_POOL_LIMIT'] = int(os.getenv("HTTP_POOL_LIMIT", 100))
+    app.config['HTTP_POOL_LIMIT_PER_HOST'] = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 8))
+    app.config['HTTP_POOL_DNS_TTL'] = int(os.getenv("HTTP_POOL_DNS_TTL", 300))
+    app.config['HTTP_POOL_KEEPALIVE_TIMEOUT'] = float(os.getenv("HTTP_POOL_KEEPALIVE_TIMEOUT", 30))
+    # Hard caps on downloaded page bodies (full pages and metadata-only fetches)
+    app.config['HTTP_MAX_BODY_BYTES'] = int(os.getenv("HTTP_MAX_BODY_BYTES", 5 * 1024 * 1024))
+    app.config['HTTP_METADATA_MAX_BODY_BYTES'] = int(os.getenv("HTTP_METADATA_MAX_BODY_BYTES", 512 * 1024))
+
+    http_pool.init_app(app)
+
+    # Persistent HTML page cache behind fetch_url
+    app.config['PAGE_CACHE_ENABLED'] = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+    app.config['PAGE_CACHE_PATH'] = os.getenv("PAGE_CACHE_PATH")
+    app.config['PAGE_CACHE_TTL'] = int(os.getenv("PAGE_CACHE_TTL", 3600))
+    app.config['PAGE_CACHE_MAX_BYTES'] = int(os.getenv("PAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+    page_cache.init_app(app)
+
+    # Per-domain politeness limits, adaptive fetch timeouts and circuit breakers
+    app.config['DOMAIN_HEALTH_ENABLED'] = os.getenv("DOMAIN_HEALTH_ENABLED", "true").lower() == "true"
+    app.config['DOMAIN_RATE'] = float(os.getenv("DOMAIN_RATE", 1))
+    app.config['DOMAIN_BURST'] = int(os.getenv("DOMAIN_BURST", 3))
+    app.config['DOMAIN_MAX_WAIT'] = float(os.getenv("DOMAIN_MAX_WAIT", 10))
+    app.config['DOMAIN_TIMEOUT_MIN'] = float(os.getenv("DOMAIN_TIMEOUT_MIN", 3))
+    app.config['DOMAIN_TIMEOUT_MAX'] = float(os.getenv("DOMAIN_TIMEOUT_MAX", 15))
+    app.config['DOMAIN_TIMEOUT_PERCENTILE'] = float(os.getenv("DOMAIN_TIMEOUT_PERCENTILE", 95))
+    app.config['DOMAIN_TIMEOUT_MULTIPLIER'] = float(os.getenv("DOMAIN_TIMEOUT_MULTIPLIER", 2))
+    app.config['DOMAIN_LATENCY_SAMPLES'] = int(os.getenv("DOMAIN_LATENCY_SAMPLES", 50))
+    app.config['DOMAIN_MIN_SAMPLES'] = int(os.getenv("DOMAIN_MIN_SAMPLES", 5))
+    app.config['DOMAIN_FAILURE_THRESHOLD'] = int(os.getenv("DOMAIN_FAILURE_THRESHOLD", 3))
+    app.config['DOMAIN_COOLDOWN'] = float(os.getenv("DOMAIN_COOLDOWN", 60))
+    app.config['DOMAIN_MAX_COOLDOWN'] = float(os.getenv("DOMAIN_MAX_COOLDOWN", 900))
+    app.config['DOMAIN_MAX_TRACKED'] = int(os.getenv("DOMAIN_MAX_TRACKED", 2048))
+
+    domain_health.init_app(app)
+
+    # Content-addressed cache of GPT cleaning and extraction results
+    app.config['LLM_CACHE_ENABLED'] = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    app.config['LLM_CACHE_PATH'] = os.getenv("LLM_CACHE_PATH")
+    app.config['LLM_CACHE_TTL'] = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+    app.config['LLM_CACHE_MAX_BYTES'] = int(os.getenv("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    llm_cache.init_app(app)
+
+    # Search provider executor, query cache and pacing
+    app.config['SEARCH_PROVIDER_WORKERS'] = int(os.getenv("SEARCH_PROVIDER_WORKERS", 2))
+    app.config['SEARCH_PROVIDER_CACHE_TTL'] = int(os.getenv("SEARCH_PROVIDER_CACHE_TTL", 600))
+    app.config['SEARCH_PROVIDER_CACHE_SIZE'] = int(os.getenv("SEARCH_PROVIDER_CACHE_SIZE", 512))
+    app.config['SEARCH_PROVIDER_MIN_INTERVAL'] = float(os.getenv("SEARCH_PROVIDER_MIN_INTERVAL", 2))
+    # Pause between the result pages of one search; Google returns 10 results per page
+    app.config['SEARCH_PROVIDER_PAGE_PAUSE'] = float(os.getenv("SEARCH_PROVIDER_PAGE_PAUSE", 2))
+    # "module:function" taking (query, num_results) to call instead of the Google search packages
+    app.config['SEARCH_PROVIDER_BACKEND'] = os.getenv("SEARCH_PROVIDER_BACKEND")
+
+    search_provider.init_app(app)
+
+    # Search result ranking: "keyword" or "embedding" (sentence-transformers, with keyword fallback)
+    app.config['RANKING_MODE'] = os.getenv("RANKING_MODE", "keyword")
+    app.config['RANKING_MODEL'] = os.getenv("RANKING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    app.config['RANKING_BUDGET_SECONDS'] = float(os.getenv("RANKING_BUDGET_SECONDS", 0.25))
+    app.config['RANKING_CACHE_SIZE'] = int(os.getenv("RANKING_CACHE_SIZE", 4096))
+    app.config['RANKING_PRELOAD'] = os.getenv("RANKING_PRELOAD", "true").lower() == "true"
+
+    ranker.init_app(app)
+
+    # Loading done in the gunicorn master before forking, shared by the workers (see riskassessmentapp.warmup)
+    app.config['WARMUP_ENABLED'] = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    # Also load the embedding ranking model before forking instead of in each worker
+    app.config['WARMUP_RANKING_MODEL'] = os.getenv("WARMUP_RANKING_MODEL", "false").lower() == "true"
+
+    # Near-duplicate page detection, so copies of a page share one GPT cleaning call
+    app.config['DEDUP_ENABLED'] = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    app.config['DEDUP_MAX_DISTANCE'] = int(os.getenv("DEDUP_MAX_DISTANCE", 3))
+    app.config['DEDUP_MIN_WORDS'] = int(os.getenv("DEDUP_MIN_WORDS", 50))
+    app.config['DEDUP_TTL'] = int(os.getenv("DEDUP_TTL", 1800))
+    app.config['DEDUP_MAX_ENTRIES'] = int(os.getenv("DEDUP_MAX_ENTRIES", 2048))
+
+    dedup_index.init_app(app)
+
+    # Batch assessment job queue and worker pool
+    app.config['JOB_WORKERS'] = int(os.getenv("JOB_WORKERS", 2))
+    app.config['JOB_POLL_INTERVAL'] = float(os.getenv("JOB_POLL_INTERVAL", 2))
+    app.config['JOB_LEASE_SECONDS'] = int(os.getenv("JOB_LEASE_SECONDS", 900))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    app.config['JOB_RETRY_BACKOFF'] = float(os.getenv("JOB_RETRY_BACKOFF", 30))
+    app.config['JOB_WORKERS_AUTOSTART'] = os.getenv("JOB_WORKERS_AUTOSTART", "false").lower() == "true"
+
+    job_workers.init_app(app)
+
+    # Stored assessments served by /risksearch/extract while younger than ASSESSMENT_MAX_AGE seconds
+    app.config['ASSESSMENT_STORE_ENABLED'] = os.getenv("ASSESSMENT_STORE_ENABLED", "true").lower() == "true"
+    app.config['ASSESSMENT_MAX_AGE'] = int(os.getenv("ASSESSMENT_MAX_AGE", 24 * 3600))
+
+    # Prometheus metrics on /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    app.config['METRICS_ENABLED'] = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    app.config['METRICS_MAX_DOMAINS'] = int(os.getenv("METRICS_MAX_DOMAINS", 200))
+
+    metrics.init_app(app)
+
+
+    # Password hashing: bcrypt work factor, hashing threads and how many hashes may wait for one
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    app.config['BCRYPT_WORKERS'] = int(os.getenv("BCRYPT_WORKERS", 2))
+    app.config['BCRYPT_MAX_PENDING'] = int(os.getenv("BCRYPT_MAX_PENDING", 64))
+
+    bcrypt.init_app(app)
+    password_hasher.init_app(app)
+
+    # Users loaded for authenticated requests are cached for USER_CACHE_TTL seconds (0 disables it)
+    app.config['USER_CACHE_TTL'] = float(os.getenv("USER_CACHE_TTL", 30))
+    app.config['USER_CACHE_SIZE'] = int(os.getenv("USER_CACHE_SIZE", 4096))
+
+    user_cache.init_app(app)
+
+    # Comma-separated emails of the users allowed on the /admin endpoints; none by default
+    app.config['ADMIN_EMAILS'] = frozenset(
+        email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip())
 
     app.secret_key = os.getenv("SECRET_KEY")
 
     db.init_app(app)
+    init_database(app)
 
     login_manager = LoginManager()
     login_manager.init_app(app)
 
     from riskassessmentapp.users.models import User
+    from riskassessmentapp.jobs.models import AssessmentJob, AssessmentJobItem
+    from riskassessmentapp.search.models import Assessment
 
     @login_manager.user_loader
     def load_user(uid):
-        return User.query.get(uid)
+        return user_cache.load(db.session, User, uid)
     
     @login_manager.unauthorized_handler
     def unauthorized_callback():
         return "unauthorized"
     
-    bcrypt = Bcrypt(app)
-
     from riskassessmentapp.users.routes import users
     app.register_blueprint(users, url_prefix='/users')
     from riskassessmentapp.search.routes import risksearch
     app.register_blueprint(risksearch, url_prefix='/risksearch')
+    from riskassessmentapp.jobs.routes import jobs
+    app.register_blueprint(jobs, url_prefix='/jobs')
 
     migrate = Migrate(app, db)
 
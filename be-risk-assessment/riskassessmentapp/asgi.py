@@ -0,0 +1,12 @@
+"""
+Production entry point: the app under gunicorn with uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py riskassessmentapp.asgi:application
+
+run.py remains the development server.
+"""
+from riskassessmentapp.app import create_app
+from riskassessmentapp.serving import make_asgi_app
+
+flask_app = create_app()
+application = make_asgi_app(flask_app)
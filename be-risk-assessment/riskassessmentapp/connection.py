@@ -0,0 +1,56 @@
+import asyncio
+import contextvars
+import threading
+
+# The client connection of the request being handled, set by riskassessmentapp.serving.AsgiApp.
+# The request thread runs in a copy of the server task's context, so it sees the value too.
+current_connection = contextvars.ContextVar("current_connection", default=None)
+
+
+class ClientConnection:
+    """
+    A client connection of the ASGI server, as seen from the request thread that handles it.
+
+    Coroutines started with run() execute on the server's event loop, so every request of a worker
+    shares that loop and whatever is bound to it (the OpenAI client, tasks still in flight). They
+    are cancelled when the client disconnects, so an abandoned request stops fetching pages and
+    calling GPT.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.disconnected = False
+        self._lock = threading.Lock()
+        self._futures = set()
+
+    def run(self, coroutine):
+        """
+        Schedule coroutine on the server's event loop.
+
+        Args:
+            coroutine (coroutine): The coroutine to run
+
+        Returns:
+            concurrent.futures.Future: Its outcome, cancelled if the client disconnects first
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        with self._lock:
+            if self.disconnected:
+                future.cancel()
+                return future
+            self._futures.add(future)
+        # Outside the lock: the callback runs right away if the future is already done
+        future.add_done_callback(self._discard)
+        return future
+
+    def disconnect(self):
+        """Cancel everything still running for this connection; called when the client goes away."""
+        with self._lock:
+            self.disconnected = True
+            futures, self._futures = self._futures, set()
+        for future in futures:
+            future.cancel()
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
@@ -0,0 +1,119 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from riskassessmentapp.extensions import db
+from riskassessmentapp.metrics import DB_CONNECTIONS, DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS
+
+REPLICA_BIND = "replica"
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection, and checkout timeouts."""
+
+    metrics_label = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_label).observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # Called after a fork or dispose(); keep the label on the new pool
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+def engine_options(uri, config):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for uri from the DB_* settings in config.
+
+    Every database gets pre-ping and recycling, so connections the server (or a proxy) closed while
+    idle are replaced instead of failing the next request. Pool sizing and the instrumented pool
+    only apply to server databases; SQLite keeps SQLAlchemy's own pool for it.
+
+    Args:
+        uri (str): The database URI
+        config (dict): The application config
+
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    if not uri:
+        return options
+
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+    })
+    if url.get_backend_name() == "mysql":
+        connect_args = {'connect_timeout': config['DB_CONNECT_TIMEOUT']}
+        if config['DB_READ_TIMEOUT']:
+            connect_args['read_timeout'] = config['DB_READ_TIMEOUT']
+            connect_args['write_timeout'] = config['DB_READ_TIMEOUT']
+        options['connect_args'] = connect_args
+    return options
+
+
+def instrument_engine(engine, label):
+    """Keep the open and checked-out connection gauges of engine's pool up to date."""
+    engine.pool.metrics_label = label
+    open_connections = DB_CONNECTIONS.labels(label, "open")
+    checked_out = DB_CONNECTIONS.labels(label, "checked_out")
+
+    event.listen(engine, "connect", lambda *args: open_connections.inc())
+    event.listen(engine, "close", lambda *args: open_connections.dec())
+    event.listen(engine, "detach", lambda *args: open_connections.dec())
+    event.listen(engine, "checkout", lambda *args: checked_out.inc())
+    event.listen(engine, "checkin", lambda *args: checked_out.dec())
+
+
+def init_database(app):
+    """Instrument the engines db.init_app(app) created."""
+    with app.app_context():
+        for name, engine in db.engines.items():
+            instrument_engine(engine, name or "primary")
+
+
+def read_engine():
+    """The replica engine if DB_REPLICA_URI is set, otherwise the primary."""
+    return db.engines.get(REPLICA_BIND) or db.engine
+
+
+def read_first(statement):
+    """
+    Run a read-only select on the replica and return the first entity, or None.
+
+    A replica can lag behind the primary, so a row that is not found there yet (such as a user who
+    just signed up) is looked up on the primary before giving up.
+
+    Args:
+        statement (Select): The query, e.g. select(User).where(User.email == email)
+
+    Returns:
+        The first entity the query returns, attached to db.session, or None
+    """
+    engine = read_engine()
+    result = db.session.execute(statement, bind_arguments={'bind': engine}).scalars().first()
+    if result is None and engine is not db.engine:
+        result = db.session.execute(statement).scalars().first()
+    return result
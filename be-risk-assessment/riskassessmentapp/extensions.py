@@ -1,7 +1,29 @@
 from flask_bcrypt import Bcrypt
 from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail
+from riskassessmentapp.http_pool import HttpClientPool
+from riskassessmentapp.search.page_cache import PageCache
+from riskassessmentapp.search.llm_cache import LLMResultCache
+from riskassessmentapp.search.provider import SearchProvider
+from riskassessmentapp.search.ranking import EmbeddingRanker
+from riskassessmentapp.search.dedup import NearDuplicateIndex
+from riskassessmentapp.search.domain_health import DomainHealthRegistry
+from riskassessmentapp.jobs.worker import JobWorkerPool
+from riskassessmentapp.metrics import Metrics
+from riskassessmentapp.users.cache import UserCache
+from riskassessmentapp.users.passwords import PasswordHasher
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
-mail = Mail()
\ No newline at end of file
+mail = Mail()
+http_pool = HttpClientPool()
+page_cache = PageCache()
+llm_cache = LLMResultCache()
+search_provider = SearchProvider()
+ranker = EmbeddingRanker()
+dedup_index = NearDuplicateIndex()
+domain_health = DomainHealthRegistry()
+job_workers = JobWorkerPool()
+metrics = Metrics()
+password_hasher = PasswordHasher()
+user_cache = UserCache()
@@ -0,0 +1,182 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+
+from aiohttp import ClientSession, TCPConnector, TraceConfig
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientPool:
+    """
+    Long-lived aiohttp connection pool shared by every request handled by a worker process.
+
+    aiohttp sessions are bound to the event loop they were created on, while async views run on the
+    ASGI server's loop, on a short-lived loop per request under the development server, or on a job
+    worker's loop. The pool therefore owns a background event loop thread and runs the work that
+    needs a connection on that loop, so TCP/TLS connections and DNS lookups are reused across all
+    of them. The loop is started lazily and restarted after a fork, so the pool is safe to
+    create before gunicorn forks its workers.
+    """
+
+    def __init__(self, app=None):
+        self.limit = 100
+        self.limit_per_host = 8
+        self.dns_cache_ttl = 300
+        self.keepalive_timeout = 30
+        self.max_body_bytes = 5 * 1024 * 1024
+        self.metadata_max_body_bytes = 512 * 1024
+        self.close_timeout = 5
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._counters = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.limit = app.config.get('HTTP_POOL_LIMIT', self.limit)
+        self.limit_per_host = app.config.get('HTTP_POOL_LIMIT_PER_HOST', self.limit_per_host)
+        self.dns_cache_ttl = app.config.get('HTTP_POOL_DNS_TTL', self.dns_cache_ttl)
+        self.keepalive_timeout = app.config.get('HTTP_POOL_KEEPALIVE_TIMEOUT', self.keepalive_timeout)
+        self.max_body_bytes = app.config.get('HTTP_MAX_BODY_BYTES', self.max_body_bytes)
+        self.metadata_max_body_bytes = app.config.get('HTTP_METADATA_MAX_BODY_BYTES', self.metadata_max_body_bytes)
+
+        app.extensions['http_pool'] = self
+        atexit.register(self.close)
+
+    async def run(self, fn):
+        """
+        Run fn(session) on the pool's event loop and return its result.
+
+        Args:
+            fn (callable): Takes the pooled ClientSession and returns a coroutine
+
+        Returns:
+            The result of the coroutine. Cancelling the caller cancels the work on the pool loop.
+        """
+        loop = self._ensure_started()
+        if asyncio.get_running_loop() is loop:
+            return await fn(self._session)
+
+        future = asyncio.run_coroutine_threadsafe(fn(self._session), loop)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        """
+        Return a snapshot of the pool configuration and connection counters.
+
+        Returns:
+            dict: open, idle and in-use connections plus created/reused connection and DNS counters
+        """
+        stats = {
+            "running": False,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "dns_cache_ttl": self.dns_cache_ttl,
+            "keepalive_timeout": self.keepalive_timeout,
+        }
+
+        with self._lock:
+            loop = self._loop if self._pid == os.getpid() else None
+
+        if loop is None:
+            stats.update(self._empty_counters())
+            stats.update({"open_connections": 0, "idle_connections": 0, "in_use_connections": 0})
+            return stats
+
+        stats["running"] = True
+        stats.update(asyncio.run_coroutine_threadsafe(self._snapshot(), loop).result(self.close_timeout))
+        return stats
+
+    def close(self):
+        """Close the pooled session and stop the pool's event loop thread."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            loop, thread, session = self._loop, self._thread, self._session
+            self._loop = self._thread = self._session = None
+            self._pid = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(session.close(), loop).result(self.close_timeout)
+        except Exception as e:
+            logger.warning("Error closing HTTP pool session: %s", e)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(self.close_timeout)
+            if not thread.is_alive():
+                loop.close()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return self._loop
+
+            # Either first use or we are in a freshly forked worker whose parent's loop thread did not survive
+            self._counters = self._empty_counters()
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run_loop, args=(loop,), name="http-pool", daemon=True)
+            thread.start()
+            self._session = asyncio.run_coroutine_threadsafe(self._create_session(), loop).result()
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            return loop
+
+    @staticmethod
+    def _run_loop(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @staticmethod
+    def _empty_counters():
+        return {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+        }
+
+    async def _create_session(self):
+        counters = self._counters
+
+        def counting(name):
+            async def on_signal(session, context, params):
+                counters[name] += 1
+            return on_signal
+
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(counting("requests"))
+        trace_config.on_connection_create_end.append(counting("connections_created"))
+        trace_config.on_connection_reuseconn.append(counting("connections_reused"))
+        trace_config.on_dns_cache_hit.append(counting("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(counting("dns_cache_misses"))
+
+        connector = TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return ClientSession(connector=connector, trace_configs=[trace_config])
+
+    async def _snapshot(self):
+        connector = self._session.connector
+        # aiohttp does not expose these publicly; idle connections are kept per host key in _conns
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        in_use = len(getattr(connector, "_acquired", ()))
+
+        snapshot = dict(self._counters)
+        snapshot.update({
+            "open_connections": idle + in_use,
+            "idle_connections": idle,
+            "in_use_connections": in_use,
+        })
+        return snapshot
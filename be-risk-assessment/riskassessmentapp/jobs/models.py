@@ -0,0 +1,98 @@
+import json
+import uuid
+
+from riskassessmentapp.extensions import db
+from riskassessmentapp.utils import utcnow
+
+JOB_ITEM_TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class AssessmentJob(db.Model):
+    __tablename__ = 'assessment_jobs'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    submitted_by = db.Column(db.String(255), nullable=True)
+    cancelled = db.Column(db.Boolean, nullable=False, default=False)
+    total_items = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+
+    items = db.relationship('AssessmentJobItem', backref='job', lazy='dynamic',
+                            order_by='AssessmentJobItem.position')
+
+    def __repr__(self):
+        return f'<AssessmentJob: {self.id}>'
+
+    def status_counts(self):
+        counts = dict(
+            db.session.query(AssessmentJobItem.status, db.func.count(AssessmentJobItem.id))
+            .filter(AssessmentJobItem.job_id == self.id)
+            .group_by(AssessmentJobItem.status)
+            .all()
+        )
+        return {status: counts.get(status, 0)
+                for status in ('pending', 'running', 'completed', 'failed', 'cancelled')}
+
+    def to_json_response(self):
+        counts = self.status_counts()
+        finished = sum(counts[status] for status in JOB_ITEM_TERMINAL_STATUSES)
+
+        if self.cancelled:
+            status = 'cancelled'
+        elif finished == self.total_items:
+            status = 'completed'
+        elif counts['pending'] == self.total_items:
+            status = 'pending'
+        else:
+            status = 'running'
+
+        return {
+            "jobId": self.id,
+            "status": status,
+            "totalItems": self.total_items,
+            "finishedItems": finished,
+            "progress": finished / self.total_items if self.total_items else 1.0,
+            "counts": counts,
+            "createdAt": self.created_at.isoformat(),
+            "updatedAt": self.updated_at.isoformat(),
+        }
+
+
+class AssessmentJobItem(db.Model):
+    __tablename__ = 'assessment_job_items'
+    __table_args__ = (
+        db.Index('ix_assessment_job_items_claim', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_id = db.Column(db.String(36), db.ForeignKey('assessment_jobs.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    search_name = db.Column(db.String(255), nullable=False)
+    selected_urls = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+
+    def __repr__(self):
+        return f'<AssessmentJobItem: {self.job_id}/{self.position} {self.status}>'
+
+    @property
+    def urls(self):
+        return json.loads(self.selected_urls)
+
+    def to_json_response(self):
+        return {
+            "position": self.position,
+            "searchName": self.search_name,
+            "selectedUrls": self.urls,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error,
+        }
@@ -0,0 +1,111 @@
+import json
+
+from flask import make_response, request, jsonify, Blueprint, current_app
+from flask_login import current_user
+
+from riskassessmentapp.extensions import db
+from riskassessmentapp.jobs.models import AssessmentJob, AssessmentJobItem
+from riskassessmentapp.jobs.store import cancel_job
+from riskassessmentapp.users.auth import admin_required, is_admin
+
+jobs = Blueprint('jobs', __name__)
+
+MAX_JOB_ITEMS = 1000
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def json_response(body, status_code):
+    response = make_response(jsonify(body))
+    response.status_code = status_code
+    response.headers['content-type'] = 'application/json'
+    return response
+
+
+@jobs.route('/', methods=['POST'])
+def submit_job():
+    """
+    Queue a batch assessment.
+
+    Expects {"items": [{"searchName": ..., "selectedUrls": [...]}, ...]} and returns the job id
+    immediately; the items are processed by the job worker pool.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return json_response({'message': 'Fields are missing'}, 400)
+    if len(items) > MAX_JOB_ITEMS:
+        return json_response({'message': f'A job can have at most {MAX_JOB_ITEMS} items'}, 400)
+
+    for item in items:
+        if not isinstance(item, dict) or not item.get('searchName') or not isinstance(item.get('selectedUrls'), list):
+            return json_response({'message': 'Every item needs a searchName and a list of selectedUrls'}, 400)
+
+    max_attempts = current_app.config.get('JOB_MAX_ATTEMPTS', 3)
+    job = AssessmentJob(
+        submitted_by=current_user.uid if current_user.is_authenticated else None,
+        total_items=len(items),
+    )
+    db.session.add(job)
+    db.session.flush()
+
+    db.session.add_all([
+        AssessmentJobItem(job_id=job.id, position=position, search_name=item['searchName'],
+                          selected_urls=json.dumps(item['selectedUrls']), max_attempts=max_attempts)
+        for position, item in enumerate(items)
+    ])
+    db.session.commit()
+
+    return json_response({'message': 'Job queued', 'jobId': job.id}, 202)
+
+
+@jobs.route('/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = db.session.get(AssessmentJob, job_id)
+    if job is None:
+        return json_response({'message': 'Job not found'}, 404)
+    return json_response(job.to_json_response(), 200)
+
+
+@jobs.route('/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """Return the job's items, results and errors, paginated with ?page=&pageSize=."""
+    job = db.session.get(AssessmentJob, job_id)
+    if job is None:
+        return json_response({'message': 'Job not found'}, 404)
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('pageSize', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+    items = job.items.offset((page - 1) * page_size).limit(page_size).all()
+
+    body = job.to_json_response()
+    body.update({
+        'page': page,
+        'pageSize': page_size,
+        'results': [item.to_json_response() for item in items],
+    })
+    return json_response(body, 200)
+
+
+@jobs.route('/<job_id>/cancel', methods=['POST'])
+def cancel(job_id):
+    """Cancel a job; only the user who submitted it or an administrator may."""
+    if not current_user.is_authenticated:
+        return json_response({'message': 'Login required'}, 401)
+
+    job = db.session.get(AssessmentJob, job_id)
+    if job is None:
+        return json_response({'message': 'Job not found'}, 404)
+    # Jobs submitted without a login have no owner, so only an administrator can cancel them
+    if job.submitted_by != current_user.uid and not is_admin(current_user):
+        return json_response({'message': 'Not allowed to cancel this job'}, 403)
+
+    cancel_job(job)
+    return json_response(job.to_json_response(), 200)
+
+
+@jobs.route('/admin/workers', methods=['GET'])
+@admin_required
+def worker_stats():
+    return jsonify(current_app.extensions['job_workers'].stats())
@@ -0,0 +1,118 @@
+import json
+import logging
+from datetime import timedelta
+
+from riskassessmentapp.extensions import db
+from riskassessmentapp.jobs.models import AssessmentJob, AssessmentJobItem
+from riskassessmentapp.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next_item(lease_seconds):
+    """
+    Claim the oldest runnable item.
+
+    Args:
+        lease_seconds (int): How long the claim is valid before the item is requeued
+
+    Returns:
+        AssessmentJobItem: The claimed item, or None if the queue is empty
+    """
+    while True:
+        now = utcnow()
+        candidate = (
+            db.session.query(AssessmentJobItem.id)
+            .filter(AssessmentJobItem.status == 'pending', AssessmentJobItem.next_attempt_at <= now)
+            .order_by(AssessmentJobItem.next_attempt_at, AssessmentJobItem.id)
+            .first()
+        )
+        if candidate is None:
+            db.session.commit()
+            return None
+
+        # Only one worker can win the pending -> running transition for a given item
+        claimed = (
+            AssessmentJobItem.query
+            .filter_by(id=candidate.id, status='pending')
+            .update({
+                AssessmentJobItem.status: 'running',
+                AssessmentJobItem.attempts: AssessmentJobItem.attempts + 1,
+                AssessmentJobItem.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                AssessmentJobItem.updated_at: now,
+            }, synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed:
+            return db.session.get(AssessmentJobItem, candidate.id)
+
+
+def requeue_expired_items():
+    """Put items whose worker lease has expired back in the queue, or fail them if out of attempts."""
+    now = utcnow()
+    expired = AssessmentJobItem.query.filter(AssessmentJobItem.status == 'running',
+                                             AssessmentJobItem.lease_expires_at < now)
+
+    expired.filter(AssessmentJobItem.attempts >= AssessmentJobItem.max_attempts).update({
+        AssessmentJobItem.status: 'failed',
+        AssessmentJobItem.error: "Worker lease expired",
+        AssessmentJobItem.lease_expires_at: None,
+        AssessmentJobItem.updated_at: now,
+    }, synchronize_session=False)
+    expired.update({
+        AssessmentJobItem.status: 'pending',
+        AssessmentJobItem.next_attempt_at: now,
+        AssessmentJobItem.lease_expires_at: None,
+        AssessmentJobItem.updated_at: now,
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def complete_item(item_id, attempts, result):
+    _finish_item(item_id, attempts, {
+        AssessmentJobItem.status: 'completed',
+        AssessmentJobItem.result: json.dumps(result),
+        AssessmentJobItem.error: None,
+    })
+
+
+def fail_item(item_id, attempts, error, retry_backoff):
+    """Requeue a failed item with exponential backoff, or mark it failed once it is out of attempts."""
+    item = db.session.get(AssessmentJobItem, item_id)
+    cancelled = db.session.query(AssessmentJob.cancelled).filter_by(id=item.job_id).scalar()
+
+    if cancelled:
+        values = {AssessmentJobItem.status: 'cancelled'}
+    elif attempts < item.max_attempts:
+        delay = retry_backoff * (2 ** (attempts - 1))
+        values = {AssessmentJobItem.status: 'pending',
+                  AssessmentJobItem.next_attempt_at: utcnow() + timedelta(seconds=delay)}
+    else:
+        values = {AssessmentJobItem.status: 'failed'}
+
+    logger.warning("Job %s item %s failed on attempt %s: %s", item.job_id, item.position, attempts, error)
+    values[AssessmentJobItem.error] = error
+    _finish_item(item_id, attempts, values)
+
+
+def _finish_item(item_id, attempts, values):
+    values.update({AssessmentJobItem.lease_expires_at: None, AssessmentJobItem.updated_at: utcnow()})
+    # A worker whose lease expired must not overwrite the item after it was requeued and claimed again
+    (
+        AssessmentJobItem.query
+        .filter_by(id=item_id, status='running', attempts=attempts)
+        .update(values, synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def cancel_job(job):
+    """Cancel a job: pending items are cancelled now, running items finish their current attempt."""
+    job.cancelled = True
+    (
+        AssessmentJobItem.query
+        .filter_by(job_id=job.id, status='pending')
+        .update({AssessmentJobItem.status: 'cancelled', AssessmentJobItem.updated_at: utcnow()},
+                synchronize_session=False)
+    )
+    db.session.commit()
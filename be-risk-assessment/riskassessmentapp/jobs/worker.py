@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+NO_RELEVANT_DATA_MESSAGE = "No relevant data found about this person."
+
+
+class JobWorkerPool:
+    """
+    Pool of worker threads that process queued AssessmentJobItems.
+
+    The queue lives in the database, so pending work survives restarts. A worker claims an item with
+    a conditional UPDATE (only one worker can move it from pending to running) and holds it under a
+    lease; items whose lease expires, because the worker died or the process restarted, are put back
+    in the queue. Failed items, including assessments whose pages or GPT calls all failed, are retried
+    with exponential backoff until max_attempts is reached.
+    Every worker runs assess_person on its own event loop, so a batch never ties up a request thread.
+    """
+
+    def __init__(self, app=None):
+        self.workers = 2
+        self.poll_interval = 2.0
+        self.lease_seconds = 900
+        self.max_attempts = 3
+        self.retry_backoff = 30.0
+        self.autostart = False
+
+        self.app = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._threads = []
+        self._stop = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('JOB_WORKERS', self.workers)
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', self.poll_interval)
+        self.lease_seconds = app.config.get('JOB_LEASE_SECONDS', self.lease_seconds)
+        self.max_attempts = app.config.get('JOB_MAX_ATTEMPTS', self.max_attempts)
+        self.retry_backoff = app.config.get('JOB_RETRY_BACKOFF', self.retry_backoff)
+        self.autostart = app.config.get('JOB_WORKERS_AUTOSTART', self.autostart)
+        self.app = app
+
+        app.extensions['job_workers'] = self
+
+        if self.autostart:
+            # Started on the first request rather than here so every forked worker process gets its own threads
+            app.before_request(self.start)
+
+        @app.cli.command('run-job-workers')
+        def run_job_workers():
+            """Process queued assessment jobs until interrupted."""
+            self.start()
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                self.stop()
+
+    def start(self):
+        """Start the worker threads in this process if they are not already running."""
+        with self._lock:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._stop = threading.Event()
+            self._threads = [
+                threading.Thread(target=self._run, args=(self._stop,), name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            self._pid = os.getpid()
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the workers to exit after their current item and wait for them."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            self._stop.set()
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            running = self._pid == os.getpid() and any(thread.is_alive() for thread in self._threads)
+        return {
+            "running": running,
+            "workers": self.workers,
+            "poll_interval": self.poll_interval,
+            "lease_seconds": self.lease_seconds,
+            "max_attempts": self.max_attempts,
+            "retry_backoff": self.retry_backoff,
+        }
+
+    def _run(self, stop):
+        # The queue functions need the models, which import the extensions module this pool is created in
+        from riskassessmentapp.jobs.store import claim_next_item, requeue_expired_items
+
+        while not stop.is_set():
+            try:
+                with self.app.app_context():
+                    requeue_expired_items()
+                    item = claim_next_item(self.lease_seconds)
+                    if item is None:
+                        stop.wait(self.poll_interval)
+                        continue
+                    self._process(item)
+            except Exception as e:
+                logger.exception("Job worker error: %s", e)
+                stop.wait(self.poll_interval)
+
+    def _process(self, item):
+        from riskassessmentapp.extensions import db
+        from riskassessmentapp.jobs.store import complete_item, fail_item
+        from riskassessmentapp.search.routes import assess_person
+
+        config = self.app.config
+        item_id, attempts, search_name, urls = item.id, item.attempts, item.search_name, item.urls
+        logger.info("Processing job %s item %s, attempt %s", item.job_id, item.position, attempts)
+        # Give the connection back to the pool while the assessment runs
+        db.session.close()
+
+        try:
+            dictionary = asyncio.run(assess_person(
+                search_name, urls,
+                pipeline_mode=config.get('EXTRACT_PIPELINE_MODE', "pipelined"),
+                fetch_concurrency=config.get('EXTRACT_FETCH_CONCURRENCY', 10),
+                llm_concurrency=config.get('EXTRACT_LLM_CONCURRENCY', 10),
+                raise_on_failure=True))
+        except Exception as e:
+            db.session.rollback()
+            fail_item(item_id, attempts, str(e), self.retry_backoff)
+            return
+
+        if dictionary is None:
+            dictionary = {"message": NO_RELEVANT_DATA_MESSAGE}
+        complete_item(item_id, attempts, dictionary)
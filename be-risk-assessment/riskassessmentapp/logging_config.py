@@ -0,0 +1,128 @@
+import contextvars
+import json
+import logging
+import random
+import sys
+import time
+
+# Whether the DEBUG records of the request being handled are kept; None outside of a request
+debug_sampled = contextvars.ContextVar("debug_sampled", default=None)
+
+# Set by configure_logging; Redacted values are masked while this is true
+redact_pii = True
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+
+class Redacted:
+    """
+    A PII value passed as a logging argument.
+
+    It is only turned into text if the record is emitted, and then shows the value's length rather
+    than the value itself unless LOG_REDACT_PII is off.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        if not redact_pii:
+            return str(self.value)
+        return f"<redacted {len(str(self.value))} chars>"
+
+    __repr__ = __str__
+
+
+class AttributeSummary:
+    """An attributes dictionary passed as a logging argument; redacted, it shows how many values each attribute has."""
+
+    __slots__ = ("attributes",)
+
+    def __init__(self, attributes):
+        self.attributes = attributes
+
+    def __str__(self):
+        if not redact_pii:
+            return str({key: sorted(map(str, value)) if isinstance(value, (set, list)) else value
+                        for key, value in self.attributes.items()})
+        return str({key: len(value) if isinstance(value, (set, list)) else 1
+                    for key, value in self.attributes.items() if value})
+
+    __repr__ = __str__
+
+
+class DebugSampleFilter(logging.Filter):
+    """Drop the DEBUG records of the requests that were not picked for debug output."""
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or debug_sampled.get() is not False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the exception if there is one."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(spec):
+    """Parse "module=LEVEL,other.module=LEVEL" into a dictionary."""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(app):
+    """
+    Set up the application's loggers from LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_REDACT_PII and
+    LOG_DEBUG_SAMPLE_RATE.
+
+    Messages are formatted with %-style arguments, so a record below the configured level costs one
+    level check. When DEBUG is enabled, only LOG_DEBUG_SAMPLE_RATE of the requests get their debug
+    records written.
+
+    Args:
+        app (Flask): The application whose config holds the logging settings
+    """
+    global redact_pii
+    redact_pii = app.config.get('LOG_REDACT_PII', True)
+    sample_rate = app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)
+
+    handler = logging.StreamHandler(sys.stdout)
+    if app.config.get('LOG_FORMAT') == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+        formatter.converter = time.gmtime
+        handler.setFormatter(formatter)
+    handler.addFilter(DebugSampleFilter())
+
+    # Only the application's own loggers; libraries keep whatever the server configured for them
+    logger = logging.getLogger("riskassessmentapp")
+    for existing in list(logger.handlers):
+        logger.removeHandler(existing)
+    logger.addHandler(handler)
+    logger.setLevel(app.config.get('LOG_LEVEL', "INFO"))
+    logger.propagate = False
+
+    for name, level in parse_levels(app.config.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level)
+
+    if sample_rate < 1:
+        # Decided once per request, so a sampled request keeps all of its debug records
+        @app.before_request
+        def sample_debug_output():
+            debug_sampled.set(random.random() < sample_rate)
@@ -0,0 +1,198 @@
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages are mostly CPU work measured in milliseconds; fetches and GPT calls take seconds
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+IO_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Label values are bounded: domains beyond the first max_domains seen by a process share one label
+OTHER_DOMAIN = "other"
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'riskassessment_http_request_seconds', 'Time to produce the response of an API request',
+    ['endpoint', 'method', 'status'], buckets=REQUEST_BUCKETS)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'riskassessment_http_requests_in_flight', 'API requests being handled',
+    ['endpoint'], multiprocess_mode='livesum')
+STAGE_SECONDS = Histogram(
+    'riskassessment_stage_seconds', 'Time spent in one pipeline stage: search_provider, html_parse, '
+    'pii_rules, pii_merge, scoring or ranking', ['stage'], buckets=STAGE_BUCKETS)
+FETCH_SECONDS = Histogram(
+    'riskassessment_fetch_seconds', 'Time to fetch one page, by domain and HTTP status or failure',
+    ['domain', 'status'], buckets=IO_BUCKETS)
+LLM_CALL_SECONDS = Histogram(
+    'riskassessment_llm_call_seconds', 'Latency of one OpenAI chat completion',
+    ['kind', 'model'], buckets=IO_BUCKETS)
+LLM_CALLS = Counter(
+    'riskassessment_llm_calls', 'GPT cleaning and extraction calls by outcome: called, error, cached, '
+    'skipped (rules found everything) or deduplicated (near-duplicate page)', ['kind', 'outcome'])
+LLM_TOKENS = Counter(
+    'riskassessment_llm_tokens', 'Tokens reported by the OpenAI API', ['kind', 'model', 'type'])
+ASSESSMENT_LOOKUPS = Counter(
+    'riskassessment_assessment_lookups', 'Stored assessment lookups by /extract: hit, miss or refresh '
+    '(forceRefresh)', ['result'])
+QUEUE_DEPTH = Gauge(
+    'riskassessment_queue_depth', 'Work waiting for a concurrency slot: fetch, llm, domain_politeness, '
+    'search_provider or bcrypt (including the hashes in progress)', ['queue'], multiprocess_mode='livesum')
+JOB_QUEUE_ITEMS = Gauge(
+    'riskassessment_job_queue_items', 'Batch assessment job items waiting or being processed',
+    ['status'], multiprocess_mode='mostrecent')
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'riskassessment_db_pool_checkout_seconds', 'Time spent getting a connection from the database pool, '
+    'including opening a new one', ['engine'], buckets=STAGE_BUCKETS)
+DB_POOL_TIMEOUTS = Counter(
+    'riskassessment_db_pool_timeouts', 'Pool checkouts that gave up after DB_POOL_TIMEOUT seconds', ['engine'])
+DB_CONNECTIONS = Gauge(
+    'riskassessment_db_connections', 'Database connections per engine: open, or checked_out by a request',
+    ['engine', 'state'], multiprocess_mode='livesum')
+
+_domains = set()
+_domains_lock = threading.Lock()
+max_domains = 200
+
+
+def domain_label(domain):
+    with _domains_lock:
+        if domain in _domains:
+            return domain
+        if len(_domains) < max_domains:
+            _domains.add(domain)
+            return domain
+    return OTHER_DOMAIN
+
+
+@contextmanager
+def timed_stage(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def queued(queue, semaphore):
+    """Acquire semaphore like `async with semaphore`, counting the time spent waiting as queue depth."""
+    if semaphore.locked():
+        depth = QUEUE_DEPTH.labels(queue)
+        depth.inc()
+        try:
+            await semaphore.acquire()
+        finally:
+            depth.dec()
+    else:
+        await semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def observe_fetch(domain, status, seconds):
+    FETCH_SECONDS.labels(domain_label(domain), str(status)).observe(seconds)
+
+
+def observe_llm_call(kind, model, seconds, response):
+    """Record one chat completion; response is None when the call failed."""
+    LLM_CALL_SECONDS.labels(kind, model).observe(seconds)
+    if response is None:
+        LLM_CALLS.labels(kind, "error").inc()
+        return
+
+    LLM_CALLS.labels(kind, "called").inc()
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.labels(kind, model, "prompt").inc(usage.prompt_tokens or 0)
+        LLM_TOKENS.labels(kind, model, "completion").inc(usage.completion_tokens or 0)
+
+
+def count_llm_call(kind, outcome):
+    LLM_CALLS.labels(kind, outcome).inc()
+
+
+class Metrics:
+    """
+    Prometheus metrics for the API and the assessment pipeline, served on /metrics.
+
+    Pipeline code records into the module-level metrics above; this extension adds the per-request
+    latency histogram and in-flight gauge and the /metrics endpoint. Under gunicorn with several
+    workers, set PROMETHEUS_MULTIPROC_DIR so /metrics aggregates every worker (see gunicorn.conf.py).
+    Response time is measured until the response is created, so for the event stream it does not
+    include the time spent streaming.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_domains = max_domains
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        global max_domains
+        self.enabled = app.config.get('METRICS_ENABLED', self.enabled)
+        self.max_domains = max_domains = app.config.get('METRICS_MAX_DOMAINS', self.max_domains)
+
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def metrics_view(self):
+        self._update_job_queue()
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        g.metrics_endpoint = request.endpoint or "unmatched"
+        HTTP_REQUESTS_IN_FLIGHT.labels(g.metrics_endpoint).inc()
+
+    def _after_request(self, response):
+        start = g.get('metrics_start')
+        if start is not None:
+            HTTP_REQUEST_SECONDS.labels(g.metrics_endpoint, request.method, str(response.status_code)).observe(
+                time.perf_counter() - start)
+        return response
+
+    def _teardown_request(self, exc):
+        endpoint = g.pop('metrics_endpoint', None)
+        if endpoint is not None:
+            HTTP_REQUESTS_IN_FLIGHT.labels(endpoint).dec()
+
+    @staticmethod
+    def _update_job_queue():
+        # Counted when scraped rather than on every change; the queue lives in the database
+        from sqlalchemy import func
+
+        from riskassessmentapp.extensions import db
+        from riskassessmentapp.jobs.models import AssessmentJobItem
+
+        try:
+            counts = dict(db.session.query(AssessmentJobItem.status, func.count())
+                          .filter(AssessmentJobItem.status.in_(("pending", "running")))
+                          .group_by(AssessmentJobItem.status))
+        except Exception as e:
+            logger.warning("Could not count job queue items: %s", e)
+            db.session.rollback()
+            return
+        for status in ("pending", "running"):
+            JOB_QUEUE_ITEMS.labels(status).set(counts.get(status, 0))
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from riskassessmentapp.database import read_first
+from riskassessmentapp.extensions import db
+from riskassessmentapp.search.models import Assessment
+from riskassessmentapp.search.provider import normalize_query
+from riskassessmentapp.search.scoring import ATTRIBUTE_NAMES
+from riskassessmentapp.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def assessment_key(target_name, urls):
+    """Identify an assessment by the normalized name and the set of URLs, whatever their order."""
+    payload = json.dumps([normalize_query(target_name), sorted(set(urls))])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def find_fresh_assessment(target_name, urls, max_age):
+    """
+    Return the stored assessment of target_name from urls if it is at most max_age seconds old.
+
+    Args:
+        target_name (str): Name of the person
+        urls (list): The selected URLs
+        max_age (int): Staleness window in seconds
+
+    Returns:
+        Assessment: The stored assessment, or None if there is none or it is stale
+    """
+    assessment = read_first(select(Assessment).where(Assessment.lookup_key == assessment_key(target_name, urls)))
+    if assessment is None or assessment.assessed_at < utcnow() - timedelta(seconds=max_age):
+        return None
+    return assessment
+
+
+def save_assessment(target_name, urls, pages, dictionary):
+    """
+    Store an assessment, replacing the previous one of the same name and URLs.
+
+    Args:
+        target_name (str): Name of the person
+        urls (list): The selected URLs
+        pages (dict): URL -> cleaned paragraphs
+        dictionary (dict): The result of assess_person; its ATTRIBUTE_NAMES keys are stored
+
+    Returns:
+        Assessment: The stored assessment, or None if it could not be stored
+    """
+    key = assessment_key(target_name, urls)
+    attributes = json.dumps({name: dictionary.get(name) or [] for name in ATTRIBUTE_NAMES})
+
+    for _ in range(2):
+        assessment = Assessment.query.filter(Assessment.lookup_key == key).first()
+        if assessment is None:
+            assessment = Assessment(lookup_key=key)
+            db.session.add(assessment)
+        assessment.subject_name = target_name[:255]
+        assessment.source_urls = json.dumps(urls)
+        assessment.set_pages(pages)
+        assessment.attributes = attributes
+        assessment.risk_score = dictionary['risk_score']
+        assessment.risk_level = dictionary['risk_level']
+        assessment.assessed_at = utcnow()
+        try:
+            db.session.commit()
+            # Load it again here rather than on first access, which may be on the event loop
+            db.session.refresh(assessment)
+            return assessment
+        except IntegrityError:
+            # A concurrent request stored the same assessment first; update that row instead
+            db.session.rollback()
+
+    logger.warning("Could not store the assessment %s", key)
+    return None
+
+
+def rescore_assessments(engine, batch_size=500):
+    """
+    Re-score every stored assessment with engine, e.g. after the coefficients change.
+
+    Assessments are read in batches in id order and scored with one vectorized call per batch;
+    only rows whose score or level changes are written, one commit per batch.
+
+    Args:
+        engine (RiskScoringEngine): The engine to score with
+        batch_size (int): Assessments per batch
+
+    Returns:
+        tuple: (assessments scanned, assessments whose score or level changed)
+    """
+    scanned = changed = 0
+    last_id = None
+    while True:
+        query = select(Assessment).order_by(Assessment.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(Assessment.id > last_id)
+        batch = db.session.scalars(query).all()
+        if not batch:
+            return scanned, changed
+
+        scores = engine.score_batch(engine.presence_matrix([assessment.get_attributes() for assessment in batch]))
+        levels = engine.risk_levels(scores)
+        for assessment, score, level in zip(batch, scores, levels):
+            if assessment.risk_score != float(score) or assessment.risk_level != level:
+                assessment.risk_score = float(score)
+                assessment.risk_level = level
+                changed += 1
+        db.session.commit()
+
+        scanned += len(batch)
+        last_id = batch[-1].id
+        # The rows of this batch are not needed again
+        db.session.expunge_all()
@@ -0,0 +1,194 @@
+import contextvars
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in characters of English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model):
+    """
+    Return the tiktoken encoding for model, or None if it cannot be loaded.
+
+    tiktoken downloads its BPE files on first use, so besides a missing package this also covers
+    workers without outbound access. The outcome is remembered per model.
+    """
+    with _encodings_lock:
+        if model in _encodings:
+            return _encodings[model]
+
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken unavailable for %s, estimating tokens from characters: %s", model, e)
+        encoding = None
+
+    with _encodings_lock:
+        _encodings[model] = encoding
+    return encoding
+
+
+def count_tokens(text, model):
+    """
+    Count the tokens text uses for model.
+
+    Args:
+        text (str): The text to measure
+        model (str): OpenAI model the text will be sent to
+
+    Returns:
+        int: The exact token count, or an estimate of len(text) / CHARS_PER_TOKEN without tiktoken
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_oversized(text, max_tokens, model):
+    """Split a single piece of text that is over budget on its own into pieces of at most max_tokens."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        size = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def chunk_pieces(pieces, max_tokens, model, separator="\n"):
+    """
+    Pack pieces of text (lines or paragraphs) in order into chunks of at most max_tokens tokens.
+
+    Pieces are never reordered and only split when a single piece is over budget on its own.
+
+    Args:
+        pieces (list): The pieces of text, in reading order
+        max_tokens (int): Token budget per chunk
+        model (str): OpenAI model the chunks will be sent to
+        separator (str): Joins the pieces within a chunk
+
+    Returns:
+        list: The chunks as strings
+    """
+    separator_tokens = count_tokens(separator, model) if separator else 0
+    chunks = []
+    current, current_tokens = [], 0
+
+    for piece in pieces:
+        tokens = count_tokens(piece, model)
+        if tokens > max_tokens:
+            parts = split_oversized(piece, max_tokens, model)
+        else:
+            parts = [piece]
+
+        for part in parts:
+            part_tokens = tokens if len(parts) == 1 else count_tokens(part, model)
+            if current and current_tokens + separator_tokens + part_tokens > max_tokens:
+                chunks.append(separator.join(current))
+                current, current_tokens = [], 0
+            current_tokens += part_tokens + (separator_tokens if current else 0)
+            current.append(part)
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def completion_budget(input_tokens, ratio, minimum, maximum):
+    """
+    Size max_tokens from the input instead of using one fixed value for every request.
+
+    Args:
+        input_tokens (int): Tokens in the content the model is asked to process
+        ratio (float): Expected output tokens per input token
+        minimum (int): Floor for short inputs
+        maximum (int): Ceiling for long inputs
+
+    Returns:
+        int: The max_tokens to request
+    """
+    return max(minimum, min(maximum, math.ceil(input_tokens * ratio)))
+
+
+class TokenUsage:
+    """Token counts reported by the OpenAI API, accumulated over every call made for one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.cached_calls = 0
+        self.skipped_calls = 0
+        self.deduplicated_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, usage):
+        """Add the usage object of one chat completion response."""
+        with self._lock:
+            self.calls += 1
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+
+    def record_cached(self):
+        with self._lock:
+            self.cached_calls += 1
+
+    def record_skipped(self):
+        with self._lock:
+            self.skipped_calls += 1
+
+    def record_deduplicated(self):
+        with self._lock:
+            self.deduplicated_calls += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "cached_calls": self.cached_calls,
+                "skipped_calls": self.skipped_calls,
+                "deduplicated_calls": self.deduplicated_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+            }
+
+
+# The TokenUsage of the request being handled; asyncio tasks and to_thread calls inherit it
+current_usage = contextvars.ContextVar("current_usage", default=None)
+
+
+def record_usage(response):
+    usage = current_usage.get()
+    if usage is not None:
+        usage.record(getattr(response, "usage", None))
+
+
+def record_cached_call():
+    usage = current_usage.get()
+    if usage is not None:
+        usage.record_cached()
+
+
+def record_skipped_call():
+    usage = current_usage.get()
+    if usage is not None:
+        usage.record_skipped()
+
+
+def record_deduplicated_call():
+    usage = current_usage.get()
+    if usage is not None:
+        usage.record_deduplicated()
@@ -0,0 +1,178 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+FINGERPRINT_BITS = 64
+SHINGLE_WORDS = 3
+# Hamming distance d <= BANDS - 1 guarantees that two fingerprints agree on at least one band
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+
+WORD_RE = re.compile(r'\w+')
+
+
+def simhash(text, min_words=50):
+    """
+    64-bit SimHash of the word shingles of text.
+
+    Near-identical texts get fingerprints that differ in only a few bits, so pages that differ only
+    in navigation, ads or tracking markup can be matched by Hamming distance.
+
+    Args:
+        text (str): Visible text of the page
+        min_words (int): Texts shorter than this are too small to fingerprint reliably
+
+    Returns:
+        int: The fingerprint, or None if the text is too short
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) < max(min_words, SHINGLE_WORDS):
+        return None
+
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big') for shingle in shingles),
+        dtype=np.uint64, count=len(shingles))
+
+    # One row of bits per shingle, most significant bit first; a bit is set if most shingles set it
+    bits = np.unpackbits(hashes.byteswap().view(np.uint8).reshape(-1, 8), axis=1)
+    majority = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes(), 'big')
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [(band, (fingerprint >> (band * BAND_BITS)) & mask) for band in range(BANDS)]
+
+
+class DuplicateEntry:
+    """One cleaned page: its fingerprint and a future that resolves to its cleaned paragraphs."""
+
+    def __init__(self, key, fingerprint, url):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.url = url
+        self.future = Future()
+        self.created_at = time.monotonic()
+
+
+class NearDuplicateIndex:
+    """
+    Recent cleaned pages indexed by SimHash fingerprint, per target person.
+
+    The first page with a given fingerprint claims an entry and cleans it; any page within
+    max_distance bits of it, in the same request or in another request for the same person within
+    ttl seconds, awaits that entry's paragraphs instead of calling GPT again. Lookups use a banded
+    index, so only pages that share a 16-bit band are compared.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_distance = 3
+        self.min_words = 50
+        self.ttl = 1800
+        self.max_entries = 2048
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bands = {}
+        self._next_key = 0
+        self._counters = {"claims": 0, "duplicates": 0, "unfingerprinted": 0}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('DEDUP_ENABLED', self.enabled)
+        self.max_distance = min(app.config.get('DEDUP_MAX_DISTANCE', self.max_distance), BANDS - 1)
+        self.min_words = app.config.get('DEDUP_MIN_WORDS', self.min_words)
+        self.ttl = app.config.get('DEDUP_TTL', self.ttl)
+        self.max_entries = app.config.get('DEDUP_MAX_ENTRIES', self.max_entries)
+
+        app.extensions['dedup_index'] = self
+
+    def claim(self, target_name, text, url):
+        """
+        Find a near-duplicate of text for target_name or register text as a new original.
+
+        Args:
+            target_name (str): Name of the person the page will be cleaned for
+            text (str): Visible text of the page
+            url (str): The page's URL
+
+        Returns:
+            tuple: (entry, is_owner). The owner must call resolve() or abandon() on the entry; other
+                   callers await entry.future. entry is None if the page cannot be fingerprinted.
+        """
+        if not self.enabled:
+            return None, False
+
+        fingerprint = simhash(text, self.min_words)
+        if fingerprint is None:
+            with self._lock:
+                self._counters["unfingerprinted"] += 1
+            return None, False
+
+        person = " ".join(target_name.lower().split())
+        with self._lock:
+            self._expire()
+            for band in bands(fingerprint):
+                for key in self._bands.get((person, band), ()):
+                    _, entry = self._entries[key]
+                    if hamming_distance(entry.fingerprint, fingerprint) <= self.max_distance:
+                        self._counters["duplicates"] += 1
+                        return entry, False
+
+            entry = DuplicateEntry(self._next_key, fingerprint, url)
+            self._next_key += 1
+            self._entries[entry.key] = (person, entry)
+            for band in bands(fingerprint):
+                self._bands.setdefault((person, band), set()).add(entry.key)
+            self._counters["claims"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return entry, True
+
+    def resolve(self, entry, paragraphs):
+        if not entry.future.done():
+            entry.future.set_result(list(paragraphs))
+
+    def abandon(self, entry):
+        """Drop an entry whose cleaning failed; anyone waiting on it cleans its own copy."""
+        with self._lock:
+            if entry.key in self._entries:
+                self._remove(entry.key)
+        if not entry.future.done():
+            entry.future.set_result(None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({"enabled": self.enabled, "entries": len(self._entries), "max_distance": self.max_distance})
+            return stats
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._entries:
+            key, (_, entry) = next(iter(self._entries.items()))
+            if entry.created_at >= cutoff:
+                break
+            self._remove(key)
+
+    def _remove(self, key):
+        person, entry = self._entries.pop(key)
+        for band in bands(entry.fingerprint):
+            keys = self._bands.get((person, band))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._bands[(person, band)]
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from riskassessmentapp.metrics import timed_stage
+
+# lxml is several times faster than the pure-Python html.parser; fall back if it is not installed
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+SNIPPET_MIN_LENGTH = 50
+SNIPPET_MAX_LENGTH = 200
+DOCUMENT_CACHE_SIZE = 256
+# Bound on the approximate memory of the cached documents, mostly their text lines, per process
+DOCUMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Rough per-string overhead of a CPython str object, added to its length when sizing a document
+STR_OVERHEAD_BYTES = 50
+
+
+class ParsedDocument:
+    """
+    Everything the search pipeline needs from a webpage, extracted in one parse.
+
+    The BeautifulSoup tree is discarded after extraction, so a ParsedDocument is small enough to be
+    cached and shared between /risksearch/ (metadata) and /risksearch/extract (GPT cleaning).
+    """
+
+    def __init__(self, html_content, url, parser=DEFAULT_PARSER):
+        soup = BeautifulSoup(html_content, parser)
+
+        parsed_url = urlparse(url)
+        self.url = url
+        self.domain = parsed_url.netloc
+        self.path = parsed_url.path
+
+        self.title = None
+        self.meta = {}
+        self.h1 = []
+        self.h2 = []
+        self.snippet = ""
+
+        seen_title = False
+        # A single traversal collects the title, meta tags, headings and the first substantial paragraph
+        for tag in soup.find_all(['title', 'meta', 'h1', 'h2', 'p']):
+            name = tag.name
+            if name == 'title':
+                if not seen_title:
+                    # str() so the document does not keep a reference into the parse tree
+                    self.title = str(tag.string) if tag.string is not None else None
+                    seen_title = True
+            elif name == 'meta':
+                key = tag.get('name') or tag.get('property')
+                if key and key not in self.meta:
+                    self.meta[key] = tag.get('content', "")
+            elif name in ('h1', 'h2'):
+                text = tag.text.strip()
+                if text:
+                    (self.h1 if name == 'h1' else self.h2).append(text)
+            elif not self.snippet:
+                text = tag.text.strip()
+                if len(text) > SNIPPET_MIN_LENGTH:  # Find a paragraph with reasonable content
+                    self.snippet = truncate(text)
+
+        parsed_text = soup.get_text()
+        if not self.snippet:
+            # If no good paragraph found, just get some visible text
+            self.snippet = truncate(parsed_text.strip())
+
+        # Visible text as non-blank lines
+        self.text_lines = [
+            line for line in parsed_text.split('\n') if line not in ('', '\r') and not line.isspace()
+        ]
+
+        # Approximate memory held by the document's strings, for the cache's byte bound
+        strings = [*self.text_lines, *self.h1, *self.h2, *self.meta.keys(), *self.meta.values(), self.snippet,
+                   self.title or ""]
+        self.size = sum(len(string) + STR_OVERHEAD_BYTES for string in strings)
+
+    @property
+    def description(self):
+        return self.meta.get('description', "")
+
+    @property
+    def keywords(self):
+        return self.meta.get('keywords', "")
+
+    @property
+    def og_title(self):
+        return self.meta.get('og:title', "")
+
+    @property
+    def og_description(self):
+        return self.meta.get('og:description', "")
+
+    @property
+    def og_site_name(self):
+        return self.meta.get('og:site_name', "")
+
+    @property
+    def text(self):
+        return "\n".join(self.text_lines)
+
+
+def truncate(text):
+    return text[:SNIPPET_MAX_LENGTH] + "..." if len(text) > SNIPPET_MAX_LENGTH else text
+
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def parse_document(html_content, url):
+    """
+    Return the ParsedDocument for a page, reusing an earlier parse of identical HTML.
+
+    The cache keeps the most recently used documents, at most DOCUMENT_CACHE_SIZE of them and
+    DOCUMENT_CACHE_MAX_BYTES in total; a document larger than that on its own is not cached.
+
+    Args:
+        html_content (str): The HTML content of the webpage
+        url (str): The URL of the webpage
+
+    Returns:
+        ParsedDocument: The parsed page
+    """
+    key = (url, hashlib.sha1(html_content.encode('utf-8', 'surrogatepass')).hexdigest())
+    with _cache_lock:
+        document = _cache.get(key)
+        if document is not None:
+            _cache.move_to_end(key)
+            return document
+
+    with timed_stage("html_parse"):
+        document = ParsedDocument(html_content, url)
+
+    global _cache_bytes
+    if document.size > DOCUMENT_CACHE_MAX_BYTES:
+        return document
+    with _cache_lock:
+        previous = _cache.pop(key, None)
+        if previous is not None:
+            _cache_bytes -= previous.size
+        _cache[key] = document
+        _cache_bytes += document.size
+        while len(_cache) > DOCUMENT_CACHE_SIZE or _cache_bytes > DOCUMENT_CACHE_MAX_BYTES:
+            _cache_bytes -= _cache.popitem(last=False)[1].size
+
+    return document
@@ -0,0 +1,320 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
+
+from riskassessmentapp.metrics import QUEUE_DEPTH
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Fetch kinds with their own latency samples and timeout: a metadata fetch stops reading early,
+# so its latency says little about how long a full page takes
+FETCH_KINDS = ("full", "metadata")
+
+
+class DomainUnavailable(Exception):
+    """Raised instead of fetching when a domain's circuit is open or its politeness queue is too long."""
+
+    def __init__(self, domain, reason):
+        super().__init__(f"{domain} unavailable: {reason}")
+        self.domain = domain
+        self.reason = reason
+
+
+def domain_for(url):
+    """Host the health of url is tracked under: lowercased, without port or a leading www."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainState:
+    """Token bucket, latency samples per fetch kind and circuit breaker state of one domain."""
+
+    def __init__(self, burst, latency_samples):
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+        self.latencies = {kind: deque(maxlen=latency_samples) for kind in FETCH_KINDS}
+
+        self.circuit = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = 0.0
+        self.probe_in_flight = False
+
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_failure = None
+
+
+class DomainRequest:
+    """
+    One fetch admitted by DomainHealthRegistry.guard().
+
+    The caller reports how the fetch went with record_success() or record_failure(); a fetch that
+    ends without either (cancelled, or failed for a reason that says nothing about the domain, such
+    as an unsupported content type) leaves the domain's health unchanged. Only successes that read
+    a body (sample=True) add to the latency samples of the fetch's kind.
+    """
+
+    def __init__(self, registry, domain, kind, timeout, probe):
+        self.registry = registry
+        self.domain = domain
+        self.kind = kind
+        self.timeout = timeout
+        self.probe = probe
+        self.started_at = time.monotonic()
+        self.recorded = False
+
+    def record_success(self, sample=True):
+        if not self.recorded:
+            self.recorded = True
+            latency = time.monotonic() - self.started_at if sample else None
+            self.registry._record_success(self.domain, self.kind, latency)
+
+    def record_failure(self, reason, retry_after=None):
+        if not self.recorded:
+            self.recorded = True
+            self.registry._record_failure(self.domain, reason, retry_after)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if not self.recorded and self.probe:
+            self.registry._release_probe(self.domain)
+        return False
+
+
+class DomainHealthRegistry:
+    """
+    Per-domain politeness limits, adaptive timeouts and circuit breaking for page fetches.
+
+    Every fetch first takes a token from its domain's bucket (rate per second, up to burst), waiting
+    for one if needed. The fetch timeout is a multiple of a high percentile of the domain's recent
+    latencies for the same kind of fetch (full page or metadata), clamped to [timeout_min,
+    timeout_max]; until enough samples of that kind exist timeout_max is used.
+    After failure_threshold consecutive failures (timeouts, connection errors, 403, 429 and 5xx
+    responses) the circuit opens and fetches fail immediately with DomainUnavailable for a cooldown
+    that doubles each time a probe fails, up to max_cooldown. A 429 with Retry-After opens the
+    circuit for that long straight away. Once the cooldown ends a single probe fetch is let through;
+    its success closes the circuit again.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.rate = 1.0
+        self.burst = 3
+        self.max_wait = 10.0
+        self.timeout_min = 3.0
+        self.timeout_max = 15.0
+        self.timeout_percentile = 95
+        self.timeout_multiplier = 2.0
+        self.latency_samples = 50
+        self.min_samples = 5
+        self.failure_threshold = 3
+        self.cooldown = 60.0
+        self.max_cooldown = 900.0
+        self.max_tracked = 2048
+
+        self._lock = threading.Lock()
+        self._domains = OrderedDict()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('DOMAIN_HEALTH_ENABLED', self.enabled)
+        self.rate = app.config.get('DOMAIN_RATE', self.rate)
+        self.burst = app.config.get('DOMAIN_BURST', self.burst)
+        self.max_wait = app.config.get('DOMAIN_MAX_WAIT', self.max_wait)
+        self.timeout_min = app.config.get('DOMAIN_TIMEOUT_MIN', self.timeout_min)
+        self.timeout_max = app.config.get('DOMAIN_TIMEOUT_MAX', self.timeout_max)
+        self.timeout_percentile = app.config.get('DOMAIN_TIMEOUT_PERCENTILE', self.timeout_percentile)
+        self.timeout_multiplier = app.config.get('DOMAIN_TIMEOUT_MULTIPLIER', self.timeout_multiplier)
+        self.latency_samples = app.config.get('DOMAIN_LATENCY_SAMPLES', self.latency_samples)
+        self.min_samples = app.config.get('DOMAIN_MIN_SAMPLES', self.min_samples)
+        self.failure_threshold = app.config.get('DOMAIN_FAILURE_THRESHOLD', self.failure_threshold)
+        self.cooldown = app.config.get('DOMAIN_COOLDOWN', self.cooldown)
+        self.max_cooldown = app.config.get('DOMAIN_MAX_COOLDOWN', self.max_cooldown)
+        self.max_tracked = app.config.get('DOMAIN_MAX_TRACKED', self.max_tracked)
+
+        app.extensions['domain_health'] = self
+
+    async def guard(self, url, kind="full"):
+        """
+        Admit a fetch of url: check the circuit, wait for a politeness token and pick the timeout.
+
+        Args:
+            url (str): The URL about to be fetched
+            kind (str): "full" or "metadata", the fetch mode; each has its own latency samples
+
+        Returns:
+            DomainRequest: Use as an async context manager around the fetch and report its outcome
+
+        Raises:
+            DomainUnavailable: If the domain's circuit is open or a token would take longer than
+                               max_wait to become available
+        """
+        domain = domain_for(url)
+        if not self.enabled or not domain:
+            return DomainRequest(self, domain, kind, self.timeout_max, probe=False)
+
+        with self._lock:
+            state = self._state(domain)
+            now = time.monotonic()
+            probe = False
+            if state.circuit == OPEN and now >= state.open_until:
+                state.circuit = HALF_OPEN
+            if state.circuit == OPEN or (state.circuit == HALF_OPEN and state.probe_in_flight):
+                state.rejected += 1
+                raise DomainUnavailable(domain, f"circuit open after {state.last_failure}")
+            if state.circuit == HALF_OPEN:
+                state.probe_in_flight = probe = True
+
+            # Reserve the next token now and sleep outside the lock; the bucket may go negative,
+            # which queues later callers behind this one
+            state.tokens = min(float(self.burst), state.tokens + (now - state.refilled_at) * self.rate)
+            state.refilled_at = now
+            wait = max(0.0, (1 - state.tokens) / self.rate)
+            if wait > self.max_wait:
+                state.rejected += 1
+                if probe:
+                    state.probe_in_flight = False
+                raise DomainUnavailable(domain, f"politeness queue longer than {self.max_wait}s")
+            state.tokens -= 1
+            state.requests += 1
+            timeout = self._timeout(state, kind)
+
+        if wait > 0:
+            depth = QUEUE_DEPTH.labels("domain_politeness")
+            depth.inc()
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                if probe:
+                    self._release_probe(domain)
+                raise
+            finally:
+                depth.dec()
+        return DomainRequest(self, domain, kind, timeout, probe)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            domains = {}
+            for domain, state in self._domains.items():
+                domains[domain] = {
+                    "circuit": state.circuit,
+                    "open_for_seconds": round(max(0.0, state.open_until - now), 1) if state.circuit == OPEN else 0,
+                    "consecutive_failures": state.consecutive_failures,
+                    "last_failure": state.last_failure,
+                    "requests": state.requests,
+                    "successes": state.successes,
+                    "failures": state.failures,
+                    "rejected": state.rejected,
+                    "latency": {kind: self._latency_stats(state, kind) for kind in FETCH_KINDS},
+                    "tokens": round(min(float(self.burst), state.tokens + (now - state.refilled_at) * self.rate), 2),
+                }
+            return {
+                "enabled": self.enabled,
+                "rate": self.rate,
+                "burst": self.burst,
+                "failure_threshold": self.failure_threshold,
+                "open_circuits": sum(1 for state in self._domains.values() if state.circuit != CLOSED),
+                "domains": domains,
+            }
+
+    def reset(self, domain=None):
+        """Forget the health of one domain, or of every domain; returns how many were dropped."""
+        with self._lock:
+            if domain is None:
+                count = len(self._domains)
+                self._domains.clear()
+                return count
+            return 1 if self._domains.pop(domain, None) is not None else 0
+
+    def _state(self, domain):
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = DomainState(self.burst, self.latency_samples)
+            while len(self._domains) > self.max_tracked:
+                self._domains.popitem(last=False)
+        else:
+            self._domains.move_to_end(domain)
+        return state
+
+    def _timeout(self, state, kind):
+        latencies = state.latencies[kind]
+        if len(latencies) < self.min_samples:
+            return self.timeout_max
+        observed = percentile(sorted(latencies), self.timeout_percentile) * self.timeout_multiplier
+        return min(self.timeout_max, max(self.timeout_min, observed))
+
+    def _latency_stats(self, state, kind):
+        latencies = sorted(state.latencies[kind])
+        return {
+            "samples": len(latencies),
+            "timeout_seconds": round(self._timeout(state, kind), 2),
+            "p50": round(percentile(latencies, 50), 3) if latencies else None,
+            "p95": round(percentile(latencies, 95), 3) if latencies else None,
+        }
+
+    def _record_success(self, domain, kind, latency):
+        with self._lock:
+            state = self._state(domain)
+            state.successes += 1
+            if latency is not None:
+                state.latencies[kind].append(latency)
+            state.consecutive_failures = 0
+            state.circuit = CLOSED
+            state.cooldown = 0.0
+            state.probe_in_flight = False
+
+    def _record_failure(self, domain, reason, retry_after):
+        with self._lock:
+            state = self._state(domain)
+            state.failures += 1
+            state.consecutive_failures += 1
+            state.last_failure = reason
+            now = time.monotonic()
+
+            if state.circuit == HALF_OPEN:
+                # The probe failed: back off for longer than last time
+                state.cooldown = min(self.max_cooldown, max(self.cooldown, state.cooldown * 2))
+                state.open_until = now + state.cooldown
+                state.circuit = OPEN
+            elif state.consecutive_failures >= self.failure_threshold and state.circuit == CLOSED:
+                state.cooldown = self.cooldown
+                state.open_until = now + state.cooldown
+                state.circuit = OPEN
+
+            if retry_after:
+                state.open_until = max(state.open_until, now + min(retry_after, self.max_cooldown))
+                state.circuit = OPEN
+            state.probe_in_flight = False
+
+    def _release_probe(self, domain):
+        with self._lock:
+            state = self._domains.get(domain)
+            if state is not None:
+                state.probe_in_flight = False
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header given in seconds; HTTP dates are ignored."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
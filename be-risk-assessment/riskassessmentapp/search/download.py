@@ -0,0 +1,97 @@
+import codecs
+import re
+
+CHUNK_SIZE = 16 * 1024
+CHARSET_SNIFF_BYTES = 4096
+SNIPPET_MIN_LENGTH = 50
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_\-:.]+)', re.IGNORECASE)
+HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+H1_END_RE = re.compile(rb'</h1\s*>', re.IGNORECASE)
+PARAGRAPH_RE = re.compile(rb'<p[\s>](.*?)</p\s*>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(rb'<[^>]+>')
+
+
+class MetadataScan:
+    """
+    Incrementally checks a partially downloaded page for the fields extract_page_metadata needs:
+    the complete <head>, the first <h1> and the first paragraph with more than SNIPPET_MIN_LENGTH
+    characters of text. Headings after the first substantial paragraph may be missed.
+    """
+
+    def __init__(self):
+        self.head_done = False
+        self.h1_done = False
+        self.paragraph_done = False
+        self._paragraph_offset = 0
+
+    def feed(self, body):
+        """
+        Args:
+            body (bytearray): Everything downloaded so far
+
+        Returns:
+            bool: True once all the fields have been seen
+        """
+        if not self.head_done:
+            self.head_done = HEAD_END_RE.search(body) is not None
+        if not self.h1_done:
+            self.h1_done = H1_END_RE.search(body) is not None
+        if not self.paragraph_done:
+            for match in PARAGRAPH_RE.finditer(body, self._paragraph_offset):
+                self._paragraph_offset = match.end()
+                text = TAG_RE.sub(b'', match.group(1)).strip()
+                if len(text) > SNIPPET_MIN_LENGTH:
+                    self.paragraph_done = True
+                    break
+        return self.head_done and self.h1_done and self.paragraph_done
+
+
+async def read_body(response, mode="full", max_bytes=5 * 1024 * 1024):
+    """
+    Stream a response body in chunks instead of buffering it with response.text().
+
+    Args:
+        response (ClientResponse): The aiohttp response
+        mode (str): "full" reads the whole body; "metadata" stops as soon as MetadataScan is satisfied
+        max_bytes (int): Hard cap on the number of bytes read
+
+    Returns:
+        tuple: (bytes body, bool complete) where complete is False if reading stopped before the end
+    """
+    body = bytearray()
+    scan = MetadataScan() if mode == "metadata" else None
+
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        body.extend(chunk)
+        if len(body) >= max_bytes:
+            del body[max_bytes:]
+            return bytes(body), False
+        if scan is not None and scan.feed(body):
+            return bytes(body), False
+
+    return bytes(body), True
+
+
+def detect_charset(response, body):
+    """
+    Pick the charset from the Content-Type header or a <meta charset> near the top of the page,
+    falling back to UTF-8. Unlike response.text() this never runs statistical detection over the body.
+    """
+    for candidate in (response.charset, sniff_meta_charset(body)):
+        if not candidate:
+            continue
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+
+def sniff_meta_charset(body):
+    match = META_CHARSET_RE.search(body[:CHARSET_SNIFF_BYTES])
+    return match.group(1).decode('ascii', 'ignore') if match else None
+
+
+def decode_body(response, body):
+    return body.decode(detect_charset(response, body), errors='replace')
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import time
+
+from riskassessmentapp.search.sqlite_cache import SqliteCache
+
+
+def normalize_text(text):
+    """Collapse whitespace so formatting-only differences map to the same cache key."""
+    return " ".join(text.split())
+
+
+def make_cache_key(kind, prompt_version, model, target_name, text):
+    """
+    Build the content address of an LLM result.
+
+    Args:
+        kind (str): The pipeline step, e.g. "clean" or "extract"
+        prompt_version (str): Version of the prompt used for the step
+        model (str): The OpenAI model
+        target_name (str): Name of the person the prompt is about
+        text (str): The page text sent to the model
+
+    Returns:
+        str: A SHA-256 hex digest
+    """
+    material = json.dumps(
+        [kind, prompt_version, model, normalize_text(target_name).lower(), normalize_text(text)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMResultCache(SqliteCache):
+    """
+    SQLite-backed cache of GPT cleaning and extraction results, addressed by make_cache_key.
+
+    The prompt version is part of both the key and the stored row, so bumping a prompt version
+    makes old results unreachable and invalidate() can delete them.
+    """
+
+    table = 'llm_results'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS llm_results ("
+        "key TEXT PRIMARY KEY, kind TEXT NOT NULL, prompt_version TEXT NOT NULL, model TEXT NOT NULL, "
+        "result TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_llm_results_last_access ON llm_results (last_access)",
+        "CREATE INDEX IF NOT EXISTS ix_llm_results_kind ON llm_results (kind, prompt_version)",
+    )
+    counter_names = ('hits', 'misses', 'expired', 'stores', 'evictions', 'invalidated')
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.ttl = 7 * 24 * 3600
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LLM_CACHE_ENABLED', self.enabled)
+        self.path = app.config.get('LLM_CACHE_PATH') or os.path.join(app.instance_path, 'llm_cache.sqlite3')
+        self.ttl = app.config.get('LLM_CACHE_TTL', self.ttl)
+        self.max_bytes = app.config.get('LLM_CACHE_MAX_BYTES', self.max_bytes)
+
+        app.extensions['llm_cache'] = self
+
+    def get(self, key):
+        """
+        Look up a result by key.
+
+        Args:
+            key (str): The key from make_cache_key
+
+        Returns:
+            The cached result (any JSON value), or None on a miss or if the entry is older than ttl
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT result, created_at FROM llm_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+
+            result, created_at = row
+            now = time.time()
+            if now - created_at >= self.ttl:
+                conn.execute("DELETE FROM llm_results WHERE key = ?", (key,))
+                conn.commit()
+                self._counters["expired"] += 1
+                return None
+
+            conn.execute("UPDATE llm_results SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._counters["hits"] += 1
+
+        return json.loads(result)
+
+    def put(self, key, kind, prompt_version, model, result):
+        """
+        Store a result and evict least recently used entries if over max_bytes.
+
+        Args:
+            key (str): The key from make_cache_key
+            kind (str): The pipeline step the result belongs to
+            prompt_version (str): Version of the prompt that produced the result
+            model (str): The OpenAI model that produced the result
+            result: Any JSON-serializable value
+        """
+        if not self.enabled:
+            return
+
+        payload = json.dumps(result, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_results "
+                "(key, kind, prompt_version, model, result, created_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, prompt_version, model, payload, now, now, size)
+            )
+            self._counters["stores"] += 1
+            self._evict(conn)
+            conn.commit()
+
+    def invalidate(self, kind=None, keep_prompt_version=None):
+        """
+        Delete cached results, e.g. after a prompt change.
+
+        Args:
+            kind (str): Only delete results of this pipeline step (all steps if None)
+            keep_prompt_version (str): Keep results produced by this prompt version
+
+        Returns:
+            int: The number of deleted entries
+        """
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if keep_prompt_version is not None:
+            clauses.append("prompt_version != ?")
+            params.append(keep_prompt_version)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute(f"DELETE FROM llm_results{where}", params).rowcount
+            conn.commit()
+            self._counters["invalidated"] += deleted
+
+        return deleted
+
+    def stats(self):
+        stats = super().stats()
+        stats["ttl"] = self.ttl
+        return stats
@@ -0,0 +1,58 @@
+import json
+import uuid
+import zlib
+
+from riskassessmentapp.extensions import db
+from riskassessmentapp.search.scoring import ATTRIBUTE_NAMES
+from riskassessmentapp.utils import utcnow
+
+
+class Assessment(db.Model):
+    """
+    The latest assessment of one person from one set of source URLs.
+
+    The cleaned paragraphs are stored zlib-compressed, per URL; they are only needed to re-run the
+    extraction, while the attributes are all it takes to re-score an assessment.
+    """
+
+    __tablename__ = 'assessments'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # assessment_key() of the name and URLs, so a lookup is one unique-index probe
+    lookup_key = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    subject_name = db.Column(db.String(255), nullable=False)
+    source_urls = db.Column(db.Text, nullable=False)
+    pages = db.Column(db.LargeBinary(length=2 ** 24 - 1), nullable=True)
+    attributes = db.Column(db.Text, nullable=False)
+    risk_score = db.Column(db.Float, nullable=False)
+    risk_level = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    assessed_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
+
+    def __repr__(self):
+        return f'<Assessment: {self.id} {self.risk_level}>'
+
+    @property
+    def urls(self):
+        return json.loads(self.source_urls)
+
+    def get_attributes(self):
+        """Return attribute -> values for every one of ATTRIBUTE_NAMES, also for rows stored with fewer."""
+        stored = json.loads(self.attributes)
+        return {name: stored.get(name) or [] for name in ATTRIBUTE_NAMES}
+
+    def get_pages(self):
+        """Return URL -> cleaned paragraphs."""
+        if not self.pages:
+            return {}
+        return json.loads(zlib.decompress(self.pages).decode("utf-8"))
+
+    def set_pages(self, pages):
+        self.pages = zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"), 6)
+
+    def to_json_response(self, cached):
+        return {
+            "id": self.id,
+            "cached": cached,
+            "assessedAt": self.assessed_at.isoformat(),
+        }
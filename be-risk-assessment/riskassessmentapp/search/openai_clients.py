@@ -0,0 +1,56 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+# The ASGI server's event loop, on which every request shares one client, and that client once made
+_shared_loop = None
+_shared_client = None
+
+
+def new_async_openai_client():
+    """
+    Return a new AsyncOpenAI client.
+
+    The openai package takes most of a second to import, so nothing imports it until a client is
+    needed or riskassessmentapp.warmup runs.
+    """
+    from openai import AsyncOpenAI
+    return AsyncOpenAI()
+
+
+@asynccontextmanager
+async def async_openai_client():
+    """
+    Provide an AsyncOpenAI client for the body of an async with block.
+
+    On the event loop passed to share_async_openai_client every block gets the same client, so the
+    connections to the API are reused across requests. Anywhere else (the development server, the
+    job workers) each block opens its own client and closes it at the end.
+    """
+    global _shared_client
+    if _shared_loop is not None and asyncio.get_running_loop() is _shared_loop:
+        if _shared_client is None:
+            _shared_client = new_async_openai_client()
+        yield _shared_client
+        return
+
+    async with new_async_openai_client() as llm_client:
+        yield llm_client
+
+
+def share_async_openai_client(loop):
+    """
+    Let every async_openai_client() on loop use one client, created on first use.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): The worker's long-lived loop, see riskassessmentapp.serving
+    """
+    global _shared_loop
+    _shared_loop = loop
+
+
+async def close_async_openai_client():
+    """Close the shared client; awaited on the loop it was shared on."""
+    global _shared_loop, _shared_client
+    llm_client, _shared_client, _shared_loop = _shared_client, None, None
+    if llm_client is not None:
+        await llm_client.close()
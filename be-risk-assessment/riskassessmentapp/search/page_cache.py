@@ -0,0 +1,150 @@
+import os
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from riskassessmentapp.search.sqlite_cache import SqliteCache
+
+CachedPage = namedtuple('CachedPage', ['url', 'body', 'etag', 'last_modified', 'fetched_at'])
+
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'msclkid'}
+
+
+def normalize_url(url):
+    """
+    Normalize a URL so the same page fetched through slightly different links shares one cache entry.
+
+    Lower-cases the scheme and host, drops default ports, fragments and tracking parameters,
+    and sorts the remaining query parameters.
+
+    Args:
+        url (str): The URL to normalize
+
+    Returns:
+        str: The normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port is None or (scheme, port) in (('http', 80), ('https', 443)):
+        netloc = host
+    else:
+        netloc = f"{host}:{port}"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ]
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(sorted(query)), ''))
+
+
+class PageCache(SqliteCache):
+    """
+    SQLite-backed cache of fetched HTML pages keyed by normalized URL.
+
+    Entries keep the body with its ETag and Last-Modified validators. Entries younger than ttl are
+    served directly; older ones are revalidated by fetch_url with a conditional GET. When the stored
+    bodies exceed max_bytes the least recently used entries are evicted.
+    """
+
+    table = 'pages'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS pages ("
+        "key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT, "
+        "fetched_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_pages_last_access ON pages (last_access)",
+    )
+    counter_names = ('hits', 'misses', 'revalidated', 'refreshed', 'stores', 'evictions')
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.ttl = 3600
+        self.max_bytes = 256 * 1024 * 1024
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PAGE_CACHE_ENABLED', self.enabled)
+        self.path = app.config.get('PAGE_CACHE_PATH') or os.path.join(app.instance_path, 'page_cache.sqlite3')
+        self.ttl = app.config.get('PAGE_CACHE_TTL', self.ttl)
+        self.max_bytes = app.config.get('PAGE_CACHE_MAX_BYTES', self.max_bytes)
+
+        app.extensions['page_cache'] = self
+
+    def get(self, url):
+        """
+        Look up a page and mark it as recently used.
+
+        Args:
+            url (str): The URL of the page
+
+        Returns:
+            CachedPage: The cached page, or None if it is not cached
+        """
+        key = normalize_url(url)
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+
+            conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+
+        return CachedPage(key, *row)
+
+    def is_fresh(self, page):
+        """Return True if the page can be served without revalidation."""
+        return time.time() - page.fetched_at < self.ttl
+
+    def record_hit(self):
+        with self._lock:
+            self._counters["hits"] += 1
+
+    def mark_revalidated(self, page):
+        """Record a 304 Not Modified response and restart the entry's TTL."""
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE key = ?", (now, now, page.url))
+            conn.commit()
+            self._counters["revalidated"] += 1
+
+    def put(self, url, body, etag=None, last_modified=None, refreshed=False):
+        """
+        Store a freshly downloaded page and evict least recently used pages if over max_bytes.
+
+        Args:
+            url (str): The URL of the page
+            body (str): The HTML content
+            etag (str): The ETag response header, if any
+            last_modified (str): The Last-Modified response header, if any
+            refreshed (bool): True if this replaces a stale entry whose revalidation returned a new body
+        """
+        key = normalize_url(url)
+        size = len(body.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (key, body, etag, last_modified, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now, size)
+            )
+            self._counters["refreshed" if refreshed else "stores"] += 1
+            self._evict(conn)
+            conn.commit()
+
+    def stats(self):
+        stats = super().stats()
+        stats["ttl"] = self.ttl
+        return stats
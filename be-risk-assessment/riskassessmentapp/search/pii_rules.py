@@ -0,0 +1,184 @@
+import bisect
+import re
+
+# Bump whenever the rules change, so cached extractions that relied on them are not reused
+RULES_VERSION = "rules-v3"
+
+# Attributes the rules can find; everything else (names, places, employers, ...) needs GPT
+RULE_ATTRIBUTES = ('Email', 'Phone', 'Personal Cell', 'Business Phone', 'SSN', 'Credit Card', 'Passport #',
+                   'DDL', 'Facebook Account', 'Twitter Account', 'Instagram Account')
+
+# Path segments on the social sites that are pages of the site itself rather than accounts
+RESERVED_HANDLES = {'sharer', 'share', 'sharer.php', 'home', 'home.php', 'intent', 'login', 'signup', 'p',
+                    'explore', 'search', 'hashtag', 'i', 'groups', 'pages', 'events', 'watch', 'reel',
+                    'reels', 'stories', 'accounts', 'about', 'privacy', 'help', 'policies', 'tr', 'dialog'}
+
+CELL_CONTEXT_RE = re.compile(r'\b(?:cell|mobile|cellular|personal)\b', re.IGNORECASE)
+BUSINESS_CONTEXT_RE = re.compile(r'\b(?:office|work|business|fax|main|desk|direct|ext)\b', re.IGNORECASE)
+PHONE_CONTEXT_CHARS = 30
+CLAUSE_BREAK_RE = re.compile(r'[,;\n]|\bor\b|\band\b')
+
+# Where a sentence ends: .!? followed by whitespace and a capital letter or quote, or a line break.
+# Identifiers are only attributed to the person when their sentence names them
+SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+(?=["(\[A-Z])|\n+')
+# A period that does not end the sentence: after an initial ("J. Doe", "U.S.") or an abbreviation
+# ("passport No. X1234567", "Dr. Jane Doe", "Main St. Apt. 4")
+ABBREVIATION_RE = re.compile(r'\b(?:[A-Z]|(?i:no|nos|nr|num|tel|ph|ext|dr|mr|mrs|ms|prof|rev|hon|jr|sr|st|ave|rd|'
+                             r'blvd|apt|ste|mt|ft|dept|inc|ltd|corp|co|vs|approx|est|gen|col|lt|capt|sgt))\.\Z')
+
+# Issuer prefixes (IIN ranges) of the card networks: Visa, Mastercard, American Express, Discover,
+# JCB, Diners Club and UnionPay. A digit run that starts with anything else is not read as a card
+CARD_PREFIX_RE = re.compile(r'4|5[1-5]|2(?:2[2-9][1-9]|[3-6]\d\d|7[01]\d|720)|3[47]|6(?:011|4[4-9]|5|2)|'
+                            r'35(?:2[89]|[3-8]\d)|3(?:0[0-5]|[689])')
+YEAR_RE = re.compile(r'(?:19|20)\d\d')
+
+# One alternation so the text is scanned once. Every branch starts with a lookbehind that rejects
+# positions in the middle of a token, which keeps the scan close to linear; the order matters where
+# branches overlap (an SSN or card number must not be read as a phone number)
+IDENTIFIER_RE = re.compile(r'''
+    (?<![\w.%+-])(?P<email>[\w.%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,})\b
+  | (?<![\w.-])(?i:(?:www|m|mobile)\.)?(?P<site>(?i:facebook|twitter|x|instagram))\.com/(?:people/)?
+        (?P<social>[\w.]{1,50})
+  | (?<![\w@])@(?P<handle>\w{1,15})\b(?=\s+(?:on\s+)?(?P<handle_site>(?i:twitter|x|instagram))\b)
+  | (?<!\w)(?i:passport(?:\s+(?:no\.?|number|num\.?|\#))?)\s*[:\#]?\s*(?P<passport>(?=[A-Za-z0-9]*\d)[A-Za-z0-9]{6,9})\b
+  | (?<!\w)(?i:(?:driver'?s?\s+licen[cs]e|DL)(?:\s+(?:no\.?|number|num\.?|\#))?)\s*[:\#]?\s*
+        (?P<ddl>(?=[A-Za-z0-9-]*\d)[A-Za-z0-9][A-Za-z0-9-]{4,14})\b
+  | (?<![\w-])(?P<ssn>\d{3}-\d{2}-\d{4})(?![\d-])
+  | (?<![\w-])(?P<card>\d{4}(?P<sep16>[ -])\d{4}(?P=sep16)\d{4}(?P=sep16)\d{4}
+                        | \d{4}(?P<sep15>[ -])\d{6}(?P=sep15)\d{5}
+                        | \d{13,19})(?![\d-])
+  | (?<![\w-])(?P<phone>(?:\+?1[\s.-]?)?(?:\(\d{3}\)\s?|\d{3}[\s.-])\d{3}[\s.-]\d{4})(?!\d)
+''', re.VERBOSE | re.ASCII)
+
+# Longest handle each site allows
+HANDLE_LENGTHS = {'facebook': 50, 'twitter': 15, 'x': 15, 'instagram': 30}
+SITE_ATTRIBUTES = {'facebook': 'Facebook Account', 'twitter': 'Twitter Account', 'x': 'Twitter Account',
+                   'instagram': 'Instagram Account'}
+
+
+def luhn_valid(digits):
+    """Check the Luhn checksum that every payment card number carries."""
+    total = 0
+    for i, char in enumerate(reversed(digits)):
+        digit = ord(char) - 48
+        if i % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def ssn_valid(ssn):
+    """Reject numbers the SSA never issues: area 000, 666 or 9xx, group 00 and serial 0000."""
+    area, group, serial = ssn.split('-')
+    return area not in ('000', '666') and area[0] != '9' and group != '00' and serial != '0000'
+
+
+def card_valid(value):
+    """
+    Check a card number candidate: a known issuer prefix and the Luhn checksum. Four groups of four
+    that are all plausible years ("2015 2016 2017 2018") are rejected even when the checksum passes.
+    """
+    digits = re.sub(r'[ -]', '', value)
+    if len(digits) == 16 and len(value) == 19 and all(YEAR_RE.fullmatch(group) for group in re.split(r'[ -]', value)):
+        return False
+    return CARD_PREFIX_RE.match(digits) is not None and luhn_valid(digits)
+
+
+def name_pattern(target_name):
+    """A regex that finds any word of target_name of two or more letters, or None if it has none."""
+    words = [word for word in re.findall(r'\w+', target_name or '') if len(word) >= 2 and not word.isdigit()]
+    if not words:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(word) for word in words) + r')\b', re.IGNORECASE)
+
+
+def sentence_starts(text):
+    """Offsets at which the sentences of text start, the first one included."""
+    starts = [0]
+    for match in SENTENCE_BREAK_RE.finditer(text):
+        start = match.start()
+        if '\n' not in match.group() and ABBREVIATION_RE.search(text, max(0, start - 8), start):
+            continue
+        starts.append(match.end())
+    return starts
+
+
+def phone_attribute(text, start, previous_end):
+    """Classify a phone number by the words just before it, within its own clause."""
+    context = CLAUSE_BREAK_RE.split(text[max(previous_end, start - PHONE_CONTEXT_CHARS):start])[-1]
+    if CELL_CONTEXT_RE.search(context):
+        return 'Personal Cell'
+    if BUSINESS_CONTEXT_RE.search(context):
+        return 'Business Phone'
+    return 'Phone'
+
+
+def find_identifiers(text, target_name=None):
+    """
+    Extract structured identifiers from text with a single pass of IDENTIFIER_RE.
+
+    With target_name, only identifiers in a sentence that mentions a word of the name are kept, so
+    the company address or office number on the person's page is not reported as theirs. Anything
+    dropped here is still asked of GPT, which reads the whole context.
+
+    Args:
+        text (str): Text about the target person, e.g. the cleaned paragraphs
+        target_name (str): Name of the target person, or None to keep every identifier
+
+    Returns:
+        dict: Attribute name -> set of values, only for the attributes that were found
+    """
+    found = {}
+    previous_end = 0
+    name_re = name_pattern(target_name) if target_name is not None else None
+    starts = sentence_starts(text)
+    ends = starts[1:] + [len(text)]
+
+    def add(attribute, value):
+        found.setdefault(attribute, set()).add(value)
+
+    def about_person(match):
+        if target_name is None:
+            return True
+        if name_re is None:
+            return False
+        sentence = bisect.bisect_right(starts, match.start()) - 1
+        return name_re.search(text, starts[sentence], ends[sentence]) is not None
+
+    for match in IDENTIFIER_RE.finditer(text):
+        clause_start, previous_end = previous_end, match.end()
+        if not about_person(match):
+            continue
+        kind = match.lastgroup
+        # handle_site is the last group of the @handle alternative, so lastgroup names it; the card
+        # separator groups are nested inside card, which closes after them
+        if kind == 'handle_site':
+            site = match.group('handle_site').lower()
+            add(SITE_ATTRIBUTES[site], '@' + match.group('handle'))
+            continue
+
+        value = match.group(kind)
+        if kind == 'email':
+            add('Email', value.lower())
+        elif kind == 'social':
+            site = match.group('site').lower()
+            # Twitter handles cannot contain dots, so a dot there ends the handle
+            handle = value.split('.')[0] if site in ('twitter', 'x') else value.rstrip('.')
+            if 0 < len(handle) <= HANDLE_LENGTHS[site] and handle.lower() not in RESERVED_HANDLES:
+                add(SITE_ATTRIBUTES[site], handle if site == 'facebook' else '@' + handle)
+        elif kind == 'passport':
+            add('Passport #', value.upper())
+        elif kind == 'ddl':
+            add('DDL', value.upper())
+        elif kind == 'ssn':
+            if ssn_valid(value):
+                add('SSN', value)
+        elif kind == 'card':
+            if card_valid(value):
+                add('Credit Card', re.sub(r'[ -]', '', value))
+        elif kind == 'phone':
+            add(phone_attribute(text, match.start(), clause_start), value.strip())
+
+    return found
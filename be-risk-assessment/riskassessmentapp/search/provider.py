@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from werkzeug.utils import import_string
+
+from riskassessmentapp.metrics import QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query):
+    """Lower-case and collapse whitespace so equivalent queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+class RateLimitScheduler:
+    """
+    Process-wide pacing for calls to the search provider.
+
+    Every call reserves the next free slot, at least min_interval seconds after the previous one,
+    and sleeps until its slot. Callers are executor threads, so the sleep never blocks an event loop.
+    """
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait_turn(self):
+        """Block until this caller may hit the provider and return the time spent waiting."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+
+        delay = slot - now
+        if delay > 0:
+            depth = QUEUE_DEPTH.labels("search_provider")
+            depth.inc()
+            try:
+                time.sleep(delay)
+            finally:
+                depth.dec()
+        return delay
+
+
+class SearchProvider:
+    """
+    Runs the blocking search provider off the event loop with result caching and shared pacing.
+
+    Provider calls run in a bounded thread pool. Results are cached per normalized query for
+    cache_ttl seconds, concurrent searches for the same query share one provider call, and the
+    RateLimitScheduler spaces calls at least min_interval seconds apart across the whole worker.
+    One call fetches several result pages; the search packages pause page_pause seconds between them.
+    SEARCH_PROVIDER_BACKEND replaces run_provider with another function of (query, num_results),
+    such as the stand-in the end-to-end benchmarks use.
+    """
+
+    def __init__(self, app=None):
+        self.max_workers = 2
+        self.cache_ttl = 600
+        self.cache_size = 512
+        self.min_interval = 2.0
+        self.page_pause = 2.0
+        self.num_results = 25
+        self.backend = run_provider
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._scheduler = RateLimitScheduler(self.min_interval)
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._counters = self._empty_counters()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_workers = app.config.get('SEARCH_PROVIDER_WORKERS', self.max_workers)
+        self.cache_ttl = app.config.get('SEARCH_PROVIDER_CACHE_TTL', self.cache_ttl)
+        self.cache_size = app.config.get('SEARCH_PROVIDER_CACHE_SIZE', self.cache_size)
+        self.min_interval = app.config.get('SEARCH_PROVIDER_MIN_INTERVAL', self.min_interval)
+        self.page_pause = app.config.get('SEARCH_PROVIDER_PAGE_PAUSE', self.page_pause)
+        self._scheduler = RateLimitScheduler(self.min_interval)
+        backend = app.config.get('SEARCH_PROVIDER_BACKEND')
+        self.backend = import_string(backend) if backend else partial(run_provider, page_pause=self.page_pause)
+
+        app.extensions['search_provider'] = self
+
+    async def search(self, query):
+        """
+        Return the result URLs for query without blocking the event loop.
+
+        Args:
+            query (str): The search query (person's name)
+
+        Returns:
+            list: The result URLs
+        """
+        key = normalize_query(query)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                self._counters["cache_hits"] += 1
+                return list(cached[1])
+
+            future = self._inflight.get(key)
+            started = future is None
+            if started:
+                self._counters["cache_misses"] += 1
+                future = self._get_executor().submit(self._search_and_cache, key, query)
+                self._inflight[key] = future
+            else:
+                self._counters["shared_calls"] += 1
+
+        if started:
+            # Registered outside the lock because the callback runs immediately if the call already finished
+            future.add_done_callback(lambda _: self._forget_inflight(key, future))
+
+        return list(await asyncio.wrap_future(future))
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                "cached_queries": len(self._cache),
+                "inflight_queries": len(self._inflight),
+                "max_workers": self.max_workers,
+                "cache_ttl": self.cache_ttl,
+                "min_interval": self.min_interval,
+                "page_pause": self.page_pause,
+            })
+            return stats
+
+    def _get_executor(self):
+        # Threads do not survive a fork, so each worker process gets its own pool
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="search-provider")
+            self._inflight = {}
+            self._pid = os.getpid()
+        return self._executor
+
+    def _forget_inflight(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _search_and_cache(self, key, query):
+        waited = self._scheduler.wait_turn()
+        started = time.monotonic()
+        urls = self.backend(query, self.num_results)
+
+        with self._lock:
+            self._counters["provider_calls"] += 1
+            self._counters["pacing_wait_seconds"] += waited
+            self._counters["provider_seconds"] += time.monotonic() - started
+            self._cache[key] = (time.monotonic(), tuple(urls))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return urls
+
+    @staticmethod
+    def _empty_counters():
+        return {
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "shared_calls": 0,
+            "provider_calls": 0,
+            "pacing_wait_seconds": 0.0,
+            "provider_seconds": 0.0,
+        }
+
+
+def run_provider(query, num_results, page_pause=2.0):
+    """
+    Call whichever search package is installed. This blocks, so it must run in an executor.
+    RateLimitScheduler spaces the calls; within a call the packages fetch one page of 10 results
+    per request and sleep page_pause seconds between those requests.
+
+    Args:
+        query (str): The search query (person's name)
+        num_results (int): Number of results to request
+        page_pause (float): Seconds between the result pages of this search
+
+    Returns:
+        list: The result URLs
+    """
+    # Try different approaches based on which package might be installed
+    try:
+        # For google package
+        from googlesearch import search
+        urls = [url for url in search(query, num=num_results, stop=num_results, pause=page_pause)]
+    except TypeError:
+        try:
+            # Alternative approach for older/different versions
+            from googlesearch import search
+            urls = [url for url in search(query, num_results=num_results, sleep_interval=page_pause)]
+        except (TypeError, AttributeError):
+            try:
+                # For google-search-results package (serpapi)
+                from serpapi import GoogleSearch
+
+                # You'll need an API key for this
+                serpapi_key = os.getenv("SERPAPI_API_KEY")
+                if not serpapi_key:
+                    raise ValueError("SERPAPI_API_KEY environment variable not set")
+
+                search_params = {
+                    "q": query,
+                    "num": num_results,
+                    "api_key": serpapi_key
+                }
+                search_results = GoogleSearch(search_params).get_dict()
+                urls = [result.get('link') for result in search_results.get('organic_results', [])]
+            except (ImportError, ValueError):
+                # Fallback to a simple list of dummy URLs for testing
+                logger.warning("No suitable search package found. Using test URLs.")
+                urls = [
+                    f"https://example.com/profile/{query.replace(' ', '-').lower()}",
+                    f"https://linkedin.com/in/{query.replace(' ', '-').lower()}",
+                    f"https://twitter.com/{query.replace(' ', '').lower()}",
+                    f"https://facebook.com/{query.replace(' ', '.').lower()}",
+                    f"https://example.org/about/{query.replace(' ', '_').lower()}"
+                ]
+
+    return urls
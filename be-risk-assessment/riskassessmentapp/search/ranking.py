@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Metadata fields that describe a page, in the order they are joined into the text that is embedded
+PAGE_TEXT_FIELDS = ("title", "site_name", "description", "h1", "h2_summary", "snippet")
+
+
+def page_text(metadata):
+    return "\n".join(metadata.get(field) or "" for field in PAGE_TEXT_FIELDS).strip()
+
+
+class EmbeddingRanker:
+    """
+    Ranks search results by cosine similarity between the query and each page's metadata.
+
+    The sentence-transformers model is loaded once per worker process, in the ranker's own single
+    thread, and every ranking encodes all of its uncached texts in one batched call on that thread.
+    Page embeddings are cached by URL and a hash of the text that was embedded, so a page is only
+    encoded again when its metadata changes. Ranking never waits longer than budget_seconds: while
+    the model is still loading, or if encoding is too slow, rank() returns None and the caller keeps
+    the keyword ranking; a batch that finished late still fills the cache for the next request.
+    """
+
+    def __init__(self, app=None):
+        self.mode = "keyword"
+        self.model_name = "sentence-transformers/all-MiniLM-L6-v2"
+        self.budget_seconds = 0.25
+        self.cache_size = 4096
+        self.batch_size = 64
+        self.preload = True
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._model = None
+        self._model_future = None
+        self._shared_model = None
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._counters = self._empty_counters()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.mode = app.config.get('RANKING_MODE', self.mode)
+        self.model_name = app.config.get('RANKING_MODEL', self.model_name)
+        self.budget_seconds = app.config.get('RANKING_BUDGET_SECONDS', self.budget_seconds)
+        self.cache_size = app.config.get('RANKING_CACHE_SIZE', self.cache_size)
+        self.preload = app.config.get('RANKING_PRELOAD', self.preload)
+
+        app.extensions['ranker'] = self
+
+        if self.mode == "embedding" and self.preload:
+            # Loaded on the first request rather than at import so each forked worker loads its own copy
+            app.before_request(self._preload)
+
+    def start_loading(self):
+        """Start loading the model in the background if this process has not done so yet."""
+        with self._lock:
+            executor = self._get_executor()
+            if self._model_future is None:
+                self._model_future = executor.submit(self._load_model)
+            return self._model_future
+
+    def load_before_fork(self):
+        """
+        Load the model on the calling thread, for worker processes forked afterwards to share.
+
+        Called by riskassessmentapp.warmup in the gunicorn master when WARMUP_RANKING_MODEL is set:
+        every worker then starts with the model already loaded, its weights in pages shared
+        copy-on-write, instead of loading a private copy on its first request.
+        """
+        if self._shared_model is None:
+            from sentence_transformers import SentenceTransformer
+            self._shared_model = SentenceTransformer(self.model_name, device="cpu")
+        return self._shared_model
+
+    def _preload(self):
+        # before_request hooks must return None, or Flask treats the value as the response
+        self.start_loading()
+
+    async def rank(self, query, pages):
+        """
+        Score pages by semantic similarity to query.
+
+        Args:
+            query (str): The search query (person's name)
+            pages (list): Page metadata dictionaries with a "url" key
+
+        Returns:
+            list: One cosine similarity per page, in the same order, or None if the model is not
+                  ready or encoding did not finish within budget_seconds
+        """
+        if not pages:
+            return []
+
+        model_future = self.start_loading()
+        if not model_future.done():
+            self._count("fallbacks_model_loading")
+            return None
+        if model_future.exception() is not None:
+            self._count("fallbacks_model_error")
+            return None
+
+        query_key = ("query", " ".join(query.lower().split()))
+        keys = [query_key]
+        texts = [query]
+        for page in pages:
+            text = page_text(page)
+            keys.append((page["url"], hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()))
+            texts.append(text)
+
+        vectors = self._cached(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            futures = self._encode_missing({keys[i]: texts[i] for i in missing})
+            try:
+                batches = await asyncio.wait_for(
+                    asyncio.gather(*[asyncio.wrap_future(future) for future in futures]), self.budget_seconds)
+            except asyncio.TimeoutError:
+                self._count("fallbacks_timeout")
+                return None
+            encoded = {}
+            for batch in batches:
+                encoded.update(batch)
+            for i in missing:
+                vectors[i] = encoded[keys[i]]
+
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        matrix = np.vstack(vectors[1:])
+        return (matrix @ vectors[0]).tolist()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            future = self._model_future if self._pid == os.getpid() else None
+            stats.update({
+                "mode": self.mode,
+                "model": self.model_name,
+                "model_loaded": future is not None and future.done() and future.exception() is None,
+                "budget_seconds": self.budget_seconds,
+                "cached_embeddings": len(self._cache),
+                "inflight_embeddings": len(self._inflight),
+            })
+            return stats
+
+    def _get_executor(self):
+        # Threads do not survive a fork, so each worker process gets its own thread and model
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ranker")
+            self._model = self._shared_model
+            self._model_future = None
+            if self._shared_model is not None:
+                self._model_future = Future()
+                self._model_future.set_result(self._shared_model)
+            self._cache = OrderedDict()
+            self._inflight = {}
+            self._counters = self._empty_counters()
+            self._pid = os.getpid()
+        return self._executor
+
+    def _load_model(self):
+        start = time.perf_counter()
+        try:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device="cpu")
+        except Exception as e:
+            logger.error("Could not load ranking model %s: %s", self.model_name, e)
+            raise
+        with self._lock:
+            self._counters["model_load_seconds"] = time.perf_counter() - start
+        return self._model
+
+    def _encode_missing(self, texts_by_key):
+        """
+        Return the futures that will produce embeddings for every key, submitting one batch for the
+        keys that no earlier request is already encoding.
+        """
+        with self._lock:
+            executor = self._get_executor()
+            futures = {self._inflight[key] for key in texts_by_key if key in self._inflight}
+            new_keys = [key for key in texts_by_key if key not in self._inflight]
+            if new_keys:
+                future = executor.submit(self._encode_and_cache, new_keys, [texts_by_key[key] for key in new_keys])
+                for key in new_keys:
+                    self._inflight[key] = future
+                futures.add(future)
+            else:
+                future = None
+
+        if future is not None:
+            # Registered outside the lock because the callback runs immediately if the batch already finished
+            future.add_done_callback(lambda _: self._forget_inflight(new_keys, future))
+        return futures
+
+    def _forget_inflight(self, keys, future):
+        with self._lock:
+            for key in keys:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def _encode_and_cache(self, keys, texts):
+        start = time.perf_counter()
+        vectors = self._model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True,
+                                     convert_to_numpy=True, show_progress_bar=False)
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["encoded_texts"] += len(texts)
+            self._counters["encode_seconds"] += time.perf_counter() - start
+            for key, vector in zip(keys, vectors):
+                self._cache[key] = vector
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(zip(keys, vectors))
+
+    def _cached(self, keys):
+        with self._lock:
+            vectors = []
+            for key in keys:
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    self._counters["cache_hits"] += 1
+                else:
+                    self._counters["cache_misses"] += 1
+                vectors.append(vector)
+            return vectors
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    @staticmethod
+    def _empty_counters():
+        return {
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "batches": 0,
+            "encoded_texts": 0,
+            "encode_seconds": 0.0,
+            "model_load_seconds": 0.0,
+            "fallbacks_model_loading": 0,
+            "fallbacks_model_error": 0,
+            "fallbacks_timeout": 0,
+        }
@@ -1,48 +1,301 @@
+import logging
 import os
 import random
 import time
 import asyncio
+import queue
+import threading
 import aiohttp
-from aiohttp import ClientSession, ClientTimeout
-from googlesearch import search
-from bs4 import BeautifulSoup
+from aiohttp import ClientTimeout
 import json
-from flask import Flask, jsonify, request, Blueprint
-from math import exp
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
-from openai import OpenAI
+import click
+from flask import Flask, Response, jsonify, request, Blueprint, current_app
+from riskassessmentapp.extensions import (
+    http_pool, page_cache, llm_cache, search_provider, ranker, dedup_index, domain_health,
+)
+from riskassessmentapp.search.llm_cache import make_cache_key
+from riskassessmentapp.search.openai_clients import async_openai_client
+from riskassessmentapp.search.assessment_store import find_fresh_assessment, rescore_assessments, save_assessment
+from riskassessmentapp.search.document import parse_document
+from riskassessmentapp.search.domain_health import DomainUnavailable, parse_retry_after
+from riskassessmentapp.search.download import read_body, decode_body
+from riskassessmentapp.connection import current_connection
+from riskassessmentapp.logging_config import AttributeSummary, Redacted
+from riskassessmentapp.users.auth import admin_required
+from riskassessmentapp.metrics import ASSESSMENT_LOOKUPS, count_llm_call, observe_fetch, observe_llm_call, queued, timed_stage
+from riskassessmentapp.search.chunking import (
+    chunk_pieces, completion_budget, count_tokens, current_usage, record_cached_call, record_deduplicated_call, record_skipped_call,
+    record_usage,
+    TokenUsage
+)
+from riskassessmentapp.search.pii_rules import RULES_VERSION, find_identifiers
+from riskassessmentapp.search.scoring import ATTRIBUTE_NAMES, default_engine, risk_level_for
+from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception
 from dotenv import load_dotenv
 import ast
 
 risksearch = Blueprint('search', __name__, template_folder='templates')
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
-OpenAI.api_key = os.getenv("OPENAI_API_KEY")
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI()
+# Bump a prompt version whenever its prompt changes so that cached results are no longer used
+CLEAN_PROMPT_VERSION = "clean-v2"
+EXTRACT_PROMPT_VERSION = "extract-v3"
+# Which attributes are asked about depends on the local rules, so their version is part of the cache key
+EXTRACTION_CACHE_VERSION = f"{EXTRACT_PROMPT_VERSION}/{RULES_VERSION}"
+
+# Token budgets for the content sent in one GPT call; longer inputs are split into chunks
+CLEAN_CHUNK_TOKENS = 6000
+CLEAN_MAX_CHUNKS = 8  # Bounds the cost of a single huge page
+EXTRACT_CHUNK_TOKENS = 12000
+
+# max_tokens is sized from the input: expected output tokens per input token, with a floor and a ceiling
+CLEAN_COMPLETION_RATIO = 0.5
+CLEAN_MIN_COMPLETION_TOKENS = 512
+CLEAN_MAX_COMPLETION_TOKENS = 4096
+EXTRACT_COMPLETION_RATIO = 0.25
+EXTRACT_MIN_COMPLETION_TOKENS = 512
+EXTRACT_MAX_COMPLETION_TOKENS = 2048
+
+# (attribute, field name in the prompt, description) for every attribute GPT can be asked about
+PII_PROMPT_FIELDS = (
+    ('Name', 'Name', "Full name, including variations or nicknames"),
+    ('Location', 'Location', "Current city/state/country of residence"),
+    ('Email', 'Email', "Any email addresses"),
+    ('Phone', 'Phone', "Any phone numbers (personal or unspecified)"),
+    ('DoB', 'DOB', "Date of birth in MM-DD-YYYY format when possible"),
+    ('Address', 'Address', "Full or partial physical addresses"),
+    ('Gender', 'Gender', "Gender information"),
+    ('Employer', 'Employer', "Current employer or business affiliation"),
+    ('Education', 'Education', "Schools attended, degrees earned"),
+    ('Birth Place', 'Birth Place', "City/state/country of birth"),
+    ('Personal Cell', 'Personal Cell', "Mobile phone numbers specifically"),
+    ('Business Phone', 'Business Phone', "Work-related phone numbers"),
+    ('Facebook Account', 'Facebook Account', "Facebook username or profile info"),
+    ('Twitter Account', 'Twitter Account', "Twitter handle or profile info"),
+    ('Instagram Account', 'Instagram Account', "Instagram username or profile info"),
+    ('DDL', 'DDL', "Driver's license information"),
+    ('Passport #', 'Passport', "Passport information"),
+    ('Credit Card', 'Credit Card', "Credit card details"),
+    ('SSN', 'SSN', "Social Security Number"),
+)
+
+
+class AssessmentError(Exception):
+    """Raised when pages or GPT calls failed, so an assessment is incomplete rather than empty."""
+
+
+async def request_pii_from_gpt_async(llm_client, system_prompt, user_prompt, model, max_tokens):
+    """
+    Send the PII extraction prompt to GPT and parse the reply.
+
+    Args:
+        llm_client (AsyncOpenAI): Async OpenAI client to use
+        system_prompt (str): The system prompt
+        user_prompt (str): The user prompt containing the text to extract from
+        model (str): OpenAI model to use for the extraction
+        max_tokens (int): Completion token limit
+
+    Returns:
+        dict: The parsed PII fields, or None if the request or parsing failed
+    """
+    try:
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await llm_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.2,
+                max_tokens=max_tokens
+            )
+        finally:
+            observe_llm_call("extract", model, time.perf_counter() - start, response)
+        record_usage(response)
+        extracted_pii = response.choices[0].message.content.strip()
+        logger.debug("Raw GPT response: %s", Redacted(extracted_pii))
+        if not extracted_pii:
+            logger.error("GPT response is None or empty.")
+            return None
+
+    except Exception as e:
+        logger.error("Error processing GPT response: %s", e)
+        return None
+
+    return parse_pii_response(extracted_pii)
+
+
+def parse_pii_response(extracted_pii):
+    """
+    Parse GPT's PII reply as JSON, falling back to a Python literal.
+
+    Returns:
+        dict: The parsed PII fields, or None if the reply could not be parsed
+    """
+    # Attempt to parse the GPT response
+    try:
+        # Fix invalid JSON if necessary
+        extracted_pii = extracted_pii.strip("```json").strip("```").strip()  # Remove markdown formatting
+
+        # Attempt JSON parsing
+        pii_data = json.loads(extracted_pii)  # Parse as JSON
+
+    except json.JSONDecodeError as e:
+        logger.warning("JSON parsing of the GPT response failed, trying ast.literal_eval: %s", e)
+        try:
+            # Try evaluating as a Python dictionary
+            pii_data = ast.literal_eval(extracted_pii)
+        except (ValueError, SyntaxError) as e:
+            logger.error("Failed to parse GPT result as dictionary: %s (%s)", e, Redacted(extracted_pii))
+            return None
+
+    return pii_data
+
+
+async def extract_pii_with_gpt_async(llm_client, data_into_list, attributes, target_name, model="gpt-4o-mini",
+                                     raise_on_failure=False):
+    """
+    Extract PII attributes using GPT from structured, meaningful paragraphs rather than just lines of text.
+
+    Paragraphs that do not fit one request are split into token-budgeted chunks, which are extracted
+    concurrently and merged into the same attributes. A chunk is not sent to GPT when the local rules,
+    run over every chunk first, and the attributes passed in already cover everything its prompt
+    would ask about.
+
+    Args:
+        llm_client (AsyncOpenAI): Async OpenAI client to use
+        data_into_list (list): List of structured paragraphs with meaningful context about target person
+        attributes (dict): Dictionary containing sets for each PII attribute
+        target_name (str): Name of the target person
+        model (str): OpenAI model to use for the extraction
+        raise_on_failure (bool): Raise AssessmentError when the extraction of a chunk fails instead of
+                                 leaving that chunk out
+
+    Returns:
+        dict: Updated attributes dictionary with extracted PII values
+    """
+    async def extract_chunk(input_data, remaining, max_tokens):
+        if all_found(attributes, remaining):
+            record_skipped_call()
+            count_llm_call("extract", "skipped")
+            return None
+        system_prompt, user_prompt = build_pii_prompts(input_data, target_name, remaining)
+
+        cache_key = make_cache_key("extract", EXTRACTION_CACHE_VERSION, model, target_name, input_data)
+        pii_data = await asyncio.to_thread(llm_cache.get, cache_key)
+        if pii_data is not None:
+            record_cached_call()
+            count_llm_call("extract", "cached")
+            return pii_data
+
+        pii_data = await request_pii_from_gpt_async(llm_client, system_prompt, user_prompt, model, max_tokens)
+        if pii_data is None and raise_on_failure:
+            raise AssessmentError("PII extraction failed")
+        if pii_data is not None:
+            await asyncio.to_thread(llm_cache.put, cache_key, "extract", EXTRACTION_CACHE_VERSION, model, pii_data)
+        return pii_data
+
+    # Token counting and the rules are CPU work, done in a thread to keep the event loop free
+    chunks = await asyncio.to_thread(prepare_pii_extraction, data_into_list, attributes, target_name, model)
+
+    for pii_data in await asyncio.gather(*[extract_chunk(*chunk) for chunk in chunks]):
+        if pii_data is not None:
+            with timed_stage("pii_merge"):
+                merge_pii_data(attributes, pii_data)
+
+    return attributes
+
+
+def prepare_pii_extraction(data_into_list, attributes, target_name, model):
+    """
+    Split the paragraphs into extraction chunks and apply the local rules to each of them.
+
+    Args:
+        data_into_list (list): List of structured paragraphs
+        attributes (dict): Dictionary containing sets for each PII attribute, updated by the rules
+        target_name (str): Name of the target person
+        model (str): OpenAI model the chunks will be sent to
+
+    Returns:
+        list: (chunk text, attributes its prompt asks about, completion budget) for each chunk
+    """
+    chunks = pii_extraction_chunks(data_into_list, model)
+    logger.info("Extracting PII attributes for: %s (%d chunks)", Redacted(target_name), len(chunks))
+    with timed_stage("pii_rules"):
+        remaining = [apply_pii_rules(chunk, attributes, target_name) for chunk in chunks]
+    return [(chunk, fields, extraction_budget(chunk, model)) for chunk, fields in zip(chunks, remaining)]
 
 
-def extract_pii_with_gpt(data_into_list, attributes, target_name, model="gpt-4o-mini"):
+def apply_pii_rules(input_data, attributes, target_name):
     """
-        Modified version to extract PII attributes using GPT from structured, meaningful paragraphs
-        rather than just lines of text.
+    Add the identifiers the local rules find in input_data to attributes.
 
-        Args:
-        - data_into_list (list): List of structured paragraphs with meaningful context about target person
-        - attributes (dict): Dictionary containing sets for each PII attribute
-        - target_name (str): Name of the target person
-        - model (str): OpenAI model to use for the extraction
+    Args:
+        input_data (str): The text about the target person
+        attributes (dict): Dictionary containing sets for each PII attribute
+        target_name (str): Name of the target person; identifiers are only taken from sentences naming them
 
-        Returns:
-        - dict: Updated attributes dictionary with extracted PII values
+    Returns:
+        list: The attributes the rules did not find in input_data, which the prompt still asks about
+              (the score only depends on whether an attribute was found, so found ones are not asked
+              about again). The list depends on input_data and target_name alone, like the cache key.
     """
-    # Combine the data into a single input for GPT
-    # Include separator lines to help GPT understand the structure
-    input_data = "\n\n".join(data_into_list)
+    found = find_identifiers(input_data, target_name)
+    for attribute, values in found.items():
+        if not isinstance(attributes.get(attribute), set):
+            attributes[attribute] = set(attributes.get(attribute) or ())
+        attributes[attribute].update(values)
+
+    remaining = [attribute for attribute, _, _ in PII_PROMPT_FIELDS if attribute not in found]
+    logger.debug("Local rules found %s; asking GPT about %d attributes", sorted(found), len(remaining))
+    return remaining
+
+
+def all_found(attributes, remaining):
+    """True if every attribute in remaining already has a value, so asking GPT would not change the score."""
+    return all(attributes.get(attribute) for attribute in remaining)
+
+
+def pii_extraction_chunks(data_into_list, model):
+    """
+    Group the paragraphs into inputs of at most EXTRACT_CHUNK_TOKENS tokens each.
+
+    Args:
+        data_into_list (list): List of structured paragraphs
+        model (str): OpenAI model the chunks will be sent to
+
+    Returns:
+        list: The chunk texts, paragraphs separated by blank lines to help GPT understand the structure
+    """
+    return chunk_pieces(data_into_list, EXTRACT_CHUNK_TOKENS, model, separator="\n\n")
+
+
+def extraction_budget(input_data, model):
+    return completion_budget(count_tokens(input_data, model), EXTRACT_COMPLETION_RATIO,
+                             EXTRACT_MIN_COMPLETION_TOKENS, EXTRACT_MAX_COMPLETION_TOKENS)
 
-    print(f"Extracting PII attributes for: {target_name}")
-    print(f"Input data length: {len(input_data)} characters")
+
+def build_pii_prompts(input_data, target_name, attributes=None):
+    """
+    Build the system and user prompts for PII extraction.
+
+    Args:
+        input_data (str): The combined paragraphs about the target person
+        target_name (str): Name of the target person
+        attributes (list): Attribute names to ask for; all of PII_PROMPT_FIELDS if not given
+
+    Returns:
+        tuple: (system prompt, user prompt)
+    """
+    fields = [(field, description) for attribute, field, description in PII_PROMPT_FIELDS
+              if attributes is None or attribute in attributes]
+    field_lines = "\n".join(f"   - {field}: {description}" for field, description in fields)
+    json_template = ",\n".join(f"  '{field}': ''" for field, _ in fields)
 
     # Define system and user prompts optimized for contextual extraction
     system_prompt = (
@@ -57,25 +310,7 @@ def extract_pii_with_gpt(data_into_list, attributes, target_name, model="gpt-4o-
         f"{input_data}\n\n"
         "Guidelines for extraction:\n"
         "1. Extract the following attributes (provide empty string if not found):\n"
-        "   - Name: Full name, including variations or nicknames\n"
-        "   - Location: Current city/state/country of residence\n"
-        "   - Email: Any email addresses\n"
-        "   - Phone: Any phone numbers (personal or unspecified)\n"
-        "   - DOB: Date of birth in MM-DD-YYYY format when possible\n"
-        "   - Address: Full or partial physical addresses\n"
-        "   - Gender: Gender information\n"
-        "   - Employer: Current employer or business affiliation\n"
-        "   - Education: Schools attended, degrees earned\n"
-        "   - Birth Place: City/state/country of birth\n"
-        "   - Personal Cell: Mobile phone numbers specifically\n"
-        "   - Business Phone: Work-related phone numbers\n"
-        "   - Facebook Account: Facebook username or profile info\n"
-        "   - Twitter Account: Twitter handle or profile info\n"
-        "   - Instagram Account: Instagram username or profile info\n"
-        "   - DDL: Driver's license information\n"
-        "   - Passport: Passport information\n"
-        "   - Credit Card: Credit card details\n"
-        "   - SSN: Social Security Number\n\n"
+        f"{field_lines}\n\n"
 
         "2. PAY SPECIAL ATTENTION to URL patterns, page titles, and metadata that might contain PII.\n"
         "3. For multiple values of the same attribute, use comma-separated strings.\n"
@@ -85,78 +320,26 @@ def extract_pii_with_gpt(data_into_list, attributes, target_name, model="gpt-4o-
         "7. Do **not** include extra text, explanations, or additional details outside of the requested attributes.\n\n"
         "Format the final response as a **valid JSON dictionary**:\n"
         "{\n"
-        "  'Name': '',\n"
-        "  'Location': '',\n"
-        "  'Email': '',\n"
-        "  'Phone': '',\n"
-        "  'DOB': '',\n"
-        "  'Address': '',\n"
-        "  'Gender': '',\n"
-        "  'Employer': '',\n"
-        "  'Education': '',\n"
-        "  'Birth Place': '',\n"
-        "  'Personal Cell': '',\n"
-        "  'Business Phone': '',\n"
-        "  'Facebook Account': '',\n"
-        "  'Twitter Account': '',\n"
-        "  'Instagram Account': '',\n"
-        "  'DDL': '',\n"
-        "  'Passport': '',\n"
-        "  'Credit Card': '',\n"
-        "  'SSN': ''\n"
+        f"{json_template}\n"
         "}\n"
         "Ensure the response is **valid JSON** without extra text or explanations."
     )
 
-    extracted_pii = None  # Initialize the variable to avoid reference errors
-
-    try:
-        # Make a request to GPT
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.2,  # Lower temperature for consistent output
-            max_tokens=15000   # Adjust based on expected input/output size
-        )
-
-        # Log raw GPT response
-        extracted_pii = response.choices[0].message.content.strip()
-        print("[DEBUG] Raw GPT Response:\n", extracted_pii)
-
-        if not extracted_pii:
-            print("[ERROR] GPT response is None or empty.")
-            return attributes  # Return the original attributes unchanged
+    return system_prompt, user_prompt
 
-    except Exception as e:
-        print(f"[ERROR] Error processing GPT response:\n{e}")
-        return attributes  # Return the original attributes unchanged
 
-    # Attempt to parse the GPT response
-    try:
-        # Fix invalid JSON if necessary
-        print("[DEBUG] Attempting to parse GPT response...")
-        extracted_pii = extracted_pii.strip("```json").strip("```").strip()  # Remove markdown formatting
-        print("[DEBUG] Cleaned GPT response:\n", extracted_pii)
-
-        # Attempt JSON parsing
-        pii_data = json.loads(extracted_pii)  # Parse as JSON
-        print("[DEBUG] Parsed PII Data as JSON:\n", pii_data)
+def merge_pii_data(attributes, pii_data):
+    """
+    Add the non-empty values GPT extracted to the attribute sets.
 
-    except json.JSONDecodeError as e:
-        print(f"[WARNING] JSON parsing failed. Trying ast.literal_eval...\nError: {e}")
-        try:
-            # Try evaluating as a Python dictionary
-            pii_data = ast.literal_eval(extracted_pii)
-            print("[DEBUG] Parsed PII Data using ast.literal_eval:\n", pii_data)
-        except (ValueError, SyntaxError) as e:
-            print(f"[ERROR] Failed to parse GPT result as dictionary:\n{extracted_pii}\nError: {e}")
-            return attributes  # Return the original attributes unchanged
+    Args:
+        attributes (dict): Dictionary containing sets for each PII attribute
+        pii_data (dict): The parsed GPT reply
 
+    Returns:
+        dict: The updated attributes dictionary
+    """
     # Update the attributes dictionary
-    print("[DEBUG] Updating attributes dictionary...")
     for key, value in pii_data.items():
         if key in attributes:
             # Ensure attributes[key] is a set
@@ -165,33 +348,10 @@ def extract_pii_with_gpt(data_into_list, attributes, target_name, model="gpt-4o-
 
             if value:  # Only add non-empty values
                 attributes[key].add(value)
-                print(f"[DEBUG] Added value for key '{key}': {value}")
-            else:
-                print(f"[DEBUG] Skipping empty value for key '{key}'.")
 
-    print("[DEBUG] Final attributes dictionary:\n", attributes)
+    logger.debug("Attributes after merging GPT result: %s", AttributeSummary(attributes))
     return attributes
 
-def calculate_privacy_score(willingness_measure, resolution_power, beta_coefficient):
-    privacy_score = 1 / exp(beta_coefficient * (1 - willingness_measure) * resolution_power)
-    return privacy_score
-
-
-def calculate_overall_risk_score(pii_attributes, weights, willingness_measures, resolution_powers, beta_coefficients):
-    overall_risk_score = 0
-    if not any(pii_attributes.values()):
-        return 0  # No personal information found
-    for attribute in pii_attributes:
-        if pii_attributes[attribute]:  # Only calculate for attributes that have values
-            weight = weights.get(attribute, 0)
-            willingness_measure = willingness_measures.get(attribute, 0)
-            resolution_power = resolution_powers.get(attribute, 0)
-            beta_coefficient = beta_coefficients.get(attribute, 1)
-            privacy_score = calculate_privacy_score(willingness_measure, resolution_power, beta_coefficient)
-            overall_risk_score += weight * privacy_score
-    return overall_risk_score
-
-
 async def extract_page_metadata(html_content, url):
     """
     Extract comprehensive metadata from a webpage.
@@ -203,53 +363,20 @@ async def extract_page_metadata(html_content, url):
     Returns:
         dict: A dictionary containing detailed webpage metadata
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Basic URL analysis for domain and path
-    from urllib.parse import urlparse
-    parsed_url = urlparse(url)
-    domain = parsed_url.netloc
-    path = parsed_url.path
+    # Parsing is CPU work, done in a thread to keep the event loop free
+    document = await asyncio.to_thread(parse_document, html_content, url)
+    domain = document.domain
 
-    # Extract title
-    title = soup.title.string if soup.title else "No title available"
+    title = document.title if document.title is not None else "No title available"
+    description = document.description
+    og_description = document.og_description
+    og_site_name = document.og_site_name
+    keywords = document.keywords
+    snippet = document.snippet
 
-    # Extract meta description
-    description_tag = soup.find("meta", {"name": "description"})
-    description = description_tag.get("content", "") if description_tag else ""
-
-    # Extract meta keywords
-    keywords_tag = soup.find("meta", {"name": "keywords"})
-    keywords = keywords_tag.get("content", "") if keywords_tag else ""
-
-    # Extract Open Graph metadata
-    og_title = soup.find("meta", {"property": "og:title"})
-    og_title = og_title.get("content", "") if og_title else ""
-
-    og_description = soup.find("meta", {"property": "og:description"})
-    og_description = og_description.get("content", "") if og_description else ""
-
-    og_site_name = soup.find("meta", {"property": "og:site_name"})
-    og_site_name = og_site_name.get("content", "") if og_site_name else ""
-
-    # Extract a snippet of text (first paragraph or visible text)
-    snippet = ""
-    for p in soup.find_all('p'):
-        if p.text and len(p.text.strip()) > 50:  # Find a paragraph with reasonable content
-            snippet = p.text.strip()[:200] + "..." if len(p.text.strip()) > 200 else p.text.strip()
-            break
-
-    if not snippet:
-        # If no good paragraph found, just get some visible text
-        visible_text = soup.get_text().strip()
-        snippet = visible_text[:200] + "..." if len(visible_text) > 200 else visible_text
-
-    # Extract heading content as it's often very relevant
-    h1_content = [h.text.strip() for h in soup.find_all('h1') if h.text.strip()]
-    h2_content = [h.text.strip() for h in soup.find_all('h2') if h.text.strip()]
-
-    h1_text = h1_content[0] if h1_content else ""
-    h2_text = "; ".join(h2_content[:3]) if h2_content else ""  # Just include first few h2s
+    # Heading content is often very relevant
+    h1_text = document.h1[0] if document.h1 else ""
+    h2_text = "; ".join(document.h2[:3]) if document.h2 else ""  # Just include first few h2s
 
     # Create webpage info object with enhanced metadata
     webpage_info = {
@@ -267,20 +394,42 @@ async def extract_page_metadata(html_content, url):
     return webpage_info
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(1),
-       retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)))
-async def fetch_url(session, url):
+# Responses that will not change if the same URL is requested again a second later
+NON_RETRYABLE_STATUSES = range(400, 500)
+# Responses that say something about the health of the whole domain rather than one page
+DOMAIN_FAILURE_STATUSES = (403, 429)
+
+
+def is_retryable_fetch_error(error):
+    """Retry timeouts, connection errors and 5xx responses; never 4xx responses or open circuits."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status not in NON_RETRYABLE_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+@retry(stop=stop_after_attempt(2), wait=wait_fixed(1), retry=retry_if_exception(is_retryable_fetch_error),
+       reraise=True)
+async def fetch_url(session, url, mode="full", max_bytes=5 * 1024 * 1024):
     """
     Fetch URL content with improved error handling and timeout management.
+    Pages are served from the page cache while fresh and revalidated with a conditional GET once stale.
+    The body is streamed with a hard size cap; in "metadata" mode reading stops as soon as the
+    head, first h1 and first substantial paragraph have arrived.
+
+    Every network fetch goes through the domain health registry, which paces requests per domain,
+    sizes the timeout from the domain's observed latency and fails fast while its circuit is open.
 
     Args:
         session (ClientSession): The aiohttp session to use
         url (str): The URL to fetch
+        mode (str): "full" for the whole page or "metadata" for just enough for extract_page_metadata
+        max_bytes (int): Maximum number of body bytes to read
 
     Returns:
         str: The HTML content of the URL
 
     Raises:
+        DomainUnavailable: If the domain is known to be failing
         Exception: If the URL cannot be fetched after retries
     """
     headers = {
@@ -293,346 +442,957 @@ async def fetch_url(session, url):
         'Cache-Control': 'no-cache',
     }
 
-    # Use a shorter timeout to fail faster on problematic URLs
-    timeout = ClientTimeout(total=15, connect=5, sock_connect=5, sock_read=15)
+    cached_page = None
+    if page_cache.enabled:
+        cached_page = await asyncio.to_thread(page_cache.get, url)
+        if cached_page and page_cache.is_fresh(cached_page):
+            page_cache.record_hit()
+            return cached_page.body
+
+        # Revalidate a stale copy with a conditional GET
+        if cached_page and cached_page.etag:
+            headers['If-None-Match'] = cached_page.etag
+        if cached_page and cached_page.last_modified:
+            headers['If-Modified-Since'] = cached_page.last_modified
 
     try:
-        async with session.get(url, headers=headers, timeout=timeout, allow_redirects=True) as response:
-            # Check for HTTP errors
-            if response.status >= 400:
-                raise aiohttp.ClientResponseError(
-                    response.request_info,
-                    response.history,
-                    status=response.status,
-                    message=f"HTTP Error {response.status}",
-                    headers=response.headers
-                )
+        guard = await domain_health.guard(url, kind=mode)
+    except DomainUnavailable as e:
+        logger.info("Skipping %s: %s", url, e)
+        raise
 
-            # Check content type to ensure it's HTML
-            content_type = response.headers.get('Content-Type', '')
-            if not ('text/html' in content_type.lower() or 'application/xhtml+xml' in content_type.lower()):
-                raise ValueError(f"Unsupported content type: {content_type}")
+    # Fail faster on domains that usually answer quickly; unknown domains get the maximum
+    timeout = ClientTimeout(total=guard.timeout, connect=min(5, guard.timeout), sock_connect=min(5, guard.timeout),
+                            sock_read=guard.timeout)
 
-            # Get the content
-            html_content = await response.text()
+    # Recorded per network fetch; fresh page-cache hits are counted by the page cache instead
+    fetch_status = "error"
+    fetch_start = time.perf_counter()
+    async with guard:
+        try:
+            async with session.get(url, headers=headers, timeout=timeout, allow_redirects=True) as response:
+                fetch_status = response.status
+                if response.status == 304 and cached_page:
+                    guard.record_success(sample=False)
+                    await asyncio.to_thread(page_cache.mark_revalidated, cached_page)
+                    return cached_page.body
+
+                # Check for HTTP errors
+                if response.status >= 400:
+                    if response.status in DOMAIN_FAILURE_STATUSES or response.status >= 500:
+                        retry_after = parse_retry_after(response.headers.get('Retry-After')) \
+                            if response.status == 429 else None
+                        guard.record_failure(f"HTTP {response.status}", retry_after=retry_after)
+                    else:
+                        guard.record_success(sample=False)
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=f"HTTP Error {response.status}",
+                        headers=response.headers
+                    )
+
+                # Check content type to ensure it's HTML
+                content_type = response.headers.get('Content-Type', '')
+                if not ('text/html' in content_type.lower() or 'application/xhtml+xml' in content_type.lower()):
+                    guard.record_success(sample=False)
+                    raise ValueError(f"Unsupported content type: {content_type}")
+
+                # Stream the content and decode it without statistical charset detection
+                body, complete = await read_body(response, mode=mode, max_bytes=max_bytes)
+                guard.record_success()
+                html_content = decode_body(response, body)
+
+                # Basic validation of the content
+                if not html_content or len(html_content) < 500:  # Very small responses are likely errors
+                    raise ValueError("Response too small or empty")
+
+                # Only complete pages are cached, so later full-mode fetches never get a truncated body
+                if page_cache.enabled and complete:
+                    await asyncio.to_thread(page_cache.put, url, html_content,
+                                            etag=response.headers.get('ETag'),
+                                            last_modified=response.headers.get('Last-Modified'),
+                                            refreshed=cached_page is not None)
+
+                return html_content
+
+        except asyncio.TimeoutError:
+            fetch_status = "timeout"
+            guard.record_failure("timeout")
+            logger.info("Error fetching %s: timed out after %.1fs", url, guard.timeout)
+            raise
+        except (aiohttp.ClientError, ValueError) as e:
+            if isinstance(e, aiohttp.ClientConnectionError):
+                guard.record_failure("connection error")
+            logger.info("Error fetching %s: %s", url, e)
+            raise
+        except Exception as e:
+            logger.warning("Unexpected error fetching %s: %s", url, e)
+            raise
+        finally:
+            observe_fetch(guard.domain, fetch_status, time.perf_counter() - fetch_start)
+
+
+async def fetch_pooled(url, mode="full"):
+    """Fetch url through the worker's shared connection pool (see HttpClientPool)."""
+    max_bytes = http_pool.metadata_max_body_bytes if mode == "metadata" else http_pool.max_body_bytes
+    return await http_pool.run(lambda session: fetch_url(session, url, mode=mode, max_bytes=max_bytes))
+
+
+SEARCH_RESULT_LIMIT = 15  # Set a reasonable limit for the number of results
+UNSUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')
+
+
+def score_relevance(metadata, query):
+    """
+    Look for simple indicators that this page might be relevant to our search.
+    This helps prioritize more relevant pages in the results.
+
+    Args:
+        metadata (dict): Page metadata as returned by extract_page_metadata
+        query (str): The search query (person's name)
 
-            # Basic validation of the content
-            if not html_content or len(html_content) < 500:  # Very small responses are likely errors
-                raise ValueError("Response too small or empty")
+    Returns:
+        int: The relevance score of the page
+    """
+    relevance_score = 0
+    query_terms = query.lower().split()
 
-            return html_content
+    # Check title, description, headings for query terms
+    for term in query_terms:
+        if term in metadata["title"].lower():
+            relevance_score += 3  # Title matches are highly relevant
+        if term in metadata["description"].lower():
+            relevance_score += 2  # Description matches are relevant
+        if term in metadata["h1"].lower():
+            relevance_score += 2  # H1 matches are relevant
+        if term in metadata["h2_summary"].lower():
+            relevance_score += 1  # H2 matches are somewhat relevant
 
-    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
-        print(f"Error fetching {url}: {str(e)}")
-        raise
-    except Exception as e:
-        print(f"Unexpected error fetching {url}: {str(e)}")
-        raise
+    return relevance_score
 
 
-async def get_search_results_metadata(query):
+async def fetch_search_result(url, query, timings):
     """
-    Search for query on Google and return comprehensive metadata for each result.
-    This improved version filters out URLs that can't be fetched and includes enhanced metadata.
+    Fetch a single search result and build its metadata with a relevance score.
 
     Args:
+        url (str): The URL to fetch
         query (str): The search query (person's name)
+        timings (dict): Accumulates the time spent in the fetch and parse stages
 
     Returns:
-        list: A list of dictionaries containing detailed metadata for each successfully fetched search result
+        dict: The page metadata, or None if the URL can't be fetched or processed
     """
-    # Try different approaches based on which package might be installed
     try:
-        # For google package
-        from googlesearch import search
-        urls = [url for url in search(query, num=25, stop=25, pause=2)]
-    except TypeError:
+        # Try to fetch the URL with a reasonable timeout
+        fetch_start = time.perf_counter()
         try:
-            # Alternative approach for older/different versions
-            from googlesearch import search
-            urls = [url for url in search(query, num_results=25, sleep_interval=2)]
-        except (TypeError, AttributeError):
-            try:
-                # For google-search-results package (serpapi)
-                from serpapi import GoogleSearch
-
-                # You'll need an API key for this
-                serpapi_key = os.getenv("SERPAPI_API_KEY")
-                if not serpapi_key:
-                    raise ValueError("SERPAPI_API_KEY environment variable not set")
-
-                search_params = {
-                    "q": query,
-                    "num": 25,
-                    "api_key": serpapi_key
-                }
-                search_results = GoogleSearch(search_params).get_dict()
-                urls = [result.get('link') for result in search_results.get('organic_results', [])]
-            except (ImportError, ValueError):
-                # Fallback to a simple list of dummy URLs for testing
-                print("WARNING: No suitable search package found. Using test URLs.")
-                urls = [
-                    f"https://example.com/profile/{query.replace(' ', '-').lower()}",
-                    f"https://linkedin.com/in/{query.replace(' ', '-').lower()}",
-                    f"https://twitter.com/{query.replace(' ', '').lower()}",
-                    f"https://facebook.com/{query.replace(' ', '.').lower()}",
-                    f"https://example.org/about/{query.replace(' ', '_').lower()}"
-                ]
-
-    print(f"Found {len(urls)} URLs for query: {query}")
+            html_content = await fetch_pooled(url, mode="metadata")
+        finally:
+            timings["fetch_seconds"] += time.perf_counter() - fetch_start
+
+        # Extract comprehensive metadata
+        parse_start = time.perf_counter()
+        metadata = await extract_page_metadata(html_content, url)
+        metadata["relevance_score"] = score_relevance(metadata, query)
+        timings["parse_seconds"] += time.perf_counter() - parse_start
 
+        logger.debug("Successfully extracted metadata from: %s (relevance: %s)", url, metadata['relevance_score'])
+        return metadata
+
+    except Exception as e:
+        # If URL can't be fetched, don't include it in the results
+        logger.info("Error fetching or processing URL %s: %s", url, e)
+        return None
+
+
+async def collect_metadata_sequential(urls, query, timings):
+    """Fetch search results one at a time until SEARCH_RESULT_LIMIT pages succeed."""
     webpages_metadata = []
-    successful_urls = 0
+    for url in urls:
+        metadata = await fetch_search_result(url, query, timings)
+        if metadata is None:
+            continue
+
+        webpages_metadata.append(metadata)
+
+        # If we have enough successful URLs, we can stop
+        if len(webpages_metadata) >= SEARCH_RESULT_LIMIT:
+            break
+
+    return webpages_metadata
+
+
+async def collect_metadata_concurrent(urls, query, timings, max_concurrency):
+    """
+    Fetch search results concurrently with at most max_concurrency fetches in flight.
 
-    async with ClientSession() as session:
-        for url in urls:
-            # Skip certain file types that we can't process
-            if url.endswith(('.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')) or '-image?' in url:
-                print(f"Skipping unsupported file type: {url}")
+    Results are consumed in search-result order, so the selected pages are the same ones the
+    sequential path would pick. Once SEARCH_RESULT_LIMIT pages have succeeded the remaining
+    fetches are cancelled.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded_fetch(url):
+        async with semaphore:
+            return await fetch_search_result(url, query, timings)
+
+    tasks = [asyncio.create_task(bounded_fetch(url)) for url in urls]
+
+    webpages_metadata = []
+    try:
+        for task in tasks:
+            metadata = await task
+            if metadata is None:
                 continue
 
-            try:
-                # Try to fetch the URL with a reasonable timeout
-                html_content = await fetch_url(session, url)
-
-                # Extract comprehensive metadata
-                metadata = await extract_page_metadata(html_content, url)
-
-                # Look for simple indicators that this page might be relevant to our search
-                # This helps prioritize more relevant pages in the results
-                relevance_score = 0
-                query_terms = query.lower().split()
-
-                # Check title, description, headings for query terms
-                for term in query_terms:
-                    if term in metadata["title"].lower():
-                        relevance_score += 3  # Title matches are highly relevant
-                    if term in metadata["description"].lower():
-                        relevance_score += 2  # Description matches are relevant
-                    if term in metadata["h1"].lower():
-                        relevance_score += 2  # H1 matches are relevant
-                    if term in metadata["h2_summary"].lower():
-                        relevance_score += 1  # H2 matches are somewhat relevant
-
-                # Add relevance score to metadata
-                metadata["relevance_score"] = relevance_score
-
-                webpages_metadata.append(metadata)
-                successful_urls += 1
-                print(f"Successfully extracted metadata from: {url} (relevance: {relevance_score})")
-
-                # If we have enough successful URLs, we can stop
-                if successful_urls >= 15:  # Set a reasonable limit for the number of results
-                    break
+            webpages_metadata.append(metadata)
 
-            except Exception as e:
-                # If URL can't be fetched, don't include it in the results
-                print(f"Error fetching or processing URL {url}: {e}")
-                # We don't add anything to webpages_metadata for failed URLs
+            if len(webpages_metadata) >= SEARCH_RESULT_LIMIT:
+                break
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.info("Cancelled %d outstanding fetches", len(pending))
 
-    # Sort results by relevance score (most relevant first)
-    webpages_metadata = sorted(webpages_metadata, key=lambda x: x["relevance_score"], reverse=True)
+    return webpages_metadata
 
-    print(f"Returning {len(webpages_metadata)} successfully fetched URLs")
+
+async def get_search_results_metadata(query, fetch_mode="concurrent", max_concurrency=8, timings=None,
+                                      ranking_mode="keyword"):
+    """
+    Search for query on Google and return comprehensive metadata for each result.
+    This improved version filters out URLs that can't be fetched and includes enhanced metadata.
+
+    Args:
+        query (str): The search query (person's name)
+        fetch_mode (str): "concurrent" to fetch pages in parallel or "sequential" to fetch them one at a time
+        max_concurrency (int): Maximum number of fetches in flight at once in concurrent mode
+        timings (dict): Optional dictionary that is filled with per-stage timings in seconds
+        ranking_mode (str): "keyword" to rank by score_relevance or "embedding" to rank by semantic
+                            similarity, falling back to keyword ranking if the embeddings are not ready in time
+
+    Returns:
+        list: A list of dictionaries containing detailed metadata for each successfully fetched search result
+    """
+    if fetch_mode not in ("concurrent", "sequential"):
+        raise ValueError(f"Unsupported fetch mode: {fetch_mode}")
+    if ranking_mode not in ("keyword", "embedding"):
+        raise ValueError(f"Unsupported ranking mode: {ranking_mode}")
+
+    if timings is None:
+        timings = {}
+    # fetch_seconds and parse_seconds add up the time spent on every page, so in concurrent
+    # mode they overlap and can exceed collect_seconds, which is the wall time of the stage.
+    timings.update({
+        "fetch_mode": fetch_mode,
+        "search_seconds": 0.0,
+        "fetch_seconds": 0.0,
+        "parse_seconds": 0.0,
+        "collect_seconds": 0.0,
+        "ranking_seconds": 0.0,
+        "total_seconds": 0.0,
+    })
+    total_start = time.perf_counter()
+
+    # Run the search provider off the event loop (cached and rate limited per worker)
+    search_start = time.perf_counter()
+    with timed_stage("search_provider"):
+        urls = await search_provider.search(query)
+    timings["search_seconds"] = time.perf_counter() - search_start
+
+    logger.info("Found %d URLs for query: %s", len(urls), Redacted(query))
+
+    # Skip certain file types that we can't process
+    fetchable_urls = []
+    for url in urls:
+        if url.endswith(UNSUPPORTED_EXTENSIONS) or '-image?' in url:
+            logger.debug("Skipping unsupported file type: %s", url)
+            continue
+        fetchable_urls.append(url)
+
+    collect_start = time.perf_counter()
+    if fetch_mode == "concurrent":
+        webpages_metadata = await collect_metadata_concurrent(fetchable_urls, query, timings, max(1, max_concurrency))
+    else:
+        webpages_metadata = await collect_metadata_sequential(fetchable_urls, query, timings)
+    timings["collect_seconds"] = time.perf_counter() - collect_start
+
+    # Sort results by relevance score (most relevant first).
+    # sorted() is stable, so pages with equal scores keep their search-result order.
+    ranking_start = time.perf_counter()
+    with timed_stage("ranking"):
+        similarities = await ranker.rank(query, webpages_metadata) if ranking_mode == "embedding" else None
+    if similarities is not None:
+        for metadata, similarity in zip(webpages_metadata, similarities):
+            metadata["semantic_score"] = round(similarity, 4)
+        webpages_metadata = sorted(webpages_metadata, key=lambda x: (x["semantic_score"], x["relevance_score"]),
+                                   reverse=True)
+        timings["ranked_by"] = "embedding"
+    else:
+        webpages_metadata = sorted(webpages_metadata, key=lambda x: x["relevance_score"], reverse=True)
+        timings["ranked_by"] = "keyword"
+    timings["ranking_seconds"] = time.perf_counter() - ranking_start
+
+    timings["total_seconds"] = time.perf_counter() - total_start
+    timings["urls_found"] = len(urls)
+    timings["urls_returned"] = len(webpages_metadata)
+
+    logger.info("Returning %d successfully fetched URLs", len(webpages_metadata))
+    logger.info("Search timings (%s): %s", fetch_mode, timings)
     return webpages_metadata
 
-async def clean_webpage_with_gpt(html_content, url, target_name, model="gpt-4o-mini"):
+async def clean_webpage_with_gpt(html_content, url, target_name, model="gpt-4o-mini", llm_client=None):
     """
     Use GPT to analyze a webpage and its metadata to extract structured information relevant to the target person.
     This enhanced version includes page metadata (title, description, URL) in the analysis.
 
+    Long pages are split into token-budgeted chunks that are cleaned concurrently, and the paragraphs
+    from every chunk are merged in page order.
+
     Args:
         html_content (str): The HTML content of the webpage
         url (str): The URL of the webpage
         target_name (str): The name of the person we're looking for information about
         model (str): OpenAI model to use for analysis
+        llm_client (AsyncOpenAI): Async OpenAI client to use; a short-lived one is opened if not given
 
     Returns:
         list: A list containing meaningful paragraphs about the target person with PII information
+
+    Raises:
+        AssessmentError: If GPT failed on every chunk of the page
     """
     try:
-        # Parse the HTML content
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        # Extract metadata
-        page_title = soup.title.string if soup.title else "Untitled Page"
-
-        # Extract meta description
-        description_tag = soup.find("meta", {"name": "description"})
-        meta_description = description_tag.get("content", "") if description_tag else ""
-
-        # Extract meta keywords
-        keywords_tag = soup.find("meta", {"name": "keywords"})
-        meta_keywords = keywords_tag.get("content", "") if keywords_tag else ""
-
-        # Get any OpenGraph metadata which often contains rich information
-        og_title = soup.find("meta", {"property": "og:title"})
-        og_title = og_title.get("content", "") if og_title else ""
-
-        og_description = soup.find("meta", {"property": "og:description"})
-        og_description = og_description.get("content", "") if og_description else ""
-
-        # Extract the text content
-        parsed_text = soup.get_text()
-
-        # Basic preprocessing to make the text more manageable
-        text = parsed_text.split('\n')
-        text = list(filter(lambda x: x not in ('', '\r') and not x.isspace(), text))
-
-        # Join a reasonable amount of text to send to GPT
-        combined_text = "\n".join(text)
-        truncated_text = combined_text[:20000]  # Limit to 20K chars to avoid token limits
-
-        # Define system and user prompts for a more structured analysis
-        system_prompt = (
-            f"You are an expert analyst specializing in identifying and organizing personal information "
-            f"from web content and metadata. Your expertise is in finding, contextualizing, and "
-            f"structuring personal information in a meaningful way."
-        )
-
-        user_prompt = (
-            f"I'm looking for information about {target_name}. Please analyze both the webpage content and its metadata.\n\n"
-            f"METADATA:\n"
-            f"URL: {url}\n"
-            f"Page Title: {page_title}\n"
-            f"Meta Description: {meta_description}\n"
-            f"Meta Keywords: {meta_keywords}\n"
-            f"OG Title: {og_title}\n"
-            f"OG Description: {og_description}\n\n"
-            f"WEBPAGE CONTENT:\n{truncated_text}\n\n"
-
-            f"Please create a comprehensive summary of ALL information about {target_name}. "
-            f"Focus on extracting personal identifiable information (PII) and organizing it into a meaningful narrative.\n\n"
-
-            f"Instructions:\n"
-            f"1. First, analyze the URL, title, and metadata for any information about {target_name}.\n"
-            f"2. Then, analyze the webpage content and create a thorough summary of all information found.\n"
-            f"3. Specifically look for and include ANY of these personal attributes if found:\n"
-            f"   - Full name (including variations, nicknames, or formal names)\n"
-            f"   - Location information (current location, hometown, places lived)\n"
-            f"   - Contact details (email addresses, phone numbers)\n"
-            f"   - Birth information (date of birth, age, birthplace)\n"
-            f"   - Addresses (current or past residences, work addresses)\n"
-            f"   - Gender information\n"
-            f"   - Employment details (current employer, job title, work history)\n"
-            f"   - Educational background (schools, degrees, graduation years)\n"
-            f"   - Social media accounts (Facebook, Twitter, Instagram, etc.)\n"
-            f"   - Any sensitive information (driver's license, passport numbers, financial info, etc.)\n\n"
-
-            f"4. IMPORTANT: Format your response as a collection of detailed paragraphs that provide CONTEXT for the information. "
-            f"   Don't just list facts - explain how they relate to the person and where/how they were mentioned.\n"
-            f"5. If information seems contradictory, include all versions and note the contradiction.\n"
-            f"6. Include ONLY information about {target_name}. Ignore information about other people.\n"
-            f"7. If absolutely no information about {target_name} is found, respond with: 'NO_RELEVANT_INFORMATION'\n\n"
-
-            f"Your goal is to create a comprehensive profile that captures ALL possible PII about {target_name} from this webpage "
-            f"and its metadata in a way that preserves context and meaning."
-        )
-
-        # Make a request to GPT
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.1,  # Very low temperature for consistency
-            max_tokens=15000  # Allow for detailed response
-        )
-
-        # Get the GPT response
-        gpt_response = response.choices[0].message.content.strip()
-
-        # If no information was found, return empty list
-        if gpt_response == "NO_RELEVANT_INFORMATION":
-            print(f"No relevant information found about {target_name} on this webpage and its metadata.")
-            return []
+        # Parse the HTML content (shared with extract_page_metadata for the same page) and split the
+        # page text into chunks that fit the token budget instead of truncating it, in a thread
+        # because both are CPU work
+        document, chunks = await asyncio.to_thread(prepare_page_for_cleaning, html_content, url, model)
+
+        page_title = document.title if document.title is not None else "Untitled Page"
+        meta_description = document.description
+        meta_keywords = document.keywords
+        og_title = document.og_title
+        og_description = document.og_description
+
+        async def clean_chunk(llm_client, chunk, max_tokens, part):
+            part_label = f" (part {part} of {len(chunks)})" if len(chunks) > 1 else ""
+
+            # Reuse the result of an identical earlier cleaning call if there is one
+            page_text = (
+                f"{url}\n{page_title}\n{meta_description}\n{meta_keywords}\n{og_title}\n{og_description}\n"
+                f"{part_label}\n{chunk}"
+            )
+            cache_key = make_cache_key("clean", CLEAN_PROMPT_VERSION, model, target_name, page_text)
+            cached_paragraphs = await asyncio.to_thread(llm_cache.get, cache_key)
+            if cached_paragraphs is not None:
+                record_cached_call()
+                count_llm_call("clean", "cached")
+                logger.debug("Using cached cleaning result for %s%s (%d paragraphs)", url, part_label,
+                             len(cached_paragraphs))
+                return cached_paragraphs
+
+            # Define system and user prompts for a more structured analysis
+            system_prompt = (
+                f"You are an expert analyst specializing in identifying and organizing personal information "
+                f"from web content and metadata. Your expertise is in finding, contextualizing, and "
+                f"structuring personal information in a meaningful way."
+            )
+
+            user_prompt = (
+                f"I'm looking for information about {target_name}. Please analyze both the webpage content and its metadata.\n\n"
+                f"METADATA:\n"
+                f"URL: {url}\n"
+                f"Page Title: {page_title}\n"
+                f"Meta Description: {meta_description}\n"
+                f"Meta Keywords: {meta_keywords}\n"
+                f"OG Title: {og_title}\n"
+                f"OG Description: {og_description}\n\n"
+                f"WEBPAGE CONTENT{part_label}:\n{chunk}\n\n"
+
+                f"Please create a comprehensive summary of ALL information about {target_name}. "
+                f"Focus on extracting personal identifiable information (PII) and organizing it into a meaningful narrative.\n\n"
+
+                f"Instructions:\n"
+                f"1. First, analyze the URL, title, and metadata for any information about {target_name}.\n"
+                f"2. Then, analyze the webpage content and create a thorough summary of all information found.\n"
+                f"3. Specifically look for and include ANY of these personal attributes if found:\n"
+                f"   - Full name (including variations, nicknames, or formal names)\n"
+                f"   - Location information (current location, hometown, places lived)\n"
+                f"   - Contact details (email addresses, phone numbers)\n"
+                f"   - Birth information (date of birth, age, birthplace)\n"
+                f"   - Addresses (current or past residences, work addresses)\n"
+                f"   - Gender information\n"
+                f"   - Employment details (current employer, job title, work history)\n"
+                f"   - Educational background (schools, degrees, graduation years)\n"
+                f"   - Social media accounts (Facebook, Twitter, Instagram, etc.)\n"
+                f"   - Any sensitive information (driver's license, passport numbers, financial info, etc.)\n\n"
+
+                f"4. IMPORTANT: Format your response as a collection of detailed paragraphs that provide CONTEXT for the information. "
+                f"   Don't just list facts - explain how they relate to the person and where/how they were mentioned.\n"
+                f"5. If information seems contradictory, include all versions and note the contradiction.\n"
+                f"6. Include ONLY information about {target_name}. Ignore information about other people.\n"
+                f"7. If absolutely no information about {target_name} is found, respond with: 'NO_RELEVANT_INFORMATION'\n\n"
+
+                f"Your goal is to create a comprehensive profile that captures ALL possible PII about {target_name} from this webpage "
+                f"and its metadata in a way that preserves context and meaning."
+            )
+
+            start = time.perf_counter()
+            response = None
+            try:
+                response = await llm_client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.1,  # Very low temperature for consistency
+                    max_tokens=max_tokens
+                )
+            finally:
+                observe_llm_call("clean", model, time.perf_counter() - start, response)
+            record_usage(response)
+
+            # Get the GPT response
+            gpt_response = response.choices[0].message.content.strip()
+
+            # If no information was found, return empty list
+            if gpt_response == "NO_RELEVANT_INFORMATION":
+                await asyncio.to_thread(llm_cache.put, cache_key, "clean", CLEAN_PROMPT_VERSION, model, [])
+                return []
+
+            # Split into paragraphs for easier processing later
+            paragraphs = gpt_response.split('\n\n')
+            cleaned_paragraphs = [p.strip() for p in paragraphs if p.strip()]
+            await asyncio.to_thread(llm_cache.put, cache_key, "clean", CLEAN_PROMPT_VERSION, model,
+                                    cleaned_paragraphs)
+            return cleaned_paragraphs
+
+        async def clean_chunks(llm_client):
+            return await asyncio.gather(*[
+                clean_chunk(llm_client, chunk, max_tokens, part)
+                for part, (chunk, max_tokens) in enumerate(chunks, start=1)
+            ], return_exceptions=True)
+
+        # Make non-blocking requests to GPT
+        if llm_client is None:
+            async with async_openai_client() as llm_client:
+                results = await clean_chunks(llm_client)
+        else:
+            results = await clean_chunks(llm_client)
+
+        # Merge the chunks in page order, dropping paragraphs repeated across chunks
+        cleaned_paragraphs = []
+        seen = set()
+        errors = []
+        for part, result in enumerate(results, start=1):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, Exception):
+                logger.warning("Error cleaning part %d of %s: %s", part, url, result)
+                errors.append(result)
+                continue
+            for paragraph in result:
+                if paragraph not in seen:
+                    seen.add(paragraph)
+                    cleaned_paragraphs.append(paragraph)
 
-        # Split into paragraphs for easier processing later
-        paragraphs = gpt_response.split('\n\n')
-        cleaned_paragraphs = [p.strip() for p in paragraphs if p.strip()]
+        if len(errors) == len(results):
+            # GPT failed on the whole page, which must not look like a page without information
+            raise AssessmentError(f"Cleaning {url} failed: {errors[0]}") from errors[0]
 
-        # Log the extracted information for debugging
-        print(f"Extracted {len(cleaned_paragraphs)} meaningful paragraphs about {target_name} from {url}")
+        if not cleaned_paragraphs:
+            logger.debug("No relevant information found about %s on %s", Redacted(target_name), url)
+            return []
+
+        logger.debug("Extracted %d meaningful paragraphs about %s from %s", len(cleaned_paragraphs),
+                     Redacted(target_name), url)
 
         return cleaned_paragraphs
 
+    except AssessmentError:
+        raise
     except Exception as e:
-        print(f"Error in clean_webpage_with_gpt: {e}")
+        logger.warning("Error in clean_webpage_with_gpt: %s", e)
         # Return an empty list if there's an error
         return []
 
 
-async def scrape_selected_urls(urls, target_name):
+def prepare_page_for_cleaning(html_content, url, model):
+    """
+    Parse a page and split its text into the chunks that are cleaned with GPT.
+
+    Args:
+        html_content (str): The HTML content of the webpage
+        url (str): The URL of the webpage
+        model (str): OpenAI model the chunks will be sent to
+
+    Returns:
+        tuple: (the parsed Document, list of (chunk text, completion budget) for at most
+                CLEAN_MAX_CHUNKS chunks)
+    """
+    document = parse_document(html_content, url)
+
+    chunks = chunk_pieces(document.text_lines, CLEAN_CHUNK_TOKENS, model) or [""]
+    if len(chunks) > CLEAN_MAX_CHUNKS:
+        logger.info("Cleaning the first %d of %d chunks of %s", CLEAN_MAX_CHUNKS, len(chunks), url)
+        chunks = chunks[:CLEAN_MAX_CHUNKS]
+
+    # Sized from the chunk: the summary is a fraction of the content it covers
+    return document, [
+        (chunk, completion_budget(count_tokens(chunk, model), CLEAN_COMPLETION_RATIO, CLEAN_MIN_COMPLETION_TOKENS,
+                                  CLEAN_MAX_COMPLETION_TOKENS))
+        for chunk in chunks
+    ]
+
+
+def claim_page(target_name, html_content, url):
+    """Parse a page and claim its text in the near-duplicate index, see NearDuplicateIndex.claim."""
+    return dedup_index.claim(target_name, parse_document(html_content, url).text, url)
+
+
+async def clean_page(llm_client, html_content, url, target_name, llm_semaphore):
+    """
+    Clean one fetched page with GPT unless a near-duplicate of it was already cleaned for target_name.
+
+    The page's visible text is fingerprinted with the near-duplicate index. The first copy is cleaned
+    under llm_semaphore and its paragraphs are shared; later copies, from this request or a recent one,
+    wait for them instead of calling GPT. If the first copy fails or finds nothing, each waiting copy
+    is cleaned on its own.
+
+    Args:
+        llm_client (AsyncOpenAI): Async OpenAI client used for cleaning
+        html_content (str): The HTML content of the webpage
+        url (str): The URL of the webpage
+        target_name (str): Name of the person we're looking for
+        llm_semaphore (asyncio.Semaphore): Limits the number of GPT cleaning calls in flight
+
+    Returns:
+        tuple: (cleaned paragraphs, URL of the other page they were reused from or None)
+    """
+    # Parsing and fingerprinting are CPU work, done in a thread to keep the event loop free
+    entry, owner = await asyncio.to_thread(claim_page, target_name, html_content, url)
+
+    if entry is not None and not owner:
+        paragraphs = await asyncio.wrap_future(entry.future)
+        if paragraphs is not None:
+            record_deduplicated_call()
+            count_llm_call("clean", "deduplicated")
+            if entry.url == url:
+                logger.debug("Content of %s is close to when it was last cleaned, reusing %d paragraphs", url,
+                             len(paragraphs))
+                return list(paragraphs), None
+            logger.debug("%s is a near-duplicate of %s, reusing its %d paragraphs", url, entry.url, len(paragraphs))
+            return list(paragraphs), entry.url
+        entry = None
+
+    try:
+        async with queued("llm", llm_semaphore):
+            logger.debug("Processing content from %s", url)
+            # Pass the URL to the clean_webpage_with_gpt function
+            cleaned_data = await clean_webpage_with_gpt(html_content, url, target_name, llm_client=llm_client)
+    except BaseException:
+        if entry is not None:
+            dedup_index.abandon(entry)
+        raise
+
+    if entry is not None:
+        # clean_webpage_with_gpt also returns [] when GPT failed, so an empty result is not shared
+        if cleaned_data:
+            dedup_index.resolve(entry, cleaned_data)
+        else:
+            dedup_index.abandon(entry)
+    return cleaned_data, None
+
+
+async def fetch_and_clean_url(llm_client, url, target_name, fetch_semaphore, llm_semaphore):
+    """
+    Fetch one selected URL and clean its content with GPT, each stage under its own concurrency limit.
+
+    Args:
+        llm_client (AsyncOpenAI): Async OpenAI client used for cleaning
+        url (str): The URL to scrape
+        target_name (str): Name of the person we're looking for
+        fetch_semaphore (asyncio.Semaphore): Limits the number of fetches in flight
+        llm_semaphore (asyncio.Semaphore): Limits the number of GPT cleaning calls in flight
+
+    Returns:
+        tuple: (cleaned paragraphs for this URL, empty if nothing relevant was found and None if the URL
+                could not be fetched or cleaned; URL of the near-duplicate page they were reused from or None)
+    """
+    try:
+        async with queued("fetch", fetch_semaphore):
+            logger.debug("Fetching URL: %s", url)
+            response = await fetch_pooled(url)
+
+        # Use enhanced GPT function to extract meaningful information from this webpage and its metadata
+        cleaned_data, duplicate_of = await clean_page(llm_client, response, url, target_name, llm_semaphore)
+
+        if cleaned_data:
+            logger.debug("Successfully extracted information from %s (%d paragraphs)", url, len(cleaned_data))
+        else:
+            logger.debug("No relevant information found on %s", url)
+        return cleaned_data, duplicate_of
+
+    except Exception as e:
+        logger.info("Error processing URL %s: %s", url, e)
+        return None, None
+
+
+def filter_selected_urls(urls):
+    """Drop the selected URLs whose content cannot be scraped."""
+    selected_urls = []
+    for url in urls:
+        if url.endswith('.pdf') or '-image?' in url:
+            logger.debug("Skipping unsupported file type: %s", url)
+            continue
+        selected_urls.append(url)
+    return selected_urls
+
+
+async def scrape_selected_urls(urls, target_name, pipeline_mode="pipelined", fetch_concurrency=10,
+                               llm_concurrency=10, pages=None, failed_urls=None):
     """
     Scrape content from user-selected URLs and clean it using GPT.
     This updated version passes URL information to the cleaning function to include metadata analysis.
 
+    In "pipelined" mode every URL is fetched and cleaned concurrently, with separate limits for the
+    fetch and GPT stages, so a page can be cleaned while others are still downloading. In "sequential"
+    mode the URLs are processed one after another. In both modes the output follows the order of urls.
+
     Args:
         urls (list): List of URLs to scrape
         target_name (str): Name of the person we're looking for
+        pipeline_mode (str): "pipelined" or "sequential"
+        fetch_concurrency (int): Maximum number of fetches in flight in pipelined mode
+        llm_concurrency (int): Maximum number of GPT cleaning calls in flight in pipelined mode
+        pages (dict): If given, filled with URL -> cleaned paragraphs for every URL with relevant content
+        failed_urls (list): If given, filled with the URLs that could not be fetched or cleaned
 
     Returns:
         tuple: (list of structured content about the target person, boolean indicating if no data was found)
     """
+    if pipeline_mode not in ("pipelined", "sequential"):
+        raise ValueError(f"Unsupported pipeline mode: {pipeline_mode}")
+
     if not urls:
         return [], True
 
+    selected_urls = filter_selected_urls(urls)
+
+    async with async_openai_client() as llm_client:
+        if pipeline_mode == "pipelined":
+            fetch_semaphore = asyncio.Semaphore(max(1, fetch_concurrency))
+            llm_semaphore = asyncio.Semaphore(max(1, llm_concurrency))
+            results = await asyncio.gather(*[
+                fetch_and_clean_url(llm_client, url, target_name, fetch_semaphore, llm_semaphore)
+                for url in selected_urls
+            ])
+        else:
+            fetch_semaphore = asyncio.Semaphore(1)
+            llm_semaphore = asyncio.Semaphore(1)
+            results = []
+            for url_count, url in enumerate(selected_urls, start=1):
+                logger.debug("Scraping URL %d/%d", url_count, len(selected_urls))
+                results.append(await fetch_and_clean_url(llm_client, url, target_name, fetch_semaphore,
+                                                         llm_semaphore))
+
+    # Near-duplicates of another page in this request are listed as extra sources of that page's
+    # paragraphs instead of repeating them
+    urls_with_data = {url for url, (cleaned_data, _) in zip(selected_urls, results) if cleaned_data}
+    also_found_on = {}
+    for url, (cleaned_data, duplicate_of) in zip(selected_urls, results):
+        if cleaned_data and duplicate_of in urls_with_data:
+            also_found_on.setdefault(duplicate_of, []).append(url)
+
     all_cleaned_data = []
-    url_count = 0
     success_count = 0
+    for url, (cleaned_data, duplicate_of) in zip(selected_urls, results):
+        if cleaned_data is None and failed_urls is not None:
+            failed_urls.append(url)
+        if not cleaned_data:
+            continue
+
+        success_count += 1
+        if pages is not None:
+            pages[url] = cleaned_data
+        if duplicate_of in urls_with_data:
+            continue
+
+        # Add source information as the first element
+        source_info = f"The following information was found on: {url}"
+        all_cleaned_data.append(source_info)
+        for duplicate_url in also_found_on.get(url, []):
+            all_cleaned_data.append(f"The same information was also found on: {duplicate_url}")
+
+        # Add the structured paragraphs
+        all_cleaned_data.extend(cleaned_data)
+
+        # Add a separator between different URLs
+        all_cleaned_data.append("---")
 
-    async with ClientSession() as session:
-        for url in urls:
-            url_count += 1
-            if url.endswith('.pdf') or '-image?' in url:
-                print(f"Skipping unsupported file type: {url}")
-                continue
+    # Remove the last separator if it exists
+    if all_cleaned_data and all_cleaned_data[-1] == "---":
+        all_cleaned_data.pop()
 
-            try:
-                print(f"Fetching URL {url_count}/{len(urls)}: {url}")
-                response = await fetch_url(session, url)
+    logger.info("Processed %d URLs, found relevant information on %d URLs (%d paragraphs)", len(urls), success_count,
+                len(all_cleaned_data))
+
+    if not all_cleaned_data:
+        return [], True
+
+    return all_cleaned_data, False
+
+
+def empty_attributes():
+    """Return a fresh attributes dictionary with an empty set for each PII attribute (ATTRIBUTE_NAMES)."""
+    return {name: set() for name in ATTRIBUTE_NAMES}
+
+
+async def assess_person(target_name, selected_urls, pipeline_mode="pipelined", fetch_concurrency=10,
+                        llm_concurrency=10, pages=None, raise_on_failure=False):
+    """
+    Run the full assessment for one person: scrape and clean the selected URLs with GPT,
+    extract the PII attributes and compute the risk score.
+
+    Args:
+        target_name (str): Name of the person we're looking for
+        selected_urls (list): URLs to assess
+        pipeline_mode (str): "pipelined" or "sequential", see scrape_selected_urls
+        fetch_concurrency (int): Maximum number of fetches in flight
+        llm_concurrency (int): Maximum number of GPT cleaning calls in flight
+        pages (dict): If given, filled with URL -> cleaned paragraphs, see scrape_selected_urls
+        raise_on_failure (bool): Raise AssessmentError instead of returning None when every URL failed
+                                 to fetch or clean, and when a PII extraction call failed, so that a
+                                 batch job can retry the person later
+
+    Returns:
+        dict: Attribute name -> list of values plus risk_score, risk_level, the token_usage of the
+              GPT calls and llm_calls_avoided (cleaning calls skipped for near-duplicate pages), or
+              None if no relevant data was found about the person
+    """
+    # Every GPT call made below, including the ones in child tasks, adds its tokens to this request's usage
+    usage = TokenUsage()
+    current_usage.set(usage)
+
+    # Get cleaned data from selected URLs
+    failed_urls = []
+    cleaned_data, no_relevant_data = await scrape_selected_urls(
+        selected_urls, target_name,
+        pipeline_mode=pipeline_mode,
+        fetch_concurrency=fetch_concurrency,
+        llm_concurrency=llm_concurrency,
+        pages=pages,
+        failed_urls=failed_urls)
+
+    if raise_on_failure and failed_urls and len(failed_urls) == len(filter_selected_urls(selected_urls)):
+        raise AssessmentError(f"All {len(failed_urls)} URLs failed to fetch or clean")
+
+    if no_relevant_data:
+        return None
+
+    attributes = empty_attributes()
+
+    logger.debug("Cleaned data: %s", Redacted(cleaned_data))
+
+    async with async_openai_client() as llm_client:
+        attributes = await extract_pii_with_gpt_async(llm_client, cleaned_data, attributes, target_name,
+                                                      raise_on_failure=raise_on_failure)
+
+    logger.info("Extracted PII attributes: %s", AttributeSummary(attributes))
+
+    dictionary = await asyncio.to_thread(score_attributes, attributes)
+    dictionary['token_usage'] = usage.to_dict()
+    dictionary['llm_calls_avoided'] = usage.deduplicated_calls
+    return dictionary
+
+
+def score_attributes(attributes):
+    """
+    Convert the attribute sets to lists and add the overall risk score and level.
+
+    Args:
+        attributes (dict): Dictionary containing the collection of values found for each PII attribute
+
+    Returns:
+        dict: Attribute name -> list of values plus risk_score and risk_level
+    """
+    with timed_stage("scoring"):
+        dictionary = {key: list(value) for key, value in attributes.items()}
+
+        # Coefficient tables are compiled once at import by the scoring engine
+        overall_risk_score = default_engine.score(dictionary)
+        risk_level = risk_level_for(overall_risk_score)
 
-                # Check if the response is an exception
-                if isinstance(response, Exception):
-                    print(f"Error fetching URL {url}: {response}")
-                    continue
+    dictionary['risk_score'] = overall_risk_score
+    dictionary['risk_level'] = risk_level
 
-                # Use enhanced GPT function to extract meaningful information from this webpage and its metadata
-                print(f"Processing content from {url}...")
-                # Pass the URL to the clean_webpage_with_gpt function
-                cleaned_data = await clean_webpage_with_gpt(response, url, target_name)
+    return dictionary
 
-                if cleaned_data:
-                    success_count += 1
-                    # Add source information as the first element
-                    source_info = f"The following information was found on: {url}"
-                    all_cleaned_data.append(source_info)
 
-                    # Add the structured paragraphs
-                    all_cleaned_data.extend(cleaned_data)
+async def assessment_events(target_name, selected_urls, fetch_concurrency=10, llm_concurrency=10):
+    """
+    Run the assessment for one person and yield progress as it happens.
+
+    Every URL is fetched, cleaned and then run through PII extraction on its own, so partial
+    attribute sets can be reported as soon as each page finishes. The final attributes are the
+    merge of the per-page extractions, scored the same way as /risksearch/extract.
+
+    Args:
+        target_name (str): Name of the person we're looking for
+        selected_urls (list): URLs to assess
+        fetch_concurrency (int): Maximum number of fetches in flight
+        llm_concurrency (int): Maximum number of GPT calls in flight
+
+    Yields:
+        tuple: (event name, JSON-serializable data)
+    """
+    urls = filter_selected_urls(selected_urls)
+    yield "started", {"searchName": target_name, "urls": len(urls)}
 
-                    # Add a separator between different URLs
-                    all_cleaned_data.append("---")
+    fetch_semaphore = asyncio.Semaphore(max(1, fetch_concurrency))
+    llm_semaphore = asyncio.Semaphore(max(1, llm_concurrency))
+    events = asyncio.Queue()
+    attributes = empty_attributes()
 
-                    print(f"Successfully extracted information from {url} ({len(cleaned_data)} paragraphs)")
+    async def process(llm_client, url):
+        try:
+            async with queued("fetch", fetch_semaphore):
+                html_content = await fetch_pooled(url)
+            await events.put(("fetched", {"url": url, "characters": len(html_content)}))
+
+            paragraphs, duplicate_of = await clean_page(llm_client, html_content, url, target_name, llm_semaphore)
+            cleaned = {"url": url, "paragraphs": len(paragraphs)}
+            if duplicate_of is not None:
+                cleaned["duplicateOf"] = duplicate_of
+            await events.put(("cleaned", cleaned))
+            # A near-duplicate of another page in this request adds nothing to that page's extraction
+            if not paragraphs or duplicate_of in urls:
+                return
+
+            page_data = [f"The following information was found on: {url}"] + paragraphs
+            async with queued("llm", llm_semaphore):
+                page_attributes = await extract_pii_with_gpt_async(llm_client, page_data, empty_attributes(),
+                                                                   target_name)
+            for key, values in page_attributes.items():
+                if values:
+                    if not isinstance(attributes[key], set):
+                        attributes[key] = set()
+                    attributes[key].update(values)
+            # Scored from a copy, since other pages keep adding to attributes while the thread runs
+            snapshot = {key: list(values) for key, values in attributes.items()}
+            scored = await asyncio.to_thread(score_attributes, snapshot)
+            await events.put(("partial", {"url": url, "attributes": scored}))
+
+        except Exception as e:
+            logger.info("Error processing URL %s: %s", url, e)
+            await events.put(("error", {"url": url, "error": str(e)}))
+
+    usage = TokenUsage()
+    async with async_openai_client() as llm_client:
+        # Set right before the tasks are created because they copy the context at creation
+        current_usage.set(usage)
+        tasks = [asyncio.create_task(process(llm_client, url)) for url in urls]
+        try:
+            pending = set(tasks)
+            while pending or not events.empty():
+                if events.empty():
+                    # Wake up for the next event or when the last task finishes without one
+                    getter = asyncio.ensure_future(events.get())
+                    done, _ = await asyncio.wait({getter, *pending}, return_when=asyncio.FIRST_COMPLETED)
+                    pending = {task for task in pending if not task.done()}
+                    if getter not in done:
+                        getter.cancel()
+                        continue
+                    yield getter.result()
                 else:
-                    print(f"No relevant information found on {url}")
+                    yield events.get_nowait()
+        finally:
+            # Reached early when the client disconnects: stop fetching and calling GPT on its behalf
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            except Exception as e:
-                print(f"Error processing URL {url}: {e}")
+    if not any(attributes.values()):
+        yield "result", {"message": "No relevant data found about this person."}
+    else:
+        logger.info("Extracted PII attributes: %s", AttributeSummary(attributes))
+        dictionary = await asyncio.to_thread(score_attributes, attributes)
+        dictionary['token_usage'] = usage.to_dict()
+        dictionary['llm_calls_avoided'] = usage.deduplicated_calls
+        yield "result", dictionary
 
-    # Remove the last separator if it exists
-    if all_cleaned_data and all_cleaned_data[-1] == "---":
-        all_cleaned_data.pop()
 
-    print(f"Processed {url_count} URLs, found relevant information on {success_count} URLs")
-    print(f"Total paragraphs of information: {len(all_cleaned_data)}")
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    if not all_cleaned_data:
-        return [], True
 
-    return all_cleaned_data, False
+def stream_assessment_events(target_name, selected_urls, fetch_concurrency, llm_concurrency, heartbeat_interval,
+                             connection=None):
+    """
+    Run assessment_events and yield them as Server-Sent Events.
+
+    The events are produced on the server's event loop through connection (see
+    riskassessmentapp.connection), which cancels the remaining fetches and GPT calls when the client
+    disconnects; without one they are produced on a private loop in a thread of their own. The
+    response is a plain generator reading them from a queue so the server can stream it, and it
+    cancels the assessment too when the server closes it early.
+    """
+    messages = queue.Queue()
+
+    async def produce():
+        events = assessment_events(target_name, selected_urls, fetch_concurrency, llm_concurrency)
+        try:
+            async for event, data in events:
+                messages.put(format_sse(event, data))
+            messages.put(format_sse("done", {}))
+        except Exception as e:
+            logger.exception("Error streaming assessment: %s", e)
+            messages.put(format_sse("error", {"error": str(e)}))
+        finally:
+            await events.aclose()
+            messages.put(None)
+
+    loop = thread = None
+    if connection is not None:
+        future = connection.run(produce())
+        finished, cancel = future.done, future.cancel
+    else:
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(produce())
+        thread = threading.Thread(target=loop.run_until_complete, args=(asyncio.wait([task]),),
+                                  name="extract-stream", daemon=True)
+        thread.start()
+        finished = lambda: not thread.is_alive()
+        cancel = lambda: loop.call_soon_threadsafe(task.cancel)
+
+    try:
+        while True:
+            try:
+                message = messages.get(timeout=heartbeat_interval)
+            except queue.Empty:
+                # Cancelled before it started, e.g. the client disconnected right away
+                if finished():
+                    break
+                # Heartbeats keep proxies from timing out the connection
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+
+    finally:
+        cancel()
+        if thread is not None:
+            thread.join()
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
 
 
 @risksearch.route('/', methods=["GET"])
@@ -642,159 +1402,246 @@ async def risk_search():
     if not query:
         return jsonify({"error": "No search query provided"}), 400
 
+    fetch_mode = request.args.get('fetchMode', current_app.config['SEARCH_FETCH_MODE'])
+    if fetch_mode not in ("concurrent", "sequential"):
+        return jsonify({"error": f"Unsupported fetch mode: {fetch_mode}"}), 400
+
+    max_concurrency = request.args.get('maxConcurrency', current_app.config['SEARCH_FETCH_CONCURRENCY'], type=int)
+
+    ranking_mode = request.args.get('rankingMode', ranker.mode)
+    if ranking_mode not in ("keyword", "embedding"):
+        return jsonify({"error": f"Unsupported ranking mode: {ranking_mode}"}), 400
+
     try:
         # Get enhanced metadata with relevance scoring
-        webpages_metadata = await get_search_results_metadata(query)
+        timings = {}
+        webpages_metadata = await get_search_results_metadata(query, fetch_mode=fetch_mode,
+                                                              max_concurrency=max_concurrency, timings=timings,
+                                                              ranking_mode=ranking_mode)
 
         if not webpages_metadata:
             return jsonify(
-                {"message": "No relevant web results found for this name. Try a different search term."}), 404
+                {"message": "No relevant web results found for this name. Try a different search term.",
+                 "timings": timings}), 404
 
-        return jsonify({"webpages": webpages_metadata})
+        return jsonify({"webpages": webpages_metadata, "timings": timings})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Search failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
+@risksearch.route('/admin/http-pool', methods=["GET"])
+@admin_required
+def http_pool_stats():
+    """Endpoint to inspect the outbound HTTP connection pool of this worker"""
+    return jsonify(http_pool.stats())
+
+
+@risksearch.route('/admin/page-cache', methods=["GET"])
+@admin_required
+def page_cache_stats():
+    """Endpoint to inspect the HTML page cache counters"""
+    return jsonify(page_cache.stats())
+
+
+@risksearch.route('/admin/llm-cache', methods=["GET"])
+@admin_required
+def llm_cache_stats():
+    """Endpoint to inspect the GPT result cache counters"""
+    return jsonify(llm_cache.stats())
+
+
+@risksearch.route('/admin/llm-cache/invalidate', methods=["POST"])
+@admin_required
+def invalidate_llm_cache():
+    """
+    Endpoint to drop cached GPT results after a prompt change.
+    By default only results from outdated prompt versions are removed; pass {"all": true} to clear everything.
+    """
+    data = request.get_json(silent=True) or {}
+    if data.get('all'):
+        deleted = llm_cache.invalidate()
+    else:
+        deleted = (llm_cache.invalidate(kind="clean", keep_prompt_version=CLEAN_PROMPT_VERSION) +
+                   llm_cache.invalidate(kind="extract", keep_prompt_version=EXTRACTION_CACHE_VERSION))
+    return jsonify({"deleted": deleted})
+
+
+@risksearch.route('/admin/domains', methods=["GET"])
+@admin_required
+def domain_health_stats():
+    """Endpoint to inspect per-domain circuit breakers, adaptive timeouts and politeness buckets"""
+    return jsonify(domain_health.stats())
+
+
+@risksearch.route('/admin/domains/reset', methods=["POST"])
+@admin_required
+def reset_domain_health():
+    """
+    Endpoint to close circuits by forgetting what is known about a domain.
+    Pass {"domain": "example.com"} for one domain; without it every domain is reset.
+    """
+    data = request.get_json(silent=True) or {}
+    return jsonify({"reset": domain_health.reset(data.get('domain'))})
+
+
+@risksearch.route('/admin/dedup', methods=["GET"])
+@admin_required
+def dedup_stats():
+    """Endpoint to inspect the near-duplicate page index"""
+    return jsonify(dedup_index.stats())
+
+
+@risksearch.route('/admin/ranker', methods=["GET"])
+@admin_required
+def ranker_stats():
+    """Endpoint to inspect the embedding ranker's model state, cache and fallback counters"""
+    return jsonify(ranker.stats())
+
+
+@risksearch.route('/admin/search-provider', methods=["GET"])
+@admin_required
+def search_provider_stats():
+    """Endpoint to inspect the search provider cache and pacing counters"""
+    return jsonify(search_provider.stats())
+
+
+@risksearch.route('/score/batch', methods=["POST"])
+def score_batch():
+    """
+    Endpoint to score many attribute sets in one vectorized call, e.g. to re-score earlier
+    assessments after the coefficients change.
+
+    Body: {"profiles": [{attribute: [values]}, ...],
+           "coefficients": {"weights": {...}, "willingness_measures": {...},
+                            "resolution_powers": {...}, "beta_coefficients": {...}}}
+    Every coefficient table is optional and overrides the defaults attribute by attribute.
+    """
+    data = request.get_json(silent=True) or {}
+    profiles = data.get('profiles')
+    if not isinstance(profiles, list) or not all(isinstance(profile, dict) for profile in profiles):
+        return jsonify({"error": "profiles must be a list of attribute dictionaries"}), 400
+
+    try:
+        engine = default_engine.with_overrides(data.get('coefficients') or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    scores = engine.score_batch(engine.presence_matrix(profiles))
+    levels = engine.risk_levels(scores)
+
+    results = [{"risk_score": float(score), "risk_level": level} for score, level in zip(scores, levels)]
+    return jsonify({"results": results})
+
+
+@risksearch.cli.command('rescore-assessments')
+@click.option('--batch-size', type=int, default=500, show_default=True)
+def rescore_assessments_command(batch_size):
+    """Re-score every stored assessment after the coefficients in scoring.py change."""
+    scanned, changed = rescore_assessments(default_engine, batch_size=batch_size)
+    click.echo(f"Re-scored {scanned} assessments, {changed} changed")
+
+
 @risksearch.route('/extract', methods=["POST"])
 async def extract_pii():
-    """Endpoint to extract PII from selected URLs"""
-    execution_start = time.time()
-    print("Request Content-Type:", request.headers.get('Content-Type'))
-    print("Request method:", request.method)
-    print("Request JSON:", request.json)
+    """
+    Endpoint to extract PII from selected URLs.
 
+    A stored assessment of the same name and URLs younger than ASSESSMENT_MAX_AGE is returned
+    without scraping, re-scored with the current scoring engine; "forceRefresh": true in the body
+    always runs the assessment. Either way the response has an assessment object with its id,
+    whether it came from the store and when it was made.
+    """
+    execution_start = time.time()
     data = request.json
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
     target_name = data.get('searchName', '')
     selected_urls = data.get('selectedUrls', [])
-    print(f"Target name: {target_name}")
-    print(f"Selected URLs: {selected_urls}")
+    pipeline_mode = data.get('pipelineMode', current_app.config['EXTRACT_PIPELINE_MODE'])
+    logger.info("Extract request for %s with %d selected URLs", Redacted(target_name), len(selected_urls))
 
     if not target_name:
         return jsonify({"error": "No search name provided"}), 400
     if not selected_urls:
         return jsonify({"error": "No URLs selected"}), 400
+    if pipeline_mode not in ("pipelined", "sequential"):
+        return jsonify({"error": f"Unsupported pipeline mode: {pipeline_mode}"}), 400
 
-    try:
-        print("About to scrape selected URLs")
+    store_enabled = current_app.config['ASSESSMENT_STORE_ENABLED']
+    force_refresh = bool(data.get('forceRefresh', False))
 
-        # Get cleaned data from selected URLs
-        cleaned_data, no_relevant_data = await scrape_selected_urls(selected_urls, target_name)
+    try:
+        if store_enabled and not force_refresh:
+            assessment = await asyncio.to_thread(find_fresh_assessment, target_name, selected_urls,
+                                                 current_app.config['ASSESSMENT_MAX_AGE'])
+            ASSESSMENT_LOOKUPS.labels("hit" if assessment is not None else "miss").inc()
+            if assessment is not None:
+                logger.info("Serving the stored assessment %s", assessment.id)
+                dictionary = await asyncio.to_thread(score_attributes, assessment.get_attributes())
+                dictionary['token_usage'] = TokenUsage().to_dict()
+                dictionary['llm_calls_avoided'] = 0
+                dictionary['assessment'] = assessment.to_json_response(cached=True)
+                return jsonify(dictionary)
+        elif store_enabled:
+            ASSESSMENT_LOOKUPS.labels("refresh").inc()
+
+        pages = {}
+        dictionary = await assess_person(
+            target_name, selected_urls,
+            pipeline_mode=pipeline_mode,
+            fetch_concurrency=current_app.config['EXTRACT_FETCH_CONCURRENCY'],
+            llm_concurrency=current_app.config['EXTRACT_LLM_CONCURRENCY'],
+            pages=pages)
+
+        if dictionary is None:
+            return jsonify({"message": "No relevant data found about this person."})
 
-        print(f"Cleaned data length: {len(cleaned_data)}")
-        print(f"Sample cleaned data: {cleaned_data[:5] if cleaned_data else 'No data'}")
+        if store_enabled:
+            assessment = await asyncio.to_thread(save_assessment, target_name, selected_urls, pages, dictionary)
+            if assessment is not None:
+                dictionary['assessment'] = assessment.to_json_response(cached=False)
 
-        if no_relevant_data:
-            return jsonify({"message": "No relevant data found about this person."})
+        execution_time = time.time() - execution_start
+        logger.info("Extract finished in %.2f seconds", execution_time)
 
-        attributes = {
-            'Name': set(),
-            'Location': {},
-            'Email': set(),
-            'Phone': set(),
-            'DoB': set(),
-            'Address': set(),
-            'Gender': set(),
-            'Employer': set(),
-            'Education': set(),
-            'Birth Place': set(),
-            'Personal Cell': set(),
-            'Business Phone': set(),
-            'Facebook Account': set(),
-            'Twitter Account': set(),
-            'Instagram Account': set(),
-            'DDL': set(),
-            'Passport #': set(),
-            'Credit Card': set(),
-            'SSN': set()
-        }
-
-        print("This is Cleaned Data")
-        for line in cleaned_data:
-            print(line)
-
-        attributes = extract_pii_with_gpt(cleaned_data, attributes, target_name)
-
-        def print_attributes(attributes):
-            """
-            Helper function to pretty print the extracted PII attributes
-            """
-            print("\n=== Extracted PII Attributes ===")
-            for key, value in attributes.items():
-                if isinstance(value, set):
-                    print(f"{key}:", list(value) if value else "[]")
-                else:
-                    print(f"{key}:", value if value else "[]")
-            print("==============================\n")
+        return jsonify(dictionary)
 
-        print_attributes(attributes)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
-        dictionary = {key: list(value) for key, value in attributes.items()}
 
-        def print_attributes(attributes):
-            """
-            Helper function to pretty print the extracted PII attributes
-            """
-            print("\n=== Extracted PII Attributes ===")
-            for key, value in attributes.items():
-                if isinstance(value, set):
-                    print(f"{key}:", list(value) if value else "[]")
-                else:
-                    print(f"{key}:", value if value else "[]")
-            print("==============================\n")
-
-        print_attributes(attributes)
-
-        pii_attributes = list(dictionary.keys())
-
-        weights = {'Name': 1, 'Address': 1, 'Location': 1, 'Gender': 1, 'Employer': 2, 'DoB': 2, 'Education': 1,
-                   'Birth Place': 2, 'Personal Cell': 0.5, 'Email': 0.1, 'Business Phone': 0.1, 'Facebook Account': 1,
-                   'Twitter Account': 0.1, 'Instagram Account': 0.1, 'DDL': 2, 'Passport #': 2, 'Credit Card': 2,
-                   'SSN': 10}
-
-        willingness_measures = {'Name': 1.0, 'Address': 0.1, 'Location': 0.1, 'Birth Place': 0.2, 'DoB': 0.83,
-                                'Personal Cell': 0.16, 'Gender': 0.98, 'Employer': 0.5, 'Education': 0.8, 'Email': 0.7,
-                                'Business Phone': 0.4, 'Facebook Account': 0.9, 'Twitter Account': 0.9,
-                                'Instagram Account': 0.9, 'DDL': 0.2, 'Passport #': 0.05, 'Credit Card': 0.02,
-                                'SSN': 0.01}
-
-        resolution_powers = {'Name': 0.1, 'Address': 0.3, 'Location': 0.1, 'DoB': 0.7, 'Personal Cell': 0.9, 'Email': 0.95,
-                             'Business Phone': 0.4, 'Facebook Account': 0.8, 'Twitter Account': 0.8, 'Instagram Account': 0.8,
-                             'DDL': 1.0, 'Passport #': 1.0, 'Credit Card': 1.0, 'SSN': 1.0, 'Gender': 0.1, 'Employer': 0.2,
-                             'Education': 0.3, 'Birth Place': 0.5}
-
-        beta_coefficients = {'Name': 1, 'Address': 1, 'Location': 1, 'DoB': 1, 'Personal Cell': 1, 'Email': 1,
-                             'Business Phone': 1, 'Facebook Account': 1, 'Twitter Account': 1, 'Instagram Account': 1,
-                             'DDL': 1, 'Passport #': 1, 'Credit Card': 1, 'SSN': 1, 'Gender': 1, 'Employer': 1,
-                             'Education': 1, 'Birth Place': 1}
-
-        overall_risk_score = calculate_overall_risk_score(dictionary, weights, willingness_measures, resolution_powers,
-                                                          beta_coefficients)
-
-        if overall_risk_score == 0:
-            risk_level = 'Low'
-        elif overall_risk_score <= 2.74:
-            risk_level = 'Very Low'
-        elif 2.74 < overall_risk_score <= 5.48:
-            risk_level = 'Low'
-        elif 5.48 < overall_risk_score <= 6.87:
-            risk_level = 'Medium'
-        elif 6.87 < overall_risk_score <= 12.25:
-            risk_level = 'High'
-        else:
-            risk_level = 'Very High'
+@risksearch.route('/extract/stream', methods=["GET", "POST"])
+def extract_pii_stream():
+    """
+    Streaming variant of /risksearch/extract using Server-Sent Events.
 
-        dictionary['risk_score'] = overall_risk_score
-        dictionary['risk_level'] = risk_level
+    Takes the same JSON body as /risksearch/extract (or searchName and repeated selectedUrls query
+    arguments for EventSource clients) and emits started, fetched, cleaned, partial and error events
+    per URL, then the final result event with the same shape as /risksearch/extract, then done.
+    """
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        target_name = data.get('searchName', '')
+        selected_urls = data.get('selectedUrls', [])
+    else:
+        target_name = request.args.get('searchName', '')
+        selected_urls = request.args.getlist('selectedUrls')
 
-        execution_time = time.time() - execution_start
-        print(f"Program Ended, Time: {execution_time} seconds")
+    if not target_name:
+        return jsonify({"error": "No search name provided"}), 400
+    if not selected_urls:
+        return jsonify({"error": "No URLs selected"}), 400
 
-        return jsonify(dictionary)
+    events = stream_assessment_events(
+        target_name, selected_urls,
+        fetch_concurrency=current_app.config['EXTRACT_FETCH_CONCURRENCY'],
+        llm_concurrency=current_app.config['EXTRACT_LLM_CONCURRENCY'],
+        heartbeat_interval=current_app.config['EXTRACT_STREAM_HEARTBEAT'],
+        connection=current_connection.get())
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # Stop nginx from buffering the stream
+    })
@@ -0,0 +1,197 @@
+from math import exp, isfinite
+from numbers import Real
+
+import numpy as np
+
+# PII attributes in the order extract_pii builds its attributes dictionary; stored assessments keep the same keys
+ATTRIBUTE_NAMES = (
+    'Name', 'Location', 'Email', 'Phone', 'DoB', 'Address', 'Gender', 'Employer', 'Education', 'Birth Place',
+    'Personal Cell', 'Business Phone', 'Facebook Account', 'Twitter Account', 'Instagram Account', 'DDL',
+    'Passport #', 'Credit Card', 'SSN'
+)
+
+WEIGHTS = {'Name': 1, 'Address': 1, 'Location': 1, 'Gender': 1, 'Employer': 2, 'DoB': 2, 'Education': 1,
+           'Birth Place': 2, 'Personal Cell': 0.5, 'Email': 0.1, 'Business Phone': 0.1, 'Facebook Account': 1,
+           'Twitter Account': 0.1, 'Instagram Account': 0.1, 'DDL': 2, 'Passport #': 2, 'Credit Card': 2,
+           'SSN': 10}
+
+WILLINGNESS_MEASURES = {'Name': 1.0, 'Address': 0.1, 'Location': 0.1, 'Birth Place': 0.2, 'DoB': 0.83,
+                        'Personal Cell': 0.16, 'Gender': 0.98, 'Employer': 0.5, 'Education': 0.8, 'Email': 0.7,
+                        'Business Phone': 0.4, 'Facebook Account': 0.9, 'Twitter Account': 0.9,
+                        'Instagram Account': 0.9, 'DDL': 0.2, 'Passport #': 0.05, 'Credit Card': 0.02,
+                        'SSN': 0.01}
+
+RESOLUTION_POWERS = {'Name': 0.1, 'Address': 0.3, 'Location': 0.1, 'DoB': 0.7, 'Personal Cell': 0.9, 'Email': 0.95,
+                     'Business Phone': 0.4, 'Facebook Account': 0.8, 'Twitter Account': 0.8, 'Instagram Account': 0.8,
+                     'DDL': 1.0, 'Passport #': 1.0, 'Credit Card': 1.0, 'SSN': 1.0, 'Gender': 0.1, 'Employer': 0.2,
+                     'Education': 0.3, 'Birth Place': 0.5}
+
+BETA_COEFFICIENTS = {'Name': 1, 'Address': 1, 'Location': 1, 'DoB': 1, 'Personal Cell': 1, 'Email': 1,
+                     'Business Phone': 1, 'Facebook Account': 1, 'Twitter Account': 1, 'Instagram Account': 1,
+                     'DDL': 1, 'Passport #': 1, 'Credit Card': 1, 'SSN': 1, 'Gender': 1, 'Employer': 1,
+                     'Education': 1, 'Birth Place': 1}
+
+# Coefficient tables a caller may override, by RiskScoringEngine keyword
+COEFFICIENT_TABLES = ('weights', 'willingness_measures', 'resolution_powers', 'beta_coefficients')
+
+# Upper bounds (inclusive) of every risk level but the last
+RISK_LEVEL_BOUNDS = (2.74, 5.48, 6.87, 12.25)
+RISK_LEVELS = ('Very Low', 'Low', 'Medium', 'High', 'Very High')
+
+
+def calculate_privacy_score(willingness_measure, resolution_power, beta_coefficient):
+    privacy_score = 1 / exp(beta_coefficient * (1 - willingness_measure) * resolution_power)
+    return privacy_score
+
+
+def calculate_overall_risk_score(pii_attributes, weights, willingness_measures, resolution_powers, beta_coefficients):
+    overall_risk_score = 0
+    if not any(pii_attributes.values()):
+        return 0  # No personal information found
+    for attribute in pii_attributes:
+        if pii_attributes[attribute]:  # Only calculate for attributes that have values
+            weight = weights.get(attribute, 0)
+            willingness_measure = willingness_measures.get(attribute, 0)
+            resolution_power = resolution_powers.get(attribute, 0)
+            beta_coefficient = beta_coefficients.get(attribute, 1)
+            privacy_score = calculate_privacy_score(willingness_measure, resolution_power, beta_coefficient)
+            overall_risk_score += weight * privacy_score
+    return overall_risk_score
+
+
+def risk_level_for(overall_risk_score):
+    """Map an overall risk score to its risk level label."""
+    if overall_risk_score == 0:
+        return 'Low'
+    for bound, level in zip(RISK_LEVEL_BOUNDS, RISK_LEVELS):
+        if overall_risk_score <= bound:
+            return level
+    return RISK_LEVELS[-1]
+
+
+class RiskScoringEngine:
+    """
+    Risk scoring with the coefficient tables compiled once into an array aligned with attribute_names.
+
+    Every attribute's contribution, weight * privacy score, is computed up front with the same
+    arithmetic as calculate_overall_risk_score. Scores are then the left-to-right sum of the
+    contributions of the attributes present, which gives results bit-for-bit identical to
+    calculate_overall_risk_score whether one profile or a whole matrix of presence vectors is scored.
+    """
+
+    def __init__(self, weights=WEIGHTS, willingness_measures=WILLINGNESS_MEASURES,
+                 resolution_powers=RESOLUTION_POWERS, beta_coefficients=BETA_COEFFICIENTS,
+                 attribute_names=ATTRIBUTE_NAMES):
+        self.weights = dict(weights)
+        self.willingness_measures = dict(willingness_measures)
+        self.resolution_powers = dict(resolution_powers)
+        self.beta_coefficients = dict(beta_coefficients)
+        self.attribute_names = tuple(attribute_names)
+        self.index = {name: i for i, name in enumerate(self.attribute_names)}
+        self.contributions = np.array([self.contribution(name) for name in self.attribute_names], dtype=np.float64)
+
+    def with_overrides(self, coefficients):
+        """
+        Return an engine whose coefficient tables are this engine's, overridden attribute by attribute.
+
+        Args:
+            coefficients (dict): Table name (see COEFFICIENT_TABLES) -> {attribute: number}
+
+        Returns:
+            RiskScoringEngine: self if there is nothing to override, otherwise a new engine
+
+        Raises:
+            ValueError: If coefficients is not a dictionary of known tables mapping names to numbers
+        """
+        if not isinstance(coefficients, dict):
+            raise ValueError("coefficients must be a dictionary")
+        for table, overrides in coefficients.items():
+            if table not in COEFFICIENT_TABLES:
+                raise ValueError(f"Unknown coefficient table: {table}")
+            if not isinstance(overrides, dict):
+                raise ValueError(f"{table} must be a dictionary of attribute -> number")
+            for attribute, value in overrides.items():
+                # bool is a Real too, but true/false is never meant as a coefficient
+                if not isinstance(value, Real) or isinstance(value, bool) or not isfinite(value):
+                    raise ValueError(f"{table}.{attribute} must be a finite number")
+        if not coefficients:
+            return self
+
+        tables = {table: {**getattr(self, table), **coefficients.get(table, {})} for table in COEFFICIENT_TABLES}
+        return RiskScoringEngine(attribute_names=self.attribute_names, **tables)
+
+    def contribution(self, attribute):
+        """Return weight * privacy score for one attribute, using the same defaults as the scalar path."""
+        privacy_score = calculate_privacy_score(self.willingness_measures.get(attribute, 0),
+                                                self.resolution_powers.get(attribute, 0),
+                                                self.beta_coefficients.get(attribute, 1))
+        return self.weights.get(attribute, 0) * privacy_score
+
+    def score(self, pii_attributes):
+        """
+        Score one profile.
+
+        Args:
+            pii_attributes (dict): Attribute name -> collection of values (empty if not found)
+
+        Returns:
+            float: The overall risk score (0 if no attribute has a value)
+        """
+        if not any(pii_attributes.values()):
+            return 0  # No personal information found
+
+        overall_risk_score = 0
+        for attribute, values in pii_attributes.items():
+            if values:
+                index = self.index.get(attribute)
+                overall_risk_score += self.contributions[index].item() if index is not None \
+                    else self.contribution(attribute)
+        return overall_risk_score
+
+    def presence_matrix(self, profiles):
+        """
+        Convert profiles to a presence matrix aligned with attribute_names.
+
+        Args:
+            profiles (list): Dictionaries of attribute name -> collection of values
+
+        Returns:
+            numpy.ndarray: Boolean array of shape (len(profiles), len(attribute_names))
+        """
+        presence = np.zeros((len(profiles), len(self.attribute_names)), dtype=bool)
+        for row, profile in enumerate(profiles):
+            for attribute, values in profile.items():
+                index = self.index.get(attribute)
+                if index is not None and values:
+                    presence[row, index] = True
+        return presence
+
+    def score_batch(self, presence):
+        """
+        Score many profiles in one vectorized call.
+
+        Args:
+            presence (array-like): Shape (n, len(attribute_names)); truthy where the attribute was found
+
+        Returns:
+            numpy.ndarray: The n overall risk scores
+        """
+        presence = np.asarray(presence, dtype=bool)
+        if presence.ndim != 2 or presence.shape[1] != len(self.attribute_names):
+            raise ValueError(f"Expected presence vectors of length {len(self.attribute_names)}")
+        if presence.shape[0] == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        # cumsum adds strictly left to right, matching the scalar loop; absent attributes add exactly 0.0
+        return np.cumsum(np.where(presence, self.contributions, 0.0), axis=1)[:, -1]
+
+    @staticmethod
+    def risk_levels(scores):
+        """Vectorized risk_level_for."""
+        scores = np.asarray(scores, dtype=np.float64)
+        levels = np.array(RISK_LEVELS, dtype=object)[np.searchsorted(RISK_LEVEL_BOUNDS, scores, side='left')]
+        levels[scores == 0] = 'Low'
+        return levels
+
+
+default_engine = RiskScoringEngine()
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import threading
+
+
+class SqliteCache:
+    """
+    Base class for the SQLite-backed caches of the search pipeline.
+
+    Subclasses set table and schema. Rows must have key, last_access and size columns, which the
+    base class uses for least-recently-used eviction once the stored bytes exceed max_bytes.
+    """
+
+    table = None
+    schema = ()
+    counter_names = ()
+
+    def __init__(self):
+        self.enabled = True
+        self.path = None
+        self.max_bytes = 64 * 1024 * 1024
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._counters = {name: 0 for name in self.counter_names}
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+
+    def stats(self):
+        """
+        Return the cache counters and current size.
+
+        Returns:
+            dict: The counters plus the number of entries and bytes stored
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({"enabled": self.enabled, "max_bytes": self.max_bytes})
+            if not self.enabled:
+                return stats
+
+            entries, total_bytes = self._connection().execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+            stats.update({"entries": entries, "total_bytes": total_bytes})
+            return stats
+
+    def _evict(self, conn):
+        total_bytes = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY last_access ASC"):
+            if total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total_bytes -= size
+
+        conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
+        self._counters["evictions"] += len(evicted)
+
+    def _connection(self):
+        # SQLite connections must not be shared with a forked child, so reopen per process
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self.schema:
+                self._conn.execute(statement)
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
@@ -0,0 +1,130 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+from io import BytesIO
+
+from a2wsgi import WSGIMiddleware
+from flask import Flask
+from uvicorn.workers import UvicornWorker
+from werkzeug.exceptions import ClientDisconnected
+
+from riskassessmentapp.connection import ClientConnection, current_connection
+from riskassessmentapp.extensions import http_pool
+from riskassessmentapp.search.openai_clients import close_async_openai_client, share_async_openai_client
+
+
+class AsgiApp:
+    """
+    Serve the Flask app from an ASGI server with one long-lived event loop per worker.
+
+    Requests are handed to a2wsgi's WSGIMiddleware, which runs each one in a thread of a bounded
+    pool (ASGI_THREADS) and forwards streaming responses chunk by chunk. Flask's async views are
+    sent from that thread back to the server's event loop instead of getting a fresh loop each, so
+    every request of a worker shares one loop and one OpenAI client. The views hand parsing, token
+    counting, fingerprinting, the identifier rules and scoring to threads, so the loop only waits
+    on I/O. When a client disconnects, whatever its request still runs on the loop is cancelled.
+    Lifespan events are answered here so the shared clients are closed on shutdown.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(self.wsgi_app, workers=flask_app.config.get('ASGI_THREADS', 64))
+
+        # Flask calls this for every async view; the instance attribute overrides Flask's own
+        flask_app.async_to_sync = self.async_to_sync
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            await self.wsgi(scope, receive, send)
+            return
+
+        connection = ClientConnection(asyncio.get_running_loop())
+        messages = asyncio.Queue()
+
+        # a2wsgi only reads from receive while the request body is read, so a disconnect during the
+        # response would go unnoticed; listen for it here and pass the body on
+        async def listen():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    connection.disconnect()
+                    return
+
+        listener = asyncio.create_task(listen())
+        # Seen by the request thread, which a2wsgi runs in a copy of this task's context
+        current_connection.set(connection)
+        try:
+            await self.wsgi(scope, messages.get, send)
+        finally:
+            listener.cancel()
+
+    def wsgi_app(self, environ, start_response):
+        # Read the request body here in the request thread: a2wsgi reads it lazily by waiting on the
+        # server's loop, which never finishes when the reader is an async view running on that loop
+        environ["wsgi.input"] = BytesIO(environ["wsgi.input"].read())
+        return self.flask_app(environ, start_response)
+
+    def async_to_sync(self, func):
+        """Run async views on the server's event loop, or the Flask way outside of an ASGI server."""
+        def run(*args, **kwargs):
+            connection = current_connection.get()
+            if connection is None:
+                return Flask.async_to_sync(self.flask_app, func)(*args, **kwargs)
+            # Scheduled from a copy of this thread's context so the view sees the request context
+            future = contextvars.copy_context().run(connection.run, func(*args, **kwargs))
+            try:
+                return future.result()
+            except concurrent.futures.CancelledError:
+                raise ClientDisconnected() from None
+
+        return run
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Async views run on this loop, so they can all use one OpenAI client
+            share_async_openai_client(asyncio.get_running_loop())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            # Close pooled connections while the worker is still running rather than at exit
+            await close_async_openai_client()
+            await asyncio.to_thread(http_pool.close)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def make_asgi_app(flask_app):
+    """
+    Wrap the Flask app for an ASGI server, see AsgiApp.
+
+    Args:
+        flask_app (Flask): The application returned by create_app()
+
+    Returns:
+        AsgiApp: The ASGI application
+    """
+    return AsgiApp(flask_app)
+
+
+class RiskAssessmentUvicornWorker(UvicornWorker):
+    """
+    Gunicorn worker that runs the ASGI app on one uvicorn event loop per process.
+
+    ASGI_LIMIT_CONCURRENCY caps the connections a worker serves at once (503 beyond it), and
+    ASGI_TIMEOUT_KEEP_ALIVE is how long idle client connections are kept open.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "asyncio",
+        "http": "auto",
+        "lifespan": "on",
+        "limit_concurrency": int(os.getenv("ASGI_LIMIT_CONCURRENCY", 0)) or None,
+        "timeout_keep_alive": int(os.getenv("ASGI_TIMEOUT_KEEP_ALIVE", 5)),
+    }
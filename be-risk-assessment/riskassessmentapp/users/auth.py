@@ -0,0 +1,28 @@
+from functools import wraps
+
+from flask import current_app, jsonify
+from flask_login import current_user
+
+
+def is_admin(user):
+    """True if user is logged in with one of the ADMIN_EMAILS addresses."""
+    if not user.is_authenticated:
+        return False
+    return user.email.lower() in current_app.config.get('ADMIN_EMAILS', frozenset())
+
+
+def admin_required(view):
+    """
+    Restrict a view to logged-in administrators (ADMIN_EMAILS).
+
+    Anonymous requests get a 401 and logged-in users who are not administrators a 403.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({'message': 'Login required'}), 401
+        if not is_admin(current_user):
+            return jsonify({'message': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+
+    return wrapped
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+
+class UserCache:
+    """
+    Short-lived per-process cache for the Flask-Login user loader.
+
+    Holds a detached copy of each user's columns for USER_CACHE_TTL seconds. A hit is merged into
+    the request's session without a query, so the loaded user behaves like one fetched from the
+    database. update-user and forgot-password invalidate the entry in the process that handled them;
+    other worker processes see the change once their entry expires. USER_CACHE_TTL=0 disables it.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 30
+        self.max_entries = 4096
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('USER_CACHE_SIZE', self.max_entries)
+        app.extensions['user_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def load(self, session, model, uid):
+        """
+        Return the user with primary key uid, from the cache if possible.
+
+        Args:
+            session (Session): The request's database session
+            model (type): The user model
+            uid (str): The user's primary key
+
+        Returns:
+            The user attached to session, or None if there is no such user
+        """
+        if not self.enabled:
+            return session.get(model, uid)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                snapshot = entry[1]
+            else:
+                self.misses += 1
+                snapshot = None
+
+        if snapshot is not None:
+            return session.merge(snapshot, load=False)
+
+        user = session.get(model, uid)
+        if user is not None:
+            self._put(uid, user, now)
+        return user
+
+    def invalidate(self, uid):
+        with self._lock:
+            self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"enabled": self.enabled, "entries": len(self._entries), "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses}
+
+    def _put(self, uid, user, now):
+        # A copy of the loaded columns: the user itself belongs to this request's session
+        mapper = inspect(user).mapper
+        snapshot = mapper.class_(**{attr.key: getattr(user, attr.key) for attr in mapper.column_attrs})
+        make_transient_to_detached(snapshot)
+
+        with self._lock:
+            self._entries[uid] = (now + self.ttl, snapshot)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -1,6 +1,7 @@
 import uuid
 from flask_login import UserMixin
 from riskassessmentapp.app import db
+from riskassessmentapp.utils import utcnow
 
 class User(db.Model, UserMixin):
     __tablename__ = 'users'
@@ -8,8 +9,9 @@ class User(db.Model, UserMixin):
     uid = db.Column(db.String(36), unique=True, nullable=False, primary_key=True, default=lambda: str(uuid.uuid4()))
     first_name = db.Column(db.String(255), nullable=False)
     last_name = db.Column(db.String(255), nullable=False)
-    email = db.Column(db.String(255), nullable=False)
+    email = db.Column(db.String(255), nullable=False, unique=True, index=True)
     password = db.Column(db.String(255), nullable=False)
+    # Superseded by search_history; kept only for the downgrade of the migration that copied it there
     search_names = db.Column(db.String(10000), nullable=True)
 
     def __repr__(self):
@@ -23,6 +25,27 @@ class User(db.Model, UserMixin):
             "uid": self.uid,
             "email":self.email,
             "firstName":self.first_name,
-            "lastName":self.last_name,
-            "searchNames":self.search_names
+            "lastName":self.last_name
+        }
+
+
+class SearchHistory(db.Model):
+    __tablename__ = 'search_history'
+    __table_args__ = (
+        db.Index('ix_search_history_user_created', 'user_uid', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_uid = db.Column(db.String(36), db.ForeignKey('users.uid', ondelete='CASCADE'), nullable=False)
+    search_name = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+    def __repr__(self):
+        return f'<SearchHistory: {self.user_uid} {self.id}>'
+
+    def to_json_response(self):
+        return {
+            "id": self.id,
+            "searchName": self.search_name,
+            "createdAt": self.created_at.isoformat(),
         }
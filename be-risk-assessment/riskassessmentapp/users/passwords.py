@@ -0,0 +1,78 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from riskassessmentapp.metrics import QUEUE_DEPTH
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when more password hashes are waiting than BCRYPT_MAX_PENDING allows."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and checking on a small, bounded thread pool.
+
+    bcrypt releases the GIL, so BCRYPT_WORKERS hashes run in parallel while the request threads
+    that asked for them only wait; a burst of logins therefore uses at most BCRYPT_WORKERS cores
+    instead of one per request thread. Beyond BCRYPT_MAX_PENDING waiting hashes new ones are
+    refused with PasswordHasherBusy rather than queued. The work factor is BCRYPT_LOG_ROUNDS;
+    existing hashes keep the factor they were made with. BCRYPT_WORKERS=0 hashes on the request
+    thread.
+    """
+
+    def __init__(self, app=None):
+        self.bcrypt = None
+        self.workers = 2
+        self.max_pending = 64
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # The Flask-Bcrypt instance holds the work factor
+        from riskassessmentapp.extensions import bcrypt
+
+        self.bcrypt = bcrypt
+        self.workers = app.config.get('BCRYPT_WORKERS', self.workers)
+        self.max_pending = app.config.get('BCRYPT_MAX_PENDING', self.max_pending)
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password)
+
+    def check(self, password_hash, password):
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "pending": self._pending, "max_pending": self.max_pending}
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy("Too many password checks in progress")
+            self._pending += 1
+        depth = QUEUE_DEPTH.labels("bcrypt")
+        depth.inc()
+        try:
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            depth.dec()
+            with self._lock:
+                self._pending -= 1
+
+    def _get_executor(self):
+        with self._lock:
+            # Threads do not survive a fork, so each worker process gets its own pool
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+                self._pid = os.getpid()
+            return self._executor
@@ -6,12 +6,28 @@ import uuid
 import random
 import string
 
-from riskassessmentapp.extensions import db, bcrypt, mail
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
 
-from riskassessmentapp.users.models import User
+from riskassessmentapp.database import read_first
+from riskassessmentapp.extensions import db, mail, password_hasher, user_cache
+
+from riskassessmentapp.users.models import User, SearchHistory
+from riskassessmentapp.users.passwords import PasswordHasherBusy
 
 users = Blueprint('users', __name__, template_folder='templates')
 
+DEFAULT_HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_PAGE_SIZE = 100
+
+@users.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(e):
+    response = make_response(jsonify({'message': 'Too many requests, please try again', 'user': {}}))
+    response.status_code = 503
+    response.headers['content-type'] = 'application/json'
+    response.headers['Retry-After'] = '1'
+    return response
+
 @users.route('/')
 def index():
     if current_user.is_authenticated:
@@ -42,12 +58,20 @@ def signup():
 
     uid = uuid.uuid4()
 
-    hashed_password = bcrypt.generate_password_hash(password)
+    hashed_password = password_hasher.hash(password)
 
     user = User(first_name = first_name, last_name = last_name, email = email, password=hashed_password, uid=uid)
 
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another signup with the same email won the race; the unique index on email rejected this one
+        db.session.rollback()
+        response = make_response(jsonify({'message': 'User already exists!'}))
+        response.status_code = 400
+        response.headers['content-type'] = 'application/json'
+        return response
 
     response = make_response(jsonify({'message': 'Successfully written!', 'user':user.to_json_response()}))
     response.status_code = 200
@@ -73,7 +97,7 @@ def login():
         response.headers['content-type'] = 'application/json'
         return response
     
-    if bcrypt.check_password_hash(user.password, password):
+    if password_hasher.check(user.password, password):
         login_user(user)
         response = make_response(jsonify({'message': 'Logged in', 'user':user.to_json_response()}))
         response.status_code = 200
@@ -99,7 +123,7 @@ def getUserDetails():
         response.headers['content-type'] = 'application/json' 
         return response
     
-    user = User.query.filter(User.email == email).first()
+    user = read_first(select(User).where(User.email == email))
     if user:
         response = make_response(jsonify({'message': 'User found', 'user':user.to_json_response()}))
         response.status_code = 200
@@ -123,7 +147,7 @@ def updateUserDetails():
     first_name = request.json['firstName']
     last_name = request.json['lastName']
     email = request.json['email']
-    search_names = request.json['searchNames']
+    # searchNames is no longer accepted here: saved searches are appended through /users/search-history
 
     old_password = request.json.get('oldPassword')  # Optional
     new_password = request.json.get('newPassword')  # Optional
@@ -139,20 +163,20 @@ def updateUserDetails():
 
     # If user is attempting to change password, validate old password
     if old_password and new_password:
-        if not bcrypt.check_password_hash(user.password, old_password):
+        if not password_hasher.check(user.password, old_password):
             response = make_response(jsonify({'message': 'Current password is wrong', 'user': {}}))
             response.status_code = 400
             response.headers['content-type'] = 'application/json'
             return response
         # Hash and update the password
-        user.password = bcrypt.generate_password_hash(new_password)
+        user.password = password_hasher.hash(new_password)
 
-    # Always update these fields
+    # Always update the name
     user.first_name = first_name
     user.last_name = last_name
-    user.search_names = search_names
 
     db.session.commit()
+    user_cache.invalidate(user.uid)
 
     response = make_response(jsonify({'message': 'Successfully updated!', 'user': user.to_json_response()}))
     response.status_code = 200
@@ -184,9 +208,10 @@ def forgot_password():
     characters = string.ascii_letters + string.digits  # a-z, A-Z, 0-9
     temp_pass = ''.join(random.choices(characters, k=10))
 
-    user.password = bcrypt.generate_password_hash(temp_pass)
+    user.password = password_hasher.hash(temp_pass)
 
     db.session.commit()
+    user_cache.invalidate(user.uid)
 
     msg_body = f"Your temporary password to login to app is {temp_pass}. Please use this password and update your new password from Profile page."
 
@@ -196,4 +221,84 @@ def forgot_password():
     response = make_response(jsonify({'message': 'Temporary password email sent! Check your inbox.', 'user': {}}))
     response.status_code = 200
     response.headers['content-type'] = 'application/json'
-    return response
\ No newline at end of file
+    return response
+
+@users.route('/search-history', methods=['GET'])
+def getSearchHistory():
+    """
+    Return a user's searches, most recent first.
+
+    Paginated with ?limit= and ?before=, the nextCursor of the previous page. The cursor is the
+    last entry's id, so each page is one range scan of the (user, time) index however long the
+    history is.
+    """
+    email = request.args.get('email', '').strip('"').strip("'")
+    if not email:
+        response = make_response(jsonify({'message': 'Fields are missing', 'history': []}))
+        response.status_code = 400
+        response.headers['content-type'] = 'application/json'
+        return response
+
+    user = User.query.filter(User.email == email).first()
+    if not user:
+        response = make_response(jsonify({'message': 'User not found', 'history': []}))
+        response.status_code = 400
+        response.headers['content-type'] = 'application/json'
+        return response
+
+    limit = min(max(request.args.get('limit', DEFAULT_HISTORY_PAGE_SIZE, type=int), 1), MAX_HISTORY_PAGE_SIZE)
+    before = request.args.get('before', type=int)
+
+    query = SearchHistory.query.filter(SearchHistory.user_uid == user.uid)
+    if before is not None:
+        cursor = db.session.get(SearchHistory, before)
+        if cursor is None or cursor.user_uid != user.uid:
+            response = make_response(jsonify({'message': 'Invalid cursor', 'history': []}))
+            response.status_code = 400
+            response.headers['content-type'] = 'application/json'
+            return response
+        query = query.filter(or_(
+            SearchHistory.created_at < cursor.created_at,
+            and_(SearchHistory.created_at == cursor.created_at, SearchHistory.id < cursor.id),
+        ))
+
+    # One extra row tells whether there is a next page
+    entries = query.order_by(SearchHistory.created_at.desc(), SearchHistory.id.desc()).limit(limit + 1).all()
+    next_cursor = entries[limit - 1].id if len(entries) > limit else None
+
+    response = make_response(jsonify({
+        'message': 'History found',
+        'history': [entry.to_json_response() for entry in entries[:limit]],
+        'nextCursor': next_cursor,
+    }))
+    response.status_code = 200
+    response.headers['content-type'] = 'application/json'
+    return response
+
+@users.route('/search-history', methods=['POST'])
+def addSearchHistory():
+    """Append one search to a user's history."""
+    if "email" not in request.json or not request.json.get("searchName"):
+        response = make_response(jsonify({'message': 'Fields are missing'}))
+        response.status_code = 400
+        response.headers['content-type'] = 'application/json'
+        return response
+
+    email = request.json['email']
+    search_name = request.json['searchName'].strip()[:255]
+
+    user = User.query.filter(User.email == email).first()
+    if not user:
+        response = make_response(jsonify({'message': 'User not found'}))
+        response.status_code = 400
+        response.headers['content-type'] = 'application/json'
+        return response
+
+    entry = SearchHistory(user_uid=user.uid, search_name=search_name)
+    db.session.add(entry)
+    db.session.commit()
+
+    response = make_response(jsonify({'message': 'Successfully written!', 'entry': entry.to_json_response()}))
+    response.status_code = 200
+    response.headers['content-type'] = 'application/json'
+    return response
@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utcnow():
+    # Naive UTC timestamps so comparisons behave the same on MySQL and SQLite
+    return datetime.now(timezone.utc).replace(tzinfo=None)
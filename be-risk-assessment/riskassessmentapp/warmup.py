@@ -0,0 +1,71 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# The model the pipeline counts tokens for unless a caller passes another one
+TOKENIZER_MODEL = "gpt-4o-mini"
+
+
+def import_openai():
+    from openai import AsyncOpenAI, OpenAI  # noqa: F401
+
+
+def load_tokenizer():
+    from riskassessmentapp.search.chunking import get_encoding
+    get_encoding(TOKENIZER_MODEL)
+
+
+def load_html_parser():
+    from bs4 import BeautifulSoup
+
+    from riskassessmentapp.search.document import DEFAULT_PARSER
+    BeautifulSoup("<html><body><p>warm-up</p></body></html>", DEFAULT_PARSER)
+
+
+def import_sentence_transformers():
+    import sentence_transformers  # noqa: F401
+
+
+def load_ranking_model():
+    from riskassessmentapp.extensions import ranker
+    ranker.load_before_fork()
+
+
+def warm_up(app):
+    """
+    Do the one-off loading that the first requests of every worker would otherwise wait for.
+
+    gunicorn.conf.py runs this in the master before any worker is forked, so the openai package, the
+    tokenizer tables and the HTML parser are loaded once and shared copy-on-write by all workers.
+    With RANKING_MODE=embedding the sentence-transformers stack is imported too, and with
+    WARMUP_RANKING_MODEL the model itself is loaded. Nothing here opens a connection or starts a
+    thread, neither of which survives a fork. A step that fails is logged and left to the workers,
+    which load everything lazily anyway.
+
+    Args:
+        app (Flask): The application
+
+    Returns:
+        dict: Seconds spent on each step that succeeded
+    """
+    steps = [("openai", import_openai), ("tokenizer", load_tokenizer), ("html_parser", load_html_parser)]
+    if app.config['RANKING_MODE'] == "embedding":
+        if app.config['WARMUP_RANKING_MODEL']:
+            steps.append(("ranking_model", load_ranking_model))
+        else:
+            steps.append(("sentence_transformers", import_sentence_transformers))
+
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed, workers will load it on first use: %s", name, e)
+            continue
+        timings[name] = time.perf_counter() - start
+
+    logger.info("Warm-up done in %.2fs: %s", sum(timings.values()),
+                ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+    return timings
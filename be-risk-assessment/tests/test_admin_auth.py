@@ -0,0 +1,44 @@
+import pytest
+
+from riskassessmentapp.app import create_app, db
+from riskassessmentapp.users.models import User
+
+ADMIN_URLS = [
+    ("get", "/risksearch/admin/llm-cache"),
+    ("post", "/risksearch/admin/llm-cache/invalidate"),
+    ("get", "/risksearch/admin/domains"),
+    ("post", "/risksearch/admin/domains/reset"),
+    ("get", "/risksearch/admin/search-provider"),
+    ("get", "/jobs/admin/workers"),
+]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("SECRET_KEY", "test")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.db"))
+    monkeypatch.setenv("PAGE_CACHE_PATH", str(tmp_path / "pages.db"))
+    monkeypatch.setenv("ADMIN_EMAILS", "Admin@example.com")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        for email in ("admin@example.com", "user@example.com"):
+            db.session.add(User(uid=email, first_name="A", last_name="B", email=email, password="x"))
+        db.session.commit()
+    return app
+
+
+def client_for(app, uid=None):
+    client = app.test_client()
+    if uid:
+        with client.session_transaction() as session:
+            session["_user_id"] = uid
+    return client
+
+
+@pytest.mark.parametrize("method,url", ADMIN_URLS)
+def test_admin_endpoints_need_an_admin(app, method, url):
+    assert getattr(client_for(app), method)(url, json={}).status_code == 401
+    assert getattr(client_for(app, "user@example.com"), method)(url, json={}).status_code == 403
+    assert getattr(client_for(app, "admin@example.com"), method)(url, json={}).status_code == 200
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from riskassessmentapp.app import create_app, db
+from riskassessmentapp.search.assessment_store import find_fresh_assessment, save_assessment
+from riskassessmentapp.search.models import Assessment
+from riskassessmentapp.search.routes import PII_PROMPT_FIELDS, empty_attributes, score_attributes
+from riskassessmentapp.search.scoring import ATTRIBUTE_NAMES
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("SECRET_KEY", "test")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_one_attribute_list():
+    assert tuple(empty_attributes()) == ATTRIBUTE_NAMES
+    assert tuple(attribute for attribute, _, _ in PII_PROMPT_FIELDS) == ATTRIBUTE_NAMES
+
+
+def test_stored_assessment_has_the_keys_of_a_fresh_one(app):
+    attributes = empty_attributes()
+    attributes["Phone"] = {"(555) 123-4567"}
+    fresh = score_attributes(attributes)
+
+    save_assessment("Jane Doe", ["https://a.example/jane"], {}, fresh)
+    stored = score_attributes(find_fresh_assessment("Jane Doe", ["https://a.example/jane"], 60).get_attributes())
+
+    assert stored == fresh
+
+
+def test_rows_stored_with_fewer_keys_are_filled_in(app):
+    save_assessment("Jane Doe", ["https://a.example/jane"], {}, score_attributes(empty_attributes()))
+    assessment = Assessment.query.one()
+    assessment.attributes = json.dumps({"Email": ["jane@example.com"]})
+    db.session.commit()
+
+    attributes = assessment.get_attributes()
+    assert tuple(attributes) == ATTRIBUTE_NAMES
+    assert attributes["Email"] == ["jane@example.com"] and attributes["Phone"] == []
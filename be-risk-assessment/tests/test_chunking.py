@@ -0,0 +1,65 @@
+import pytest
+
+from riskassessmentapp.search import chunking
+from riskassessmentapp.search.chunking import chunk_pieces, completion_budget, count_tokens, split_oversized
+
+
+class CharEncoding:
+    """One token per character, so token budgets can be checked exactly."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+@pytest.fixture(params=["chars", "estimate"])
+def model(request, monkeypatch):
+    monkeypatch.setitem(chunking._encodings, "test-chars", CharEncoding())
+    monkeypatch.setitem(chunking._encodings, "test-estimate", None)
+    return f"test-{request.param}"
+
+
+def test_estimate_without_tiktoken(monkeypatch):
+    monkeypatch.setitem(chunking._encodings, "test-estimate", None)
+    assert count_tokens("x" * 9, "test-estimate") == 3
+
+
+def test_split_oversized_respects_the_budget(model):
+    text = "abcdefghij" * 25
+    parts = split_oversized(text, 16, model)
+    assert "".join(parts) == text
+    assert all(count_tokens(part, model) <= 16 for part in parts)
+
+
+@pytest.mark.parametrize("max_tokens", [8, 20, 50])
+def test_chunks_stay_within_budget_and_keep_order(model, max_tokens):
+    pieces = [f"line {i} " + "w" * (i % 13) for i in range(60)] + ["x" * 300]
+    chunks = chunk_pieces(pieces, max_tokens, model)
+
+    assert all(count_tokens(chunk, model) <= max_tokens for chunk in chunks)
+    assert "\n".join(chunks).replace("\n", "") == "".join(pieces)
+
+
+def test_pieces_are_packed_until_the_budget_is_full(monkeypatch):
+    monkeypatch.setitem(chunking._encodings, "test-chars", CharEncoding())
+    # 4 + 1 + 4 + 1 + 4 = 14 tokens fit, a fourth piece would not
+    chunks = chunk_pieces(["aaaa", "bbbb", "cccc", "dddd"], 14, "test-chars")
+    assert chunks == ["aaaa\nbbbb\ncccc", "dddd"]
+
+
+def test_only_oversized_pieces_are_split(monkeypatch):
+    monkeypatch.setitem(chunking._encodings, "test-chars", CharEncoding())
+    chunks = chunk_pieces(["short", "y" * 12, "tail"], 10, "test-chars", separator="\n\n")
+    assert chunks == ["short", "yyyyyyyyyy", "yy\n\ntail"]
+
+
+def test_empty_input(model):
+    assert chunk_pieces([], 10, model) == []
+
+
+def test_completion_budget_is_clamped():
+    assert completion_budget(100, 0.5, 200, 1000) == 200
+    assert completion_budget(1000, 0.5, 200, 1000) == 500
+    assert completion_budget(10000, 0.5, 200, 1000) == 1000
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from riskassessmentapp.search import dedup
+from riskassessmentapp.search.dedup import BANDS, BAND_BITS, NearDuplicateIndex, hamming_distance, simhash
+
+VOCABULARY = [f"word{i}" for i in range(2000)]
+
+
+def article(seed, words=600):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def test_short_texts_are_not_fingerprinted():
+    assert simhash("too few words here", min_words=50) is None
+
+
+def test_case_punctuation_and_spacing_do_not_change_the_fingerprint():
+    text = article(1)
+    assert simhash(text) == simhash(text.upper().replace(" ", ",\n  "))
+
+
+def test_small_edits_stay_much_closer_than_different_pages():
+    for seed in range(20):
+        words = article(seed).split()
+        edited = words[:300] + ["changed"] + words[301:]
+        assert hamming_distance(simhash(" ".join(words)), simhash(" ".join(edited))) <= 8
+        assert hamming_distance(simhash(" ".join(words)), simhash(article(seed + 100))) >= 16
+
+
+@pytest.fixture
+def fingerprints(monkeypatch):
+    """Make the text passed to claim() its own fingerprint, written in hex."""
+    monkeypatch.setattr(dedup, "simhash", lambda text, min_words: int(text, 16))
+
+
+def flip(fingerprint, *bit_positions):
+    for position in bit_positions:
+        fingerprint ^= 1 << position
+    return fingerprint
+
+
+@pytest.mark.parametrize("flipped_bits,duplicate", [
+    ((), True),
+    ((0,), True),
+    # One flip in each of three bands: the fourth band still matches
+    ((0, BAND_BITS, 2 * BAND_BITS), True),
+    ((0, 1, 2), True),
+    ((0, 1, 2, 3), False),
+    # Every band differs, so the pages are never compared
+    (tuple(band * BAND_BITS for band in range(BANDS)), False),
+])
+def test_threshold(fingerprints, flipped_bits, duplicate):
+    index = NearDuplicateIndex()
+    original = 0x0123456789ABCDEF
+    entry, _ = index.claim("Jane Doe", f"{original:x}", "https://a.example/1")
+
+    found, owner = index.claim("Jane Doe", f"{flip(original, *flipped_bits):x}", "https://b.example/1")
+    assert (found is entry) == duplicate
+    assert owner != duplicate
+
+
+def test_index_is_per_person(fingerprints):
+    index = NearDuplicateIndex()
+    first, _ = index.claim("Jane Doe", "ff", "https://a.example/1")
+    assert index.claim("jane  DOE", "ff", "https://b.example/1") == (first, False)
+    second, owner = index.claim("John Roe", "ff", "https://a.example/1")
+    assert owner and second is not first
+
+
+def test_abandoned_entries_are_forgotten(fingerprints):
+    index = NearDuplicateIndex()
+    entry, _ = index.claim("Jane Doe", "ff", "https://a.example/1")
+    index.abandon(entry)
+    assert entry.future.result() is None
+    assert index.claim("Jane Doe", "ff", "https://a.example/1")[1]
+
+
+def test_oldest_entries_are_evicted(fingerprints):
+    index = NearDuplicateIndex()
+    index.max_entries = 2
+    # Far apart in every band
+    texts = ["0", "ffffffffffffffff", "f0f0f0f0f0f0f0f0"]
+    for i, text in enumerate(texts):
+        index.claim("Jane Doe", text, f"https://a.example/{i}")
+
+    assert index.stats()["entries"] == 2
+    # The first page was evicted, so it becomes an original again
+    assert index.claim("Jane Doe", texts[0], "https://a.example/0")[1]
@@ -0,0 +1,36 @@
+from riskassessmentapp.search import document
+from riskassessmentapp.search.document import parse_document
+
+
+def page(words):
+    return "<html><head><title>T</title></head><body>" + "".join(f"<p>{word}</p>\n" for word in words) + "</body></html>"
+
+
+def test_repeated_parse_is_cached():
+    html = page(["hello world"] * 3)
+    assert parse_document(html, "https://example.com/a") is parse_document(html, "https://example.com/a")
+
+
+def test_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(document, "_cache", type(document._cache)())
+    monkeypatch.setattr(document, "_cache_bytes", 0)
+    sample = parse_document(page(["x" * 1000]), "https://example.com/size")
+    monkeypatch.setattr(document, "DOCUMENT_CACHE_MAX_BYTES", sample.size * 3)
+
+    urls = [f"https://example.com/{i}" for i in range(10)]
+    for url in urls:
+        parse_document(page(["y" * 1000]), url)
+
+    assert len(document._cache) == 3
+    assert document._cache_bytes == sum(doc.size for doc in document._cache.values())
+    assert document._cache_bytes <= document.DOCUMENT_CACHE_MAX_BYTES
+    assert [key[0] for key in document._cache] == urls[-3:]
+
+
+def test_oversized_documents_are_not_cached(monkeypatch):
+    monkeypatch.setattr(document, "_cache", type(document._cache)())
+    monkeypatch.setattr(document, "_cache_bytes", 0)
+    monkeypatch.setattr(document, "DOCUMENT_CACHE_MAX_BYTES", 100)
+
+    parse_document(page(["z" * 1000]), "https://example.com/big")
+    assert len(document._cache) == 0
@@ -0,0 +1,41 @@
+import asyncio
+
+from riskassessmentapp.search.domain_health import DomainHealthRegistry
+
+
+def make_registry():
+    registry = DomainHealthRegistry()
+    registry.rate = 1000.0
+    registry.burst = 1000
+    return registry
+
+
+def test_metadata_latencies_do_not_shorten_full_fetch_timeouts():
+    registry = make_registry()
+    for _ in range(registry.min_samples):
+        registry._record_success("example.com", "metadata", 0.1)
+
+    full = asyncio.run(registry.guard("https://example.com/a"))
+    metadata = asyncio.run(registry.guard("https://example.com/a", kind="metadata"))
+
+    assert full.timeout == registry.timeout_max
+    assert metadata.timeout == registry.timeout_min
+
+
+def test_timeout_follows_full_fetch_latencies():
+    registry = make_registry()
+    for _ in range(registry.min_samples):
+        registry._record_success("example.com", "full", 4.0)
+
+    guard = asyncio.run(registry.guard("https://www.example.com/a"))
+    assert guard.timeout == min(registry.timeout_max, 4.0 * registry.timeout_multiplier)
+
+
+def test_unsampled_success_closes_the_circuit_without_a_latency():
+    registry = make_registry()
+    guard = asyncio.run(registry.guard("https://example.com/a"))
+    guard.record_success(sample=False)
+
+    stats = registry.stats()["domains"]["example.com"]
+    assert stats["successes"] == 1
+    assert stats["latency"]["full"]["samples"] == 0
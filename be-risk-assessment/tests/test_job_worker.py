@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from riskassessmentapp.app import create_app, db
+from riskassessmentapp.extensions import job_workers
+from riskassessmentapp.jobs.models import AssessmentJobItem
+from riskassessmentapp.jobs.store import claim_next_item
+from riskassessmentapp.search import routes
+from riskassessmentapp.users.models import User
+
+PAGE = "<html><head><title>Jane Doe</title></head><body><p>Jane Doe is an engineer.</p></body></html>"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("SECRET_KEY", "test")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.db"))
+    monkeypatch.setenv("PAGE_CACHE_PATH", str(tmp_path / "pages.db"))
+    monkeypatch.setenv("ADMIN_EMAILS", "admin@example.com")
+    monkeypatch.setenv("DEDUP_ENABLED", "false")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        for email in ("admin@example.com", "owner@example.com", "other@example.com"):
+            db.session.add(User(uid=email, first_name="A", last_name="B", email=email, password="x"))
+        db.session.commit()
+    return app
+
+
+def client_for(app, uid=None):
+    client = app.test_client()
+    if uid:
+        with client.session_transaction() as session:
+            session["_user_id"] = uid
+    return client
+
+
+def submit_job(app, uid="owner@example.com"):
+    response = client_for(app, uid).post("/jobs/", json={
+        "items": [{"searchName": "Jane Doe", "selectedUrls": ["https://a.example/jane", "https://b.example/jane"]}],
+    })
+    assert response.status_code == 202
+    return response.get_json()["jobId"]
+
+
+def process_next_item(app):
+    with app.app_context():
+        job_workers._process(claim_next_item(job_workers.lease_seconds))
+        item = AssessmentJobItem.query.one()
+        return item.status, item.attempts, item.error, item.result
+
+
+class UnavailableOpenAI:
+    """Stands in for AsyncOpenAI during an outage: every chat completion fails."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        raise aiohttp.ClientConnectionError("OpenAI unavailable")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    async def fetch_pooled(url, mode="full"):
+        return PAGE
+
+    monkeypatch.setattr(routes, "fetch_pooled", fetch_pooled)
+
+
+def test_item_is_retried_when_every_url_fails_to_fetch(app, monkeypatch):
+    async def fetch_pooled(url, mode="full"):
+        raise aiohttp.ClientConnectionError("connection refused")
+
+    monkeypatch.setattr(routes, "fetch_pooled", fetch_pooled)
+    submit_job(app)
+
+    status, attempts, error, _ = process_next_item(app)
+    assert (status, attempts) == ("pending", 1)
+    assert "failed to fetch or clean" in error
+
+
+def test_item_is_retried_when_cleaning_fails(app, pages, monkeypatch):
+    monkeypatch.setattr(routes, "async_openai_client", UnavailableOpenAI)
+    submit_job(app)
+
+    status, attempts, error, _ = process_next_item(app)
+    assert (status, attempts) == ("pending", 1)
+    assert "failed to fetch or clean" in error
+
+
+def test_item_is_retried_when_extraction_fails(app, pages, monkeypatch):
+    async def clean(html_content, url, target_name, model="gpt-4o-mini", llm_client=None):
+        return ["Jane Doe works as an engineer."]
+
+    monkeypatch.setattr(routes, "clean_webpage_with_gpt", clean)
+    monkeypatch.setattr(routes, "async_openai_client", UnavailableOpenAI)
+    submit_job(app)
+
+    status, attempts, error, _ = process_next_item(app)
+    assert (status, attempts) == ("pending", 1)
+    assert error == "PII extraction failed"
+
+
+def test_item_without_relevant_data_completes(app, pages, monkeypatch):
+    async def clean(html_content, url, target_name, model="gpt-4o-mini", llm_client=None):
+        return []
+
+    monkeypatch.setattr(routes, "clean_webpage_with_gpt", clean)
+    submit_job(app)
+
+    status, attempts, error, result = process_next_item(app)
+    assert (status, attempts, error) == ("completed", 1, None)
+    assert "No relevant data" in result
+
+
+def test_cancel_needs_the_submitter_or_an_admin(app):
+    job_id = submit_job(app)
+
+    assert client_for(app).post(f"/jobs/{job_id}/cancel").status_code == 401
+    assert client_for(app, "other@example.com").post(f"/jobs/{job_id}/cancel").status_code == 403
+    assert client_for(app, "owner@example.com").post(f"/jobs/{job_id}/cancel").status_code == 200
+    assert client_for(app, "admin@example.com").post(f"/jobs/{job_id}/cancel").status_code == 200
+
+
+def test_anonymous_jobs_can_only_be_cancelled_by_an_admin(app):
+    job_id = submit_job(app, uid=None)
+
+    assert client_for(app, "owner@example.com").post(f"/jobs/{job_id}/cancel").status_code == 403
+    assert client_for(app, "admin@example.com").post(f"/jobs/{job_id}/cancel").status_code == 200
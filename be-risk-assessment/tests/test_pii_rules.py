@@ -0,0 +1,108 @@
+import asyncio
+
+from riskassessmentapp.search.chunking import TokenUsage, current_usage
+from riskassessmentapp.search.pii_rules import card_valid, find_identifiers, luhn_valid, ssn_valid
+from riskassessmentapp.search.routes import (
+    PII_PROMPT_FIELDS, apply_pii_rules, empty_attributes, extract_pii_with_gpt_async,
+)
+
+
+def test_luhn():
+    assert luhn_valid("4111111111111111")
+    assert luhn_valid("378282246310005")
+    assert not luhn_valid("4111111111111112")
+
+
+def test_ssn_validity():
+    assert ssn_valid("123-45-6789")
+    for ssn in ("000-12-3456", "666-12-3456", "912-34-5678", "123-00-4567", "123-45-0000"):
+        assert not ssn_valid(ssn), ssn
+
+
+def test_card_forms():
+    found = find_identifiers("Cards 4111 1111 1111 1111, 5500-0000-0000-0004, 3782 822463 10005 and 6011111111111117.")
+    assert found["Credit Card"] == {"4111111111111111", "5500000000000004", "378282246310005", "6011111111111117"}
+
+
+def test_card_rejects_years_and_unknown_prefixes():
+    assert find_identifiers("She studied 2015 2016 2017 2018 at MIT") == {}
+    # Luhn-valid, but no card network issues numbers starting with 1
+    assert not card_valid("1234567812345670")
+    # Luhn-valid Visa digits, but not grouped like a card
+    assert find_identifiers("ref 4111 11 1111 111111") == {}
+
+
+def test_social_urls():
+    found = find_identifiers(
+        "See https://www.facebook.com/john.doe, www.instagram.com/jdoe, m.facebook.com/jd.77, "
+        "mobile.twitter.com/jd_1 and x.com/jdoe.")
+    assert found["Facebook Account"] == {"john.doe", "jd.77"}
+    assert found["Instagram Account"] == {"@jdoe"}
+    assert found["Twitter Account"] == {"@jd_1", "@jdoe"}
+
+
+def test_social_urls_skip_site_pages_and_other_hosts():
+    assert find_identifiers("Share via facebook.com/sharer.php or notfacebook.com/john") == {}
+
+
+def test_handles():
+    found = find_identifiers("She posts as @janedoe on Twitter and @jane.d is not a handle.")
+    assert found == {"Twitter Account": {"@janedoe"}}
+
+
+def test_phone_context():
+    found = find_identifiers("Call her cell at (555) 123-4567, or her office on 555.987.6543.")
+    assert found["Personal Cell"] == {"(555) 123-4567"}
+    assert found["Business Phone"] == {"555.987.6543"}
+
+
+def test_identifiers_are_scoped_to_the_person():
+    text = ("Jane Doe works at Acme. Contact the company at info@acme.com or call our office at (555) 123-4567. "
+            "Jane can be reached at jane@example.com.")
+    assert find_identifiers(text, "Jane Doe") == {"Email": {"jane@example.com"}}
+    assert find_identifiers(text)["Email"] == {"info@acme.com", "jane@example.com"}
+
+
+def test_abbreviations_do_not_end_the_sentence():
+    text = ("A breach listing attributed to Jane Doe included SSN 123-45-6789, passport No. X1234567 and "
+            "driver's license D123-4567-8901.")
+    assert find_identifiers(text, "Jane Doe") == {
+        "SSN": {"123-45-6789"}, "Passport #": {"X1234567"}, "DDL": {"D123-4567-8901"},
+    }
+    assert find_identifiers("Dr. J. Doe of the U.S. Army uses jdoe@example.com.", "Jane Doe") == {
+        "Email": {"jdoe@example.com"},
+    }
+    assert find_identifiers("Jane Doe lives on Main St. Apt. 4 and her cell is (555) 123-4567.", "Jane Doe") == {
+        "Personal Cell": {"(555) 123-4567"},
+    }
+
+
+def test_sentences_still_end_after_ordinary_words_and_line_breaks():
+    assert find_identifiers("Jane Doe went to the disco. Call (555) 123-4567.", "Jane Doe") == {}
+    assert find_identifiers("Jane Doe, passport No.\nOffice: info@acme.com", "Jane Doe") == {}
+
+
+def test_apply_pii_rules_keeps_unscoped_fields_in_the_prompt():
+    attributes = empty_attributes()
+    remaining = apply_pii_rules("Contact the company at info@acme.com.", attributes, "Jane Doe")
+    assert "Email" in remaining
+    assert not attributes["Email"]
+
+
+class UnusedClient:
+    def __getattr__(self, name):
+        raise AssertionError("GPT must not be called")
+
+
+def test_extraction_is_skipped_when_everything_was_found():
+    attributes = empty_attributes()
+    for attribute, _, _ in PII_PROMPT_FIELDS:
+        attributes[attribute] = {"known"}
+    usage = TokenUsage()
+    current_usage.set(usage)
+
+    asyncio.run(extract_pii_with_gpt_async(UnusedClient(), ["Jane Doe's email is jane@example.com."],
+                                           attributes, "Jane Doe"))
+
+    assert usage.skipped_calls == 1
+    assert attributes["Email"] == {"known", "jane@example.com"}
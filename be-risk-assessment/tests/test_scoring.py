@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from riskassessmentapp.search.scoring import (
+    ATTRIBUTE_NAMES, BETA_COEFFICIENTS, RESOLUTION_POWERS, WEIGHTS, WILLINGNESS_MEASURES, calculate_overall_risk_score,
+    default_engine, risk_level_for,
+)
+
+
+def random_profiles(count, seed=7):
+    rng = random.Random(seed)
+    return [{name: ["value"] if rng.random() < 0.4 else [] for name in ATTRIBUTE_NAMES} for _ in range(count)]
+
+
+def loop_score(profile, weights=WEIGHTS, willingness_measures=WILLINGNESS_MEASURES,
+               resolution_powers=RESOLUTION_POWERS, beta_coefficients=BETA_COEFFICIENTS):
+    return calculate_overall_risk_score(profile, weights, willingness_measures, resolution_powers, beta_coefficients)
+
+
+def test_engine_matches_the_per_profile_loop_exactly():
+    profiles = random_profiles(500) + [{name: [] for name in ATTRIBUTE_NAMES}]
+    expected = [loop_score(profile) for profile in profiles]
+
+    assert [default_engine.score(profile) for profile in profiles] == expected
+    assert default_engine.score_batch(default_engine.presence_matrix(profiles)).tolist() == expected
+    assert list(default_engine.risk_levels(expected)) == [risk_level_for(score) for score in expected]
+
+
+def test_risk_levels_at_the_bounds():
+    scores = [0, 0.5, 2.74, 2.75, 5.48, 6.87, 12.25, 12.26]
+    assert list(default_engine.risk_levels(scores)) == [risk_level_for(score) for score in scores]
+
+
+def test_overrides_match_the_loop_with_the_same_tables():
+    overrides = {"weights": {"SSN": 4, "Email": 1.5}, "beta_coefficients": {"DoB": 2}}
+    engine = default_engine.with_overrides(overrides)
+    profiles = random_profiles(100, seed=3)
+
+    expected = [loop_score(profile, weights={**WEIGHTS, **overrides["weights"]},
+                           beta_coefficients={**BETA_COEFFICIENTS, **overrides["beta_coefficients"]})
+                for profile in profiles]
+    assert engine.score_batch(engine.presence_matrix(profiles)).tolist() == expected
+    assert default_engine.weights["SSN"] == WEIGHTS["SSN"]
+
+
+def test_no_overrides_returns_the_same_engine():
+    assert default_engine.with_overrides({}) is default_engine
+
+
+@pytest.mark.parametrize("coefficients", [
+    ["weights"],
+    {"weights": [1, 2]},
+    {"weights": {"SSN": "10"}},
+    {"weights": {"SSN": True}},
+    {"weights": {"SSN": float("nan")}},
+    {"unknown": {"SSN": 1}},
+])
+def test_invalid_overrides_are_rejected(coefficients):
+    with pytest.raises(ValueError):
+        default_engine.with_overrides(coefficients)
+
+
+def test_every_single_attribute_profile():
+    for name in ATTRIBUTE_NAMES:
+        profile = {other: ["value"] if other == name else [] for other in ATTRIBUTE_NAMES}
+        assert default_engine.score(profile) == loop_score(profile)
@@ -0,0 +1,70 @@
+import os
+
+import flask_migrate
+import pytest
+
+from riskassessmentapp.app import create_app, db
+from riskassessmentapp.users.models import SearchHistory, User
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("SECRET_KEY", "test")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.db"))
+    monkeypatch.setenv("PAGE_CACHE_PATH", str(tmp_path / "pages.db"))
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(uid="jane", first_name="Jane", last_name="Doe", email="jane@example.com", password="x",
+                            search_names="John Smith, Mary Major,,John Smith"))
+        db.session.add(User(uid="john", first_name="John", last_name="Roe", email="john@example.com", password="x"))
+        db.session.commit()
+    return app
+
+
+def history(app, email):
+    response = app.test_client().get(f"/users/search-history?email={email}")
+    assert response.status_code == 200
+    return [entry["searchName"] for entry in response.get_json()["history"]]
+
+
+def test_migration_copies_search_names_into_history(app):
+    with app.app_context():
+        flask_migrate.upgrade(directory=MIGRATIONS)
+
+    assert history(app, "jane@example.com") == ["Mary Major", "John Smith"]
+    assert history(app, "john@example.com") == []
+
+
+def test_migration_downgrade_writes_history_back(app):
+    with app.app_context():
+        flask_migrate.upgrade(directory=MIGRATIONS)
+    app.test_client().post("/users/search-history", json={"email": "jane@example.com", "searchName": "Richard Miles"})
+
+    with app.app_context():
+        flask_migrate.downgrade(directory=MIGRATIONS, revision="5e9f0c2b7a13")
+        assert db.session.get(User, "jane").search_names == "John Smith,Mary Major,Richard Miles"
+
+
+def test_migration_skips_users_that_have_history(app):
+    with app.app_context():
+        db.session.add(SearchHistory(user_uid="jane", search_name="Richard Miles"))
+        db.session.commit()
+        flask_migrate.upgrade(directory=MIGRATIONS)
+
+    assert history(app, "jane@example.com") == ["Richard Miles"]
+
+
+def test_update_user_leaves_search_history_alone(app):
+    client = app.test_client()
+    client.post("/users/search-history", json={"email": "jane@example.com", "searchName": "Richard Miles"})
+
+    response = client.patch("/users/update-user", json={
+        "firstName": "Jane", "lastName": "Doe", "email": "jane@example.com", "searchNames": "",
+    })
+    assert response.status_code == 200
+    assert "searchNames" not in response.get_json()["user"]
+    assert history(app, "jane@example.com") == ["Richard Miles"]
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from flask import request
+
+from riskassessmentapp.app import create_app
+from riskassessmentapp.search import openai_clients, routes
+from riskassessmentapp.search.openai_clients import async_openai_client
+from riskassessmentapp.serving import make_asgi_app
+
+STREAM_QUERY = "searchName=Jane+Doe&selectedUrls=https://a.example/"
+
+
+@pytest.fixture
+def flask_app(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("SECRET_KEY", "test")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.db"))
+    monkeypatch.setenv("PAGE_CACHE_PATH", str(tmp_path / "pages.db"))
+    return create_app()
+
+
+def http_scope(path, method="GET", query_string=b""):
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "root_path": "", "query_string": query_string, "headers": [],
+        "server": ("testserver", 80), "client": ("127.0.0.1", 12345),
+    }
+
+
+class Client:
+    """One ASGI request whose client can disconnect at any point."""
+
+    def __init__(self, body=b""):
+        self.messages = asyncio.Queue()
+        # Sent in two parts, like a body that does not arrive at once
+        self.messages.put_nowait({"type": "http.request", "body": body[:4], "more_body": True})
+        self.messages.put_nowait({"type": "http.request", "body": body[4:], "more_body": False})
+        self.sent = asyncio.Queue()
+
+    async def receive(self):
+        return await self.messages.get()
+
+    async def send(self, message):
+        await self.sent.put(message)
+
+    def disconnect(self):
+        self.messages.put_nowait({"type": "http.disconnect"})
+
+    async def body(self):
+        """Wait for the next non-empty chunk of the response body."""
+        while True:
+            message = await self.sent.get()
+            if message["type"] == "http.response.body" and message.get("body"):
+                return message["body"]
+
+
+class FakeOpenAI:
+    instances = []
+
+    def __init__(self):
+        self.closed = False
+        self.instances.append(self)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_async_views_run_on_the_server_loop_and_share_the_openai_client(flask_app, monkeypatch):
+    monkeypatch.setattr(openai_clients, "new_async_openai_client", FakeOpenAI)
+
+    @flask_app.route("/loop")
+    async def loop_view():
+        async with async_openai_client() as first, async_openai_client() as second:
+            return {"loop": id(asyncio.get_running_loop()), "shared": first is second}
+
+    application = make_asgi_app(flask_app)
+
+    async def run_request():
+        openai_clients.share_async_openai_client(asyncio.get_running_loop())
+        try:
+            client = Client()
+            await application(http_scope("/loop"), client.receive, client.send)
+            return id(asyncio.get_running_loop()), await client.body()
+        finally:
+            await openai_clients.close_async_openai_client()
+
+    loop_id, body = asyncio.run(run_request())
+    assert body == f'{{"loop":{loop_id},"shared":true}}\n'.encode()
+    assert len(FakeOpenAI.instances) == 1 and FakeOpenAI.instances[0].closed
+
+
+def test_async_views_read_the_request_body(flask_app):
+    @flask_app.route("/echo", methods=["POST"])
+    async def echo_view():
+        await asyncio.sleep(0)
+        return {"searchName": request.json["searchName"]}
+
+    application = make_asgi_app(flask_app)
+    body = b'{"searchName": "Jane Doe"}'
+
+    async def run_request():
+        client = Client(body)
+        scope = http_scope("/echo", method="POST")
+        scope["headers"] = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        await asyncio.wait_for(application(scope, client.receive, client.send), 5)
+        return await client.body()
+
+    assert asyncio.run(run_request()) == b'{"searchName":"Jane Doe"}\n'
+
+
+def test_disconnect_cancels_an_async_view(flask_app):
+    cancelled = asyncio.Event()
+
+    @flask_app.route("/slow")
+    async def slow_view():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {}
+
+    application = make_asgi_app(flask_app)
+
+    async def run_request():
+        client = Client()
+        handler = asyncio.create_task(application(http_scope("/slow"), client.receive, client.send))
+        await asyncio.sleep(0.1)
+        client.disconnect()
+        await asyncio.wait_for(cancelled.wait(), 5)
+        await asyncio.wait_for(handler, 5)
+
+    asyncio.run(run_request())
+
+
+def test_disconnect_cancels_a_stream(flask_app, monkeypatch):
+    cancelled = asyncio.Event()
+
+    async def assessment_events(target_name, selected_urls, fetch_concurrency=10, llm_concurrency=10):
+        yield "started", {"searchName": target_name, "urls": len(selected_urls)}
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(routes, "assessment_events", assessment_events)
+    application = make_asgi_app(flask_app)
+
+    async def run_request():
+        client = Client()
+        scope = http_scope("/risksearch/extract/stream", query_string=STREAM_QUERY.encode())
+        handler = asyncio.create_task(application(scope, client.receive, client.send))
+        assert (await asyncio.wait_for(client.body(), 5)).startswith(b"event: started\n")
+        client.disconnect()
+        await asyncio.wait_for(cancelled.wait(), 5)
+        await asyncio.wait_for(handler, 5)
+
+    asyncio.run(run_request())
+
+
+def test_stream_without_an_asgi_server(flask_app, monkeypatch):
+    async def assessment_events(target_name, selected_urls, fetch_concurrency=10, llm_concurrency=10):
+        yield "started", {"searchName": target_name, "urls": len(selected_urls)}
+        yield "result", {"message": "No relevant data found about this person."}
+
+    monkeypatch.setattr(routes, "assessment_events", assessment_events)
+
+    response = flask_app.test_client().get(f"/risksearch/extract/stream?{STREAM_QUERY}")
+    events = [line for line in response.get_data(as_text=True).splitlines() if line.startswith("event: ")]
+    assert events == ["event: started", "event: result", "event: done"]
@@ -0,0 +1,97 @@
+import itertools
+
+import pytest
+
+from riskassessmentapp.search import llm_cache as llm_cache_module
+from riskassessmentapp.search import page_cache as page_cache_module
+from riskassessmentapp.search.llm_cache import LLMResultCache, make_cache_key
+from riskassessmentapp.search.page_cache import PageCache, normalize_url
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A time.time() that moves one second forward on every call, so access order is unambiguous."""
+    ticks = itertools.count(1_000_000)
+    fake_time = type("FakeTime", (), {"time": staticmethod(lambda: float(next(ticks)))})
+    monkeypatch.setattr(llm_cache_module, "time", fake_time)
+    monkeypatch.setattr(page_cache_module, "time", fake_time)
+
+
+@pytest.fixture
+def page_cache(tmp_path, clock):
+    cache = PageCache()
+    cache.path = str(tmp_path / "pages.sqlite3")
+    cache.max_bytes = 3000
+    return cache
+
+
+@pytest.fixture
+def llm_cache(tmp_path, clock):
+    cache = LLMResultCache()
+    cache.path = str(tmp_path / "llm.sqlite3")
+    return cache
+
+
+def test_page_cache_evicts_least_recently_used(page_cache):
+    for name in "abc":
+        page_cache.put(f"https://example.com/{name}", name * 1000)
+    # Reading a makes b the least recently used page
+    assert page_cache.get("https://example.com/a").body == "a" * 1000
+
+    page_cache.put("https://example.com/d", "d" * 1000)
+
+    assert page_cache.get("https://example.com/b") is None
+    assert page_cache.get("https://example.com/a") is not None
+    stats = page_cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["total_bytes"] <= page_cache.max_bytes
+
+
+def test_page_cache_skips_bodies_over_the_limit(page_cache):
+    page_cache.put("https://example.com/huge", "x" * 4000)
+    assert page_cache.stats()["entries"] == 0
+
+
+def test_page_cache_shares_entries_between_equivalent_urls(page_cache):
+    page_cache.put("HTTPS://Example.com:443/p?b=2&a=1&utm_source=x#top", "body")
+    assert page_cache.get("https://example.com/p?a=1&b=2").body == "body"
+    assert normalize_url("https://example.com/p?fbclid=1") == "https://example.com/p"
+
+
+def test_llm_cache_evicts_by_bytes(llm_cache):
+    payload = "x" * 100
+    llm_cache.max_bytes = 3 * (len(payload) + 2)
+    keys = [make_cache_key("clean", "v1", "model", "Jane Doe", f"page {i}") for i in range(4)]
+    for key in keys[:3]:
+        llm_cache.put(key, "clean", "v1", "model", payload)
+    assert llm_cache.get(keys[0]) == payload
+
+    llm_cache.put(keys[3], "clean", "v1", "model", payload)
+
+    assert llm_cache.get(keys[1]) is None
+    assert llm_cache.get(keys[0]) == payload
+    assert llm_cache.stats()["evictions"] == 1
+
+
+def test_llm_cache_expires_after_ttl(llm_cache):
+    # The clock moves a second between put and get
+    llm_cache.ttl = 1
+    key = make_cache_key("extract", "v1", "model", "Jane Doe", "text")
+    llm_cache.put(key, "extract", "v1", "model", {"Email": ""})
+    assert llm_cache.get(key) is None
+    assert llm_cache.stats()["expired"] == 1
+
+
+def test_llm_cache_invalidates_old_prompt_versions(llm_cache):
+    old = make_cache_key("clean", "v1", "model", "Jane Doe", "text")
+    new = make_cache_key("clean", "v2", "model", "Jane Doe", "text")
+    llm_cache.put(old, "clean", "v1", "model", ["a"])
+    llm_cache.put(new, "clean", "v2", "model", ["b"])
+
+    assert llm_cache.invalidate(kind="clean", keep_prompt_version="v2") == 1
+    assert llm_cache.get(old) is None
+    assert llm_cache.get(new) == ["b"]
+
+
+def test_cache_keys_ignore_name_case_and_spacing():
+    assert make_cache_key("clean", "v1", "m", "Jane  Doe", "text") == make_cache_key("clean", "v1", "m", "jane doe", "text")
@@ -59,7 +59,6 @@ const Login = () => {
       email: user.email,
       firstName: user.firstName,
       lastName: user.lastName,
-      searchNames: user.searchNames,
     });
   };
 
@@ -9,10 +9,9 @@ import Header from "@/components/Header";
 import BackButton from "@/components/BackButton";
 import Input from "@/components/Input";
 import { useAuth } from "@/context/authContext";
-import { UserType } from "@/types";
 
 const AddUserModal = () => {
-  const { updateSearchUsers, getSearchNames, setUser } = useAuth();
+  const { addSearchUsers, getSearchNames } = useAuth();
   const [loading, setLoading] = useState(false);
   const [users, setUsers] = useState<string[]>([]);
   const [disableUsers, setDisableUsers] = useState<string[]>([]);
@@ -25,8 +24,11 @@ const AddUserModal = () => {
   });
   const onSubmit = async () => {
     setLoading(true);
-    const userList = users.slice(1);
-    const res = await updateSearchUsers(userList ? userList?.join(",") : "");
+    const newUsers = users
+      .slice(1)
+      .map((name) => (name ? name.trim() : ""))
+      .filter((name, index) => name && !disableUsers[index + 1]);
+    const res = await addSearchUsers(newUsers);
     setLoading(false);
     if (!res.success) {
       Alert.alert("User Update", res.msg);
@@ -36,22 +38,7 @@ const AddUserModal = () => {
       Alert.alert("User Update", res.msg.message);
       return;
     }
-
-    const user: UserType = res?.msg?.user ? res?.msg?.user : null;
-    if (!user) {
-      Alert.alert(
-        "User Update",
-        "Something went wrong please try after some time"
-      );
-      return;
-    }
-    setUser({
-      uid: user.uid,
-      email: user.email,
-      firstName: user.firstName,
-      lastName: user.lastName,
-      searchNames: user.searchNames,
-    });
+    setDisableUsers([...users]);
     Alert.alert("User Update", "User updated successfully");
     return;
   };
@@ -58,7 +58,6 @@ const ProfileModal = () => {
       email: user.email,
       firstName: user.firstName,
       lastName: user.lastName,
-      searchNames: user.searchNames,
     });
     Alert.alert("User Update", "User updated successfully");
     return;
@@ -11,13 +11,16 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({
 }) => {
   const [user, setUser] = useState<UserType>(null);
   const [results, setResults] = useState<any>();
+  const [searchNames, setSearchNames] = useState<string[]>([]);
 
   const router = useRouter();
 
   useEffect(() => {
     if (user) {
       router.replace("/(tabs)");
+      loadSearchNames();
     } else {
+      setSearchNames([]);
       router.replace("/(auth)/welcome");
     }
   }, [user]);
@@ -40,9 +43,41 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({
     }
   };
 
+  const loadSearchNames = async () => {
+    try {
+      if (!user || !user.email) {
+        return { success: false, msg: "User not found" };
+      }
+      const rawResponse = await fetch(
+        `${url}/users/search-history?email=${encodeURIComponent(user.email)}&limit=100`,
+        {
+          method: "GET",
+          headers: {
+            Accept: "application/json",
+            "Content-Type": "application/json",
+          },
+        }
+      );
+      const content = await rawResponse.json();
+      if (rawResponse.status === 200) {
+        // The history comes newest first; list each name once, in the order it was added
+        const names: string[] = [];
+        for (const entry of [...content.history].reverse()) {
+          if (!names.includes(entry.searchName)) {
+            names.push(entry.searchName);
+          }
+        }
+        setSearchNames(names);
+      }
+      return { success: true, msg: content, status_code: rawResponse.status };
+    } catch (error: any) {
+      let msg = error.message;
+      return { success: false, msg };
+    }
+  };
+
   const getSearchNames = () => {
-    const users = user && user.searchNames ? user.searchNames?.split(",") : [];
-    return [user?.firstName + " " + user?.lastName, ...users];
+    return [user?.firstName + " " + user?.lastName, ...searchNames];
   };
 
   const register = async (
@@ -158,25 +193,33 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({
     }
   };
 
-  const updateSearchUsers = async (searchNames: string) => {
+  const addSearchUsers = async (names: string[]) => {
     try {
       if (!user) {
         return { success: false, msg: "User not found" };
       }
-      const response = await fetch(`${url}/users/update-user`, {
-        method: "PATCH",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          firstName: user.firstName,
-          lastName: user.lastName,
-          email: user.email,
-          searchNames: searchNames,
-        }),
-      });
-      const content = await response.json();
-      return { success: true, msg: content, status_code: response.status };
+      let content: any = {};
+      let status = 200;
+      // One history entry per new name; the names saved before are left as they are
+      for (const searchName of names) {
+        const response = await fetch(`${url}/users/search-history`, {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({
+            email: user.email,
+            searchName: searchName,
+          }),
+        });
+        content = await response.json();
+        status = response.status;
+        if (status !== 200) {
+          break;
+        }
+      }
+      await loadSearchNames();
+      return { success: true, msg: content, status_code: status };
     } catch (error: any) {
       let msg = error.message;
       return { success: false, msg };
@@ -215,7 +258,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({
     forgotPassword,
     extract,
     getSearchNames,
-    updateSearchUsers,
+    addSearchUsers,
   };
 
   return (
@@ -127,7 +127,6 @@ export type UserType = {
   email?: string | null;
   firstName: string | null;
   lastName: string | null;
-  searchNames?: string | null;
 } | null;
 
 export type UserDataType = {
@@ -171,8 +170,8 @@ export type AuthContextType = {
     searchName: string,
     selectedUrls: string[]
   ) => Promise<{ success: boolean; msg?: any; status_code?: number }>;
-  updateSearchUsers: (
-    searchNames: string
+  addSearchUsers: (
+    names: string[]
   ) => Promise<{ success: boolean; msg?: any; status_code?: number }>;
 };
 